@@ -4,6 +4,44 @@
  * NO SIMULATIONS - Real geometric rendering only
  */
 
+// Packed binary geometry (see core/geometry_transport.py), asked for via the Accept header
+const GEOMETRY_MEDIA_TYPE = 'application/x-floorplan-geometry';
+
+async function readGeometryResponse(response) {
+    const contentType = response.headers.get('Content-Type') || '';
+    if (contentType.startsWith(GEOMETRY_MEDIA_TYPE)) {
+        return decodeGeometryPayload(await response.arrayBuffer());
+    }
+    return response.json();
+}
+
+function decodeGeometryPayload(buffer) {
+    // b'FPG1', uint32 header length, JSON header, then float32/uint32 buffers viewed in place
+    const view = new DataView(buffer);
+    const headerLength = view.getUint32(4, true);
+    const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLength)));
+    const base = 8 + headerLength;
+    const [originX, originY] = header.origin;
+
+    const data = { ...header.fields };
+    Object.entries(header.layers).forEach(([name, spans]) => {
+        const layer = {
+            origin: [originX, originY],
+            count: spans.count,
+            coords: new Float32Array(buffer, base + spans.coords[0], spans.coords[1]),
+            rings: new Uint32Array(buffer, base + spans.rings[0], spans.rings[1]),
+            polygons: new Uint32Array(buffer, base + spans.polygons[0], spans.polygons[1])
+        };
+        const polygons = Array.from({ length: layer.count }, (_, index) => ({ layer, index }));
+        const records = header.records[name];
+        data[name] = records
+            ? records.map((record, index) => ({ ...record, polygon: polygons[index] }))
+            : polygons;
+        data[name].packed = layer;
+    });
+    return data;
+}
+
 class AdvancedSDKViewer {
     constructor() {
         this.scene = null;
@@ -20,6 +58,9 @@ class AdvancedSDKViewer {
             corridors: [],
             openSpaces: []
         };
+        this.maxExtrudedPolygons = 2000;  // Bigger packed layers render as one outline geometry
+        this.lod = null;  // { tier, tolerances } of the plan layers on screen
+        this.lodTimer = null;
         
         this.init();
         this.setupEventListeners();
@@ -59,6 +100,7 @@ class AdvancedSDKViewer {
         this.controls.minDistance = 10;
         this.controls.maxDistance = 300;
         this.controls.maxPolarAngle = Math.PI / 2;
+        this.controls.addEventListener('change', () => this.scheduleDetailUpdate());
 
         // Lights
         this.setupLights();
@@ -156,10 +198,12 @@ class AdvancedSDKViewer {
         try {
             const formData = new FormData();
             formData.append('file', file);
+            formData.append('wall_thickness', document.getElementById('wall-thickness').value);
 
             // Send to backend for processing
             const response = await fetch('/api/parse-dxf', {
                 method: 'POST',
+                headers: { 'Accept': GEOMETRY_MEDIA_TYPE },
                 body: formData
             });
 
@@ -167,8 +211,9 @@ class AdvancedSDKViewer {
                 throw new Error('Failed to parse DXF file');
             }
 
-            const data = await response.json();
+            const data = await readGeometryResponse(response);
             this.currentData = data;
+            this.lod = data.lod || null;  // Coarsest tier; finer ones load on zoom
             
             // Render the plan
             this.renderFloorPlan(data);
@@ -212,8 +257,13 @@ class AdvancedSDKViewer {
                 throw new Error('Failed to process floor plan');
             }
 
-            const result = await response.json();
+            // Processing runs as a background job; follow its progress
+            const job = await response.json();
+            const result = await this.waitForJob(job);
             this.currentData = { ...this.currentData, ...result };
+            if (this.lod) {
+                this.lod = { ...this.lod, tier: 0 };  // The result carries full-detail plan layers
+            }
             
             // Re-render with îlots and corridors
             this.renderFloorPlan(this.currentData);
@@ -227,7 +277,45 @@ class AdvancedSDKViewer {
         }
     }
 
-    renderFloorPlan(data) {
+    scheduleDetailUpdate() {
+        // Wait for the camera to settle before asking for another tier
+        clearTimeout(this.lodTimer);
+        this.lodTimer = setTimeout(() => this.updateDetailLevel(), 250);
+    }
+
+    async updateDetailLevel() {
+        if (!this.lod || !this.currentData) return;
+
+        // World units covered by one screen pixel at the orbit target
+        const distance = this.camera.position.distanceTo(this.controls.target);
+        const fov = this.camera.fov * (Math.PI / 180);
+        const unitsPerPixel = 2 * distance * Math.tan(fov / 2) / this.renderer.domElement.clientHeight;
+
+        // Coarsest tier whose simplification stays under a pixel
+        let tier = 0;
+        this.lod.tolerances.forEach((tolerance, index) => {
+            if (tolerance <= unitsPerPixel) tier = index;
+        });
+        if (tier === this.lod.tier) return;
+
+        try {
+            const response = await fetch(`/api/plan?lod=${tier}`, {
+                headers: { 'Accept': GEOMETRY_MEDIA_TYPE }
+            });
+            if (!response.ok) return;
+            const plan = await readGeometryResponse(response);
+
+            ['walls', 'restricted_areas', 'entrances', 'open_spaces'].forEach(name => {
+                this.currentData[name] = plan[name];
+            });
+            this.lod = plan.lod;
+            this.renderFloorPlan(this.currentData, false);
+        } catch (error) {
+            console.warn('Could not load detail level:', error);
+        }
+    }
+
+    renderFloorPlan(data, fitCamera = true) {
         // Clear existing meshes
         this.clearScene();
 
@@ -238,32 +326,16 @@ class AdvancedSDKViewer {
             this.currentView === 'ilots' || this.currentView === 'corridors') {
             
             // Open spaces (light background)
-            if (data.open_spaces) {
-                data.open_spaces.forEach(space => {
-                    this.createPolygonMesh(space, 0xf5f5f5, 0.3, 'openSpaces', 0);
-                });
-            }
+            this.renderLayer(data.open_spaces, 0xf5f5f5, 0.3, 'openSpaces', 0);
 
             // Walls (black, thicker - architectural style)
-            if (data.walls) {
-                data.walls.forEach(wall => {
-                    this.createPolygonMesh(wall, 0x1a1a1a, 1.0, 'walls', wallThickness * 3);
-                });
-            }
+            this.renderLayer(data.walls, 0x1a1a1a, 1.0, 'walls', wallThickness * 3);
 
             // Restricted areas (blue)
-            if (data.restricted_areas) {
-                data.restricted_areas.forEach(restricted => {
-                    this.createPolygonMesh(restricted, 0x4682ff, 0.8, 'restricted', 0.5);
-                });
-            }
+            this.renderLayer(data.restricted_areas, 0x4682ff, 0.8, 'restricted', 0.5);
 
             // Entrances (red)
-            if (data.entrances) {
-                data.entrances.forEach(entrance => {
-                    this.createPolygonMesh(entrance, 0xff4444, 0.8, 'entrances', 0.5);
-                });
-            }
+            this.renderLayer(data.entrances, 0xff4444, 0.8, 'entrances', 0.5);
         }
 
         // Îlots (green)
@@ -282,23 +354,101 @@ class AdvancedSDKViewer {
         }
 
         // Auto-fit camera
-        this.fitCameraToScene();
+        if (fitCamera) {
+            this.fitCameraToScene();
+        }
     }
 
-    createPolygonMesh(polygonData, color, opacity, group, height = 0.2) {
-        if (!polygonData || !polygonData.coordinates) return;
+    renderLayer(polygons, color, opacity, group, height) {
+        if (!polygons) return;
+
+        // Huge packed layers skip per-polygon extrusion
+        if (polygons.packed && polygons.length > this.maxExtrudedPolygons) {
+            this.createLayerOutlines(polygons.packed, color, group);
+            return;
+        }
+        polygons.forEach(polygon => {
+            this.createPolygonMesh(polygon, color, opacity, group, height);
+        });
+    }
+
+    polygonShape(polygonData) {
+        // GeoJSON exterior ring, or exterior plus holes from a packed layer
+        if (polygonData.layer) {
+            const { layer, index } = polygonData;
+            const [originX, originY] = layer.origin;
+            const ringPoints = (ring) => {
+                const points = [];
+                for (let i = layer.rings[ring]; i < layer.rings[ring + 1]; i++) {
+                    points.push(new THREE.Vector2(
+                        layer.coords[2 * i] + originX, layer.coords[2 * i + 1] + originY
+                    ));
+                }
+                return points;
+            };
+
+            const first = layer.polygons[index];
+            const last = layer.polygons[index + 1];
+            if (first === last || layer.rings[first + 1] - layer.rings[first] < 3) return null;
+
+            const shape = new THREE.Shape(ringPoints(first));
+            for (let ring = first + 1; ring < last; ring++) {
+                shape.holes.push(new THREE.Path(ringPoints(ring)));
+            }
+            return shape;
+        }
+
+        if (!polygonData.coordinates) return null;
 
         const coords = polygonData.coordinates[0]; // Exterior ring
         
-        if (coords.length < 3) return;
+        if (coords.length < 3) return null;
 
-        // Create shape
         const shape = new THREE.Shape();
         shape.moveTo(coords[0][0], coords[0][1]);
         
         for (let i = 1; i < coords.length; i++) {
             shape.lineTo(coords[i][0], coords[i][1]);
         }
+        return shape;
+    }
+
+    createLayerOutlines(layer, color, group) {
+        // One BufferGeometry for the whole layer, straight from the packed buffers
+        const vertexCount = layer.coords.length / 2;
+        const positions = new Float32Array(vertexCount * 3);
+        for (let i = 0; i < vertexCount; i++) {
+            positions[3 * i] = layer.coords[2 * i];
+            positions[3 * i + 1] = layer.coords[2 * i + 1];
+        }
+
+        // Rings are closed, so consecutive vertices within a ring form its edges
+        const ringCount = layer.rings.length - 1;
+        const indices = new Uint32Array(2 * (vertexCount - ringCount));
+        let n = 0;
+        for (let ring = 0; ring < ringCount; ring++) {
+            for (let i = layer.rings[ring]; i < layer.rings[ring + 1] - 1; i++) {
+                indices[n++] = i;
+                indices[n++] = i + 1;
+            }
+        }
+
+        const geometry = new THREE.BufferGeometry();
+        geometry.setAttribute('position', new THREE.BufferAttribute(positions, 3));
+        geometry.setIndex(new THREE.BufferAttribute(indices.subarray(0, n), 1));
+
+        const lines = new THREE.LineSegments(geometry, new THREE.LineBasicMaterial({ color: color }));
+        lines.position.set(layer.origin[0], layer.origin[1], 0);
+
+        this.scene.add(lines);
+        this.meshGroups[group].push(lines);
+    }
+
+    createPolygonMesh(polygonData, color, opacity, group, height = 0.2) {
+        if (!polygonData) return;
+
+        const shape = this.polygonShape(polygonData);
+        if (!shape) return;
 
         // Extrude settings
         const extrudeSettings = {
@@ -414,6 +564,62 @@ class AdvancedSDKViewer {
 
     showLoading(show) {
         document.getElementById('loading').classList.toggle('active', show);
+        if (!show) {
+            this.showProgress('Processing...');
+        }
+    }
+
+    showProgress(text) {
+        const label = document.querySelector('#loading div:last-child');
+        if (label) {
+            label.textContent = text;
+        }
+    }
+
+    describeProgress(progress) {
+        if (progress.stage === 'placement') {
+            return `Placing îlots: generation ${progress.generation}/${progress.max_generations}, ` +
+                `${progress.ilot_count} îlots, best fitness ${progress.best_fitness.toFixed(1)}`;
+        }
+        if (progress.stage === 'corridors') {
+            return 'Generating corridors...';
+        }
+        return 'Parsing floor plan...';
+    }
+
+    waitForJob(job) {
+        // Stream progress over SSE, then fetch the finished result
+        return new Promise((resolve, reject) => {
+            const events = new EventSource(job.events_url);
+
+            events.onmessage = async (event) => {
+                const status = JSON.parse(event.data);
+                if (status.progress && status.progress.stage) {
+                    this.showProgress(this.describeProgress(status.progress));
+                }
+                if (status.status === 'failed') {
+                    events.close();
+                    reject(new Error(status.error || 'Processing failed'));
+                } else if (status.status === 'done') {
+                    events.close();
+                    try {
+                        const response = await fetch(job.status_url, {
+                            headers: { 'Accept': GEOMETRY_MEDIA_TYPE }
+                        });
+                        const finished = await readGeometryResponse(response);
+                        // Packed responses carry the result itself, JSON wraps it in the job state
+                        resolve(finished.job ? finished : finished.result);
+                    } catch (error) {
+                        reject(error);
+                    }
+                }
+            };
+
+            events.onerror = () => {
+                events.close();
+                reject(new Error('Lost connection to processing job'));
+            };
+        });
     }
 
     onResize() {
@@ -458,10 +664,13 @@ window.addEventListener('DOMContentLoaded', () => {
 
 async function loadDemoData() {
     try {
-        const response = await fetch('/api/demo-data');
+        const response = await fetch('/api/demo-data', {
+            headers: { 'Accept': GEOMETRY_MEDIA_TYPE }
+        });
         if (response.ok) {
-            const data = await response.json();
+            const data = await readGeometryResponse(response);
             viewer.currentData = data;
+            viewer.lod = null;
             viewer.renderFloorPlan(data);
             viewer.updateStats(data);
         }
@@ -4,16 +4,26 @@ Flask backend for Three.js viewer integration
 Production-grade CAD processing with accurate geometric handling
 """
 
-from flask import Flask, request, jsonify, send_file, send_from_directory
+from flask import Flask, Response, request, jsonify, send_file, send_from_directory
 from flask_cors import CORS
 import tempfile
 import os
 import json
 import logging
+import secrets
+import shutil
+from dataclasses import replace
 from pathlib import Path
+from shapely.geometry import box
 
 from core.production_orchestrator import ProductionOrchestrator
-from core.production_ilot_engine import IlotSizeConfig
+from core.production_ilot_engine import IlotSizeConfig, PlacedIlot
+from core.parse_cache import ParseCache
+from core.job_queue import JobQueue, QueueFull, FINISHED
+from core.session_store import SessionStore
+from core.geometry_transport import GeometryPayload, MEDIA_TYPE
+from core.geometry_lod import build_lod_tiers
+from core.tile_renderer import TileRenderer
 
 # Configure logging
 logging.basicConfig(
@@ -26,11 +36,29 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__, static_folder='.')
 CORS(app)
 
-# Global state
-current_session = {
-    'floor_plan_data': None,
-    'dxf_path': None
-}
+# Per-user state, shared by all server workers through a local SQLite file
+session_store = SessionStore(
+    ttl_seconds=float(os.getenv('SESSION_TTL_SECONDS', '3600')),
+    max_sessions=int(os.getenv('SESSION_MAX_COUNT', '200')),
+    max_bytes=int(os.getenv('SESSION_MAX_MB', '256')) * 1024 * 1024
+)
+SESSION_COOKIE = 'viewer_session'
+
+# Parse cache shared by the viewer parse and the orchestrator run
+parse_cache = ParseCache()
+
+# Wall buffer (m) for uploads that do not send wall_thickness; jobs reuse the upload's value
+DEFAULT_WALL_THICKNESS = 0.20
+
+# Floor-plan jobs run off the request thread, a bounded number at a time
+job_queue = JobQueue(
+    max_workers=int(os.getenv('JOB_WORKERS', '2')),
+    max_pending=int(os.getenv('JOB_MAX_PENDING', '16'))
+)
+SSE_KEEPALIVE_SECONDS = 15
+
+# Raster tiles of processed layouts, cached on disk by result hash
+tile_renderer = TileRenderer()
 
 
 def polygon_to_geojson(polygon):
@@ -49,6 +77,130 @@ def polygon_to_geojson(polygon):
         return None
 
 
+def wants_binary():
+    """Whether the client asked for packed binary geometry (Accept header or ?format=binary)"""
+    return request.args.get('format') == 'binary' or MEDIA_TYPE in request.headers.get('Accept', '')
+
+
+def payload_to_json(payload):
+    """Expand a GeometryPayload into the JSON response, polygons as GeoJSON"""
+    data = dict(payload.fields)
+    for name, geometries in payload.layers.items():
+        records = payload.records.get(name)
+        if records is None:
+            data[name] = [polygon_to_geojson(g) for g in geometries if g]
+        else:
+            data[name] = [dict(record, polygon=polygon_to_geojson(g))
+                          for record, g in zip(records, geometries)]
+    return data
+
+
+def geometry_response(payload):
+    """Send a GeometryPayload as packed binary or JSON, as the client asked"""
+    if wants_binary():
+        response = Response(payload.pack(), mimetype=MEDIA_TYPE)
+    else:
+        response = jsonify(payload_to_json(payload))
+    response.vary.add('Accept')
+    return response
+
+
+def plan_layers(walls, restricted_areas, entrances, open_spaces):
+    """Plan geometry keyed by response layer name"""
+    return {
+        'walls': walls,
+        'restricted_areas': restricted_areas,
+        'entrances': entrances,
+        'open_spaces': open_spaces
+    }
+
+
+def plan_lods(parse_key, plan):
+    """
+    Display tiers of a plan as [(tolerance, layers)], full detail first and
+    coarsest last; simplified tiers are cached next to the parse
+    """
+    tiers = parse_cache.get_lods(parse_key) if parse_key else None
+    if tiers is None:
+        tiers = build_lod_tiers(plan)
+        if parse_key:
+            parse_cache.put_lods(parse_key, tiers)
+    return [(0.0, plan)] + tiers
+
+
+def requested_tier(tiers, default):
+    """LOD tier from the request's lod parameter; ValueError when out of range"""
+    value = request.values.get('lod')
+    tier = default if value is None else int(value)
+    if not 0 <= tier < len(tiers):
+        raise ValueError(f"lod must be between 0 and {len(tiers) - 1}")
+    return tier
+
+
+def load_session():
+    """Session named by the request's cookie or X-Session-Token header, if still alive"""
+    token = request.cookies.get(SESSION_COOKIE) or request.headers.get('X-Session-Token')
+    return session_store.load(token)
+
+
+def with_session_cookie(response, session):
+    """Attach the session token cookie to a response"""
+    response.set_cookie(SESSION_COOKIE, session.token, httponly=True, samesite='Lax',
+                        max_age=int(session_store.ttl_seconds))
+    return response
+
+
+def ilot_record(ilot):
+    """PlacedIlot attributes without geometry"""
+    return {
+        'id': ilot.id,
+        'area': ilot.area,
+        'category': ilot.category,
+        'position': list(ilot.position),
+        'width': ilot.width,
+        'height': ilot.height,
+        'rotation': ilot.rotation
+    }
+
+
+def corridor_record(corridor):
+    """Corridor attributes without geometry"""
+    return {
+        'id': corridor.id,
+        'width': corridor.width,
+        'length': corridor.length,
+        'connects_rows': list(corridor.connects_rows)
+    }
+
+
+def ilot_to_json(ilot):
+    """Convert PlacedIlot to JSON format"""
+    return dict(ilot_record(ilot), polygon=polygon_to_geojson(ilot.polygon))
+
+
+def corridor_to_json(corridor):
+    """Convert Corridor to JSON format"""
+    return dict(corridor_record(corridor), polygon=polygon_to_geojson(corridor.polygon))
+
+
+def ilot_from_json(data, template=None):
+    """Build a PlacedIlot centred on data['position'], defaulting fields from template"""
+    x, y = data['position']
+    width = data.get('width', template.width if template else 1.0)
+    height = data.get('height', template.height if template else 1.0)
+    fields = {
+        'polygon': box(x - width / 2, y - height / 2, x + width / 2, y + height / 2),
+        'area': width * height,
+        'position': (x, y),
+        'width': width,
+        'height': height,
+        'rotation': data.get('rotation', template.rotation if template else 0),
+    }
+    if template is not None:
+        return replace(template, **fields)
+    return PlacedIlot(id=data['id'], category=data.get('category', 'custom'), **fields)
+
+
 @app.route('/')
 def index():
     """Serve the main viewer HTML"""
@@ -65,7 +217,9 @@ def viewer_js():
 def parse_dxf():
     """
     Parse uploaded DXF file and extract zones
-    Returns: walls, restricted areas, entrances, open spaces
+    Returns: walls, restricted areas, entrances, open spaces at the coarsest
+    LOD tier unless lod is given (packed binary with ?format=binary or an
+    Accept header naming it)
     """
     try:
         if 'file' not in request.files:
@@ -87,57 +241,98 @@ def parse_dxf():
         orchestrator = ProductionOrchestrator()
         from core.production_cad_parser import ProductionCADParser
         
-        parser = ProductionCADParser()
+        parser = ProductionCADParser(cache=parse_cache)
         
         # Update wall thickness from request if provided
-        wall_thickness = request.form.get('wall_thickness', 0.20)
-        parser.wall_buffer = float(wall_thickness)
+        wall_thickness = float(request.form.get('wall_thickness', DEFAULT_WALL_THICKNESS))
+        parser.wall_buffer = wall_thickness
         
         walls, restricted_areas, entrances, open_spaces = parser.parse_dxf(tmp_path)
+        plan = (walls, restricted_areas, entrances, open_spaces)
+        parse_key = parser.cache_key(tmp_path)
+        
+        # Initial load ships the coarsest tier; the client asks for finer ones as it zooms
+        tiers = plan_lods(parse_key, plan)
+        try:
+            tier = requested_tier(tiers, default=len(tiers) - 1)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Convert to GeoJSON format
         result = {
             'success': True,
             'filename': file.filename,
-            'walls': [polygon_to_geojson(w) for w in walls if w],
-            'restricted_areas': [polygon_to_geojson(r) for r in restricted_areas if r],
-            'entrances': [polygon_to_geojson(e) for e in entrances if e],
-            'open_spaces': [polygon_to_geojson(s) for s in open_spaces if s],
             'total_area': sum(s.area for s in open_spaces if s),
             'stats': {
                 'walls': len(walls),
                 'restricted': len(restricted_areas),
                 'entrances': len(entrances),
                 'open_spaces': len(open_spaces)
-            }
+            },
+            'lod': {'tier': tier, 'tolerances': [tolerance for tolerance, _ in tiers]}
         }
         
-        # Store for later processing
-        current_session['floor_plan_data'] = {
-            'walls': walls,
-            'restricted_areas': restricted_areas,
-            'entrances': entrances,
-            'open_spaces': open_spaces
-        }
-        current_session['dxf_path'] = tmp_path
+        # Store for later processing; a new plan replaces the previous layout
+        session = load_session() or session_store.create()
+        session.plan = plan
+        session.parse_key = parse_key
+        session.wall_thickness = wall_thickness
+        session.dxf_path = tmp_path
+        session.ilots = {}
+        session.corridor_generator = None
+        session_store.save(session)
+        result['session_token'] = session.token
         
         logger.info(f"Successfully parsed DXF: {result['stats']}")
         
-        return jsonify(result)
+        payload = GeometryPayload(fields=result, layers=plan_layers(*tiers[tier][1]))
+        return with_session_cookie(geometry_response(payload), session)
         
     except Exception as e:
         logger.error(f"Error parsing DXF: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/plan', methods=['GET'])
+def get_plan():
+    """
+    Plan layers of the session at LOD tier ?lod=N (0 = full detail, default)
+    Tolerances of all tiers come back under 'lod' so the client can pick by zoom
+    """
+    try:
+        session = load_session()
+        if session is None or session.plan is None:
+            return jsonify({'error': 'No DXF file loaded'}), 400
+        
+        tiers = plan_lods(session.parse_key, session.plan)
+        try:
+            tier = requested_tier(tiers, default=0)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        payload = GeometryPayload(
+            fields={
+                'success': True,
+                'lod': {'tier': tier, 'tolerances': [tolerance for tolerance, _ in tiers]}
+            },
+            layers=plan_layers(*tiers[tier][1])
+        )
+        return geometry_response(payload)
+        
+    except Exception as e:
+        logger.error(f"Error loading plan tier: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/process-floor-plan', methods=['POST'])
 def process_floor_plan():
     """
-    Process floor plan with îlot placement and corridor generation
+    Queue floor plan processing with îlot placement and corridor generation
     Requires: parsed DXF data in session
+    Returns 202 with a job id; follow it via /api/jobs/<job_id> or its event stream
     """
     try:
-        if not current_session['dxf_path']:
+        session = load_session()
+        if session is None or not session.dxf_path:
             return jsonify({'error': 'No DXF file loaded'}), 400
         
         # Get configuration from request
@@ -158,65 +353,226 @@ def process_floor_plan():
             size_5_10_pct=dist['size_5_10']
         )
         
-        logger.info(f"Processing floor plan with {config_data['total_ilots']} îlots")
+        token, dxf_path = session.token, session.dxf_path
         
-        # Process
-        orchestrator = ProductionOrchestrator()
-        result = orchestrator.process_floor_plan(
-            dxf_file_path=current_session['dxf_path'],
-            size_config=size_config,
-            total_ilots=config_data['total_ilots'],
-            corridor_width=config_data['corridor_width'],
-            min_spacing=0.3
-        )
+        # Parse with the settings of the plan the user was shown, which also
+        # makes the job hit the parse cache entry written by /api/parse-dxf
+        wall_thickness = session.wall_thickness or DEFAULT_WALL_THICKNESS
+        
+        # The job reads its own link to the upload, so evicting or replacing the
+        # session cannot delete the file under a running job
+        job_path = f"{dxf_path}.{secrets.token_hex(8)}.job"
+        try:
+            os.link(dxf_path, job_path)
+        except OSError:
+            shutil.copyfile(dxf_path, job_path)
+        
+        def run(progress):
+            try:
+                return run_floor_plan_job(token, dxf_path, job_path, wall_thickness,
+                                          size_config, config_data, progress)
+            finally:
+                try:
+                    os.remove(job_path)
+                except OSError:
+                    pass
         
-        if not result.success:
-            return jsonify({'error': result.error_message}), 500
+        try:
+            job = job_queue.submit(run)
+        except QueueFull as e:
+            os.remove(job_path)
+            return jsonify({'error': f'Server busy, try again later ({e})'}), 503
         
-        # Convert result to JSON format
-        response = {
+        return jsonify({
             'success': True,
-            'processing_time': result.processing_time,
-            'ilots': [
-                {
-                    'id': ilot.id,
-                    'polygon': polygon_to_geojson(ilot.polygon),
-                    'area': ilot.area,
-                    'category': ilot.category,
-                    'position': list(ilot.position),
-                    'width': ilot.width,
-                    'height': ilot.height,
-                    'rotation': ilot.rotation
-                }
-                for ilot in result.ilots
-            ],
-            'corridors': [
-                {
-                    'id': corridor.id,
-                    'polygon': polygon_to_geojson(corridor.polygon),
-                    'width': corridor.width,
-                    'length': corridor.length,
-                    'connects_rows': list(corridor.connects_rows)
-                }
-                for corridor in result.corridors
-            ],
-            'walls': [polygon_to_geojson(w) for w in result.walls if w],
-            'restricted_areas': [polygon_to_geojson(r) for r in result.restricted_areas if r],
-            'entrances': [polygon_to_geojson(e) for e in result.entrances if e],
-            'open_spaces': [polygon_to_geojson(s) for s in result.open_spaces if s],
-            'total_area': result.total_area,
-            'ilot_coverage_pct': result.ilot_coverage_pct,
-            'corridor_coverage_pct': result.corridor_coverage_pct,
-            'total_coverage_pct': result.total_coverage_pct,
-            'placement_score': result.placement_score
-        }
+            'job_id': job.id,
+            'status_url': f'/api/jobs/{job.id}',
+            'events_url': f'/api/jobs/{job.id}/events'
+        }), 202
         
-        logger.info(f"Successfully processed: {len(result.ilots)} îlots, {len(result.corridors)} corridors")
+    except Exception as e:
+        logger.error(f"Error processing floor plan: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+
+def run_floor_plan_job(token, dxf_path, job_path, wall_thickness, size_config, config_data, progress):
+    """
+    Job body: run the pipeline on job_path, the job's own copy of the session
+    upload dxf_path, parsed with the session's wall_thickness, and build the
+    response payload
+    """
+    logger.info(f"Processing floor plan with {config_data['total_ilots']} îlots")
+    
+    # Process
+    orchestrator = ProductionOrchestrator(parse_cache=parse_cache, wall_thickness=wall_thickness)
+    result = orchestrator.process_floor_plan(
+        dxf_file_path=job_path,
+        size_config=size_config,
+        total_ilots=config_data['total_ilots'],
+        corridor_width=config_data['corridor_width'],
+        min_spacing=0.3,
+        seed=config_data.get('seed'),
+        progress_callback=progress
+    )
+    
+    if not result.success:
+        raise RuntimeError(result.error_message)
+    
+    # Keep the layout for incremental edits, unless the session moved on meanwhile
+    session = session_store.load(token)
+    if session is not None and session.dxf_path == dxf_path:
+        session.ilots = {ilot.id: ilot for ilot in result.ilots}
+        session.corridor_generator = orchestrator.corridor_generator
+        session_store.save(session)
+    else:
+        logger.warning("Session expired or replaced its plan before the job finished")
+    
+    # Serialized per request, as JSON or packed binary
+    layers = plan_layers(result.walls, result.restricted_areas, result.entrances, result.open_spaces)
+    layers['ilots'] = [ilot.polygon for ilot in result.ilots]
+    layers['corridors'] = [corridor.polygon for corridor in result.corridors]
+    fields = {
+        'success': True,
+        'processing_time': result.processing_time,
+        'total_area': result.total_area,
+        'ilot_coverage_pct': result.ilot_coverage_pct,
+        'corridor_coverage_pct': result.corridor_coverage_pct,
+        'total_coverage_pct': result.total_coverage_pct,
+        'placement_score': result.placement_score
+    }
+    try:
+        tile_key = tile_renderer.register(result)
+        fields['tiles'] = dict(tile_renderer.info(tile_key),
+                               url=f'/api/tiles/{tile_key}/{{z}}/{{x}}/{{y}}.png')
+    except Exception as e:
+        logger.warning(f"Tile pyramid unavailable: {e}")
+    records = {
+        'ilots': [ilot_record(ilot) for ilot in result.ilots],
+        'corridors': [corridor_record(corridor) for corridor in result.corridors]
+    }
+    
+    logger.info(f"Successfully processed: {len(result.ilots)} îlots, {len(result.corridors)} corridors")
+    
+    return GeometryPayload(fields=fields, layers=layers, records=records)
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """
+    Job status and progress; includes the result once done
+    A finished job asked for packed binary answers with the result payload
+    alone, its job state under fields['job']
+    """
+    snapshot = job_queue.snapshot(job_id)
+    if snapshot is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    
+    payload = snapshot.pop('result', None)
+    if payload is None:
+        return jsonify(snapshot)
+    if wants_binary():
+        return geometry_response(replace(payload, fields=dict(payload.fields, job=snapshot)))
+    snapshot['result'] = payload_to_json(payload)
+    return jsonify(snapshot)
+
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Server-Sent Events stream of job status and GA progress until the job finishes"""
+    if job_queue.snapshot(job_id, include_result=False) is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    
+    def stream():
+        version = -1
+        while True:
+            snapshot = job_queue.wait(job_id, version, timeout=SSE_KEEPALIVE_SECONDS)
+            if snapshot is None:
+                yield f"event: error\ndata: {json.dumps({'error': 'Unknown job'})}\n\n"
+                return
+            if snapshot['version'] == version:
+                yield ": keep-alive\n\n"
+                continue
+            
+            version = snapshot['version']
+            yield f"data: {json.dumps(snapshot)}\n\n"
+            if snapshot['status'] in FINISHED:
+                return
+    
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+@app.route('/api/tiles/<key>/<int:z>/<int:x>/<int:y>.png', methods=['GET'])
+def get_tile(key, z, x, y):
+    """PNG raster tile of a processed layout; the key comes from the job result's 'tiles'"""
+    data = tile_renderer.tile(key, z, x, y)
+    if data is None:
+        return jsonify({'error': 'Unknown tile'}), 404
+    
+    # Content-addressed, so tiles never change under a key
+    return Response(data, mimetype='image/png', headers={
+        'Cache-Control': 'public, max-age=31536000, immutable'
+    })
+
+
+@app.route('/api/update-ilots', methods=['POST'])
+def update_ilots():
+    """
+    Apply local îlot edits and return a corridor delta
+    Body: {'moved': [{'id', 'position', ...}], 'added': [{'id', 'position', 'width', 'height', ...}],
+           'removed': [id, ...]}
+    """
+    try:
+        session = load_session()
+        if session is None or session.corridor_generator is None:
+            return jsonify({'error': 'No processed floor plan loaded'}), 400
+        
+        generator = session.corridor_generator
+        edits = request.json or {}
+        ilots = session.ilots
+        
+        moved = [ilot_from_json(item, ilots[item['id']]) for item in edits.get('moved', [])
+                 if item['id'] in ilots]
+        
+        # New îlots without an id are numbered after existing and requested ids
+        requested = [item['id'] for item in edits.get('added', []) if 'id' in item]
+        next_id = max([*ilots, *requested], default=-1) + 1
+        added = []
+        for item in edits.get('added', []):
+            if 'id' not in item:
+                item = dict(item, id=next_id)
+                next_id += 1
+            elif item['id'] in ilots or any(ilot.id == item['id'] for ilot in added):
+                return jsonify({'error': f"Îlot id {item['id']} already exists"}), 400
+            added.append(ilot_from_json(item))
+        
+        removed = [ilot_id for ilot_id in edits.get('removed', []) if ilot_id in ilots]
+        
+        delta = generator.update_corridors(moved=moved, added=added, removed=removed)
+        
+        for ilot_id in removed:
+            del ilots[ilot_id]
+        for ilot in moved + added:
+            ilots[ilot.id] = ilot
+        session_store.save(session)
         
-        return jsonify(response)
+        return jsonify({
+            'success': True,
+            'ilots': {
+                'updated': [ilot_to_json(ilot) for ilot in moved + added],
+                'removed': removed
+            },
+            'corridors': {
+                'added': [corridor_to_json(corridor) for corridor in delta.added],
+                'updated': [corridor_to_json(corridor) for corridor in delta.updated],
+                'removed': delta.removed
+            }
+        })
         
     except Exception as e:
-        logger.error(f"Error processing floor plan: {e}", exc_info=True)
+        logger.error(f"Error updating îlots: {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
 
@@ -235,21 +591,19 @@ def get_demo_data():
         orchestrator = ProductionOrchestrator()
         from core.production_cad_parser import ProductionCADParser
         
-        parser = ProductionCADParser()
+        parser = ProductionCADParser(cache=parse_cache)
         walls, restricted_areas, entrances, open_spaces = parser.parse_dxf(str(demo_file))
         
-        result = {
-            'success': True,
-            'walls': [polygon_to_geojson(w) for w in walls if w],
-            'restricted_areas': [polygon_to_geojson(r) for r in restricted_areas if r],
-            'entrances': [polygon_to_geojson(e) for e in entrances if e],
-            'open_spaces': [polygon_to_geojson(s) for s in open_spaces if s],
-            'total_area': sum(s.area for s in open_spaces if s),
-            'ilots': [],
-            'corridors': []
-        }
+        layers = plan_layers(walls, restricted_areas, entrances, open_spaces)
+        layers['ilots'] = []
+        layers['corridors'] = []
+        payload = GeometryPayload(
+            fields={'success': True, 'total_area': sum(s.area for s in open_spaces if s)},
+            layers=layers,
+            records={'ilots': [], 'corridors': []}
+        )
         
-        return jsonify(result)
+        return geometry_response(payload)
         
     except Exception as e:
         logger.error(f"Error loading demo data: {e}")
@@ -265,7 +619,8 @@ def export_result():
     try:
         export_format = request.json.get('format', 'pdf')
         
-        if not current_session['floor_plan_data']:
+        session = load_session()
+        if session is None or session.plan is None:
             return jsonify({'error': 'No data to export'}), 400
         
         # TODO: Implement export functionality
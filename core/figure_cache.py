@@ -0,0 +1,110 @@
+"""
+Figure Cache
+Memoizes serialized Plotly figures per processing result and view
+Results are identified by a content fingerprint, so reruns reuse built figures
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from core.parse_cache import ParseCache
+
+logger = logging.getLogger(__name__)
+
+
+def result_fingerprint(result) -> str:
+    """
+    sha256 of everything a result figure is drawn from: every geometry layer
+    plus the îlot and corridor attributes shown on hover
+    """
+    sha = hashlib.sha256()
+    layers = (
+        result.walls, result.restricted_areas, result.entrances, result.open_spaces,
+        [ilot.polygon for ilot in result.ilots],
+        [corridor.polygon for corridor in result.corridors]
+    )
+    for geoms in layers:
+        data, offsets = ParseCache._encode(list(geoms))
+        sha.update(offsets.tobytes())
+        sha.update(data.tobytes())
+
+    attributes = {
+        'ilots': [(ilot.id, ilot.category, ilot.area) for ilot in result.ilots],
+        'corridors': [(corridor.id, corridor.width, corridor.length) for corridor in result.corridors]
+    }
+    sha.update(json.dumps(attributes, default=str).encode())
+    return sha.hexdigest()
+
+
+class FigureCache:
+    """
+    Thread-safe LRU of figure JSON; bounded by entry count and total size,
+    since one cache is shared by every session of the app
+    """
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = 128 * 1024 * 1024):
+        """
+        Args:
+            max_entries: Most figures kept
+            max_bytes: Most serialized figure bytes kept
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries: 'OrderedDict[str, str]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """Figure JSON for a key, None on a miss"""
+        with self._lock:
+            figure_json = self._entries.get(key)
+            if figure_json is not None:
+                self._entries.move_to_end(key)
+            return figure_json
+
+    def put(self, key: str, figure_json: str):
+        """Store figure JSON, evicting least recently used figures past the bounds"""
+        size = len(figure_json)
+        if size > self.max_bytes:
+            logger.info(f"Figure {key} too large to cache ({size} bytes)")
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = figure_json
+            self._size += size
+
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def figure(self, key: str, build: Callable[[], go.Figure]) -> go.Figure:
+        """Cached figure for a key, built and stored on a miss"""
+        figure_json = self.get(key)
+        if figure_json is not None:
+            try:
+                return pio.from_json(figure_json, skip_invalid=True)
+            except Exception as e:
+                logger.warning(f"Discarding unreadable cached figure {key}: {e}")
+
+        fig = build()
+        try:
+            self.put(key, fig.to_json())
+        except Exception as e:
+            logger.warning(f"Failed to cache figure {key}: {e}")
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
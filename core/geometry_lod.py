@@ -0,0 +1,70 @@
+"""
+Level-of-Detail Tiers
+Topology-preserving simplification of parsed plan layers for zoomed-out display
+Tolerances scale with the plan extent so each tier matches a zoom level
+"""
+
+import logging
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+
+logger = logging.getLogger(__name__)
+
+# Plan extent / tolerance of each simplified tier, finest first. A plan shown
+# across ~1000 pixels loses nothing visible at extent / 1000; the finer tier
+# holds up to roughly 4x zoom. Tier 0 is always the unsimplified parse.
+LOD_RESOLUTIONS = (4000, 1000)
+
+PlanLayers = Tuple[List[Polygon], ...]
+
+
+def plan_extent(layers: PlanLayers) -> float:
+    """Longest side of the bounding box of all layers"""
+    geoms = [g for layer in layers for g in layer if g is not None and not g.is_empty]
+    if not geoms:
+        return 0.0
+    minx, miny, maxx, maxy = shapely.total_bounds(np.asarray(geoms, dtype=object))
+    return float(max(maxx - minx, maxy - miny))
+
+
+def lod_tolerances(layers: PlanLayers, resolutions: Sequence[int] = LOD_RESOLUTIONS) -> List[float]:
+    """Simplification tolerance per tier, 0.0 for the full-detail tier 0"""
+    extent = plan_extent(layers)
+    return [0.0] + [extent / resolution for resolution in resolutions]
+
+
+def simplify_layers(layers: PlanLayers, tolerance: float) -> PlanLayers:
+    """
+    Simplify every polygon within tolerance without making it invalid
+    Polygons smaller than the tolerance in both directions are dropped, since
+    they cover less than a pixel at the zoom the tier is meant for
+    """
+    simplified = []
+    for layer in layers:
+        geoms = np.asarray([g for g in layer if g is not None and not g.is_empty], dtype=object)
+        if len(geoms) == 0:
+            simplified.append([])
+            continue
+
+        bounds = shapely.bounds(geoms)
+        visible = ((bounds[:, 2] - bounds[:, 0]) >= tolerance) | ((bounds[:, 3] - bounds[:, 1]) >= tolerance)
+        reduced = shapely.simplify(geoms[visible], tolerance, preserve_topology=True)
+        simplified.append([g for g in reduced if not g.is_empty])
+    return tuple(simplified)
+
+
+def build_lod_tiers(layers: PlanLayers,
+                    resolutions: Sequence[int] = LOD_RESOLUTIONS) -> List[Tuple[float, PlanLayers]]:
+    """(tolerance, layers) for each simplified tier, finest first; excludes tier 0"""
+    tiers = []
+    for tolerance in lod_tolerances(layers, resolutions)[1:]:
+        tiers.append((tolerance, simplify_layers(layers, tolerance)))
+
+    if tiers:
+        before = sum(len(shapely.get_coordinates(layer)) for layer in layers if layer)
+        after = sum(len(shapely.get_coordinates(layer)) for layer in tiers[-1][1] if layer)
+        logger.info(f"Built {len(tiers)} LOD tiers, coarsest keeps {after}/{before} vertices")
+    return tiers
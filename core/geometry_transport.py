@@ -0,0 +1,133 @@
+"""
+Binary Geometry Transport
+Packs polygon layers into flat Float32 coordinate buffers with ring and polygon offsets
+Lets the viewer skip nested GeoJSON lists and upload buffers straight to the GPU
+"""
+
+import json
+import logging
+import struct
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import shapely
+from shapely.geometry import MultiPolygon, Polygon
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPE = 'application/x-floorplan-geometry'
+MAGIC = b'FPG1'
+FORMAT_VERSION = 1
+
+
+@dataclass
+class GeometryPayload:
+    """
+    Response made of plain JSON fields plus polygon layers
+    records holds per-polygon attribute dicts for layers such as îlots and
+    corridors, aligned index for index with the layer's polygons
+    """
+    fields: Dict[str, Any]
+    layers: Dict[str, List[Polygon]]
+    records: Dict[str, List[Dict]] = field(default_factory=dict)
+
+    def pack(self) -> bytes:
+        return pack_geometry(self)
+
+
+def _layer_polygons(name: str, geometries: List, records: Dict[str, List[Dict]]) -> List[Polygon]:
+    """Polygons of a layer; attributed layers keep one polygon per record"""
+    if name in records:
+        polygons = []
+        for geometry in geometries:
+            if isinstance(geometry, MultiPolygon):
+                geometry = max(geometry.geoms, key=lambda part: part.area)
+            polygons.append(geometry if isinstance(geometry, Polygon) else Polygon())
+        return polygons
+
+    polygons = []
+    for geometry in geometries:
+        if geometry is None or geometry.is_empty:
+            continue
+        if isinstance(geometry, MultiPolygon):
+            polygons.extend(geometry.geoms)
+        elif isinstance(geometry, Polygon):
+            polygons.append(geometry)
+    return polygons
+
+
+def _ragged(polygons: List[Polygon]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Coordinates, ring offsets (in vertices) and polygon offsets (in rings)"""
+    if not polygons:
+        return np.empty((0, 2)), np.zeros(1, dtype=np.uint32), np.zeros(1, dtype=np.uint32)
+    _, coords, (ring_offsets, polygon_offsets) = shapely.to_ragged_array(polygons)
+    return coords, ring_offsets.astype(np.uint32), polygon_offsets.astype(np.uint32)
+
+
+def pack_geometry(payload: GeometryPayload) -> bytes:
+    """
+    Binary layout, little endian:
+        b'FPG1', uint32 header length, JSON header padded to 4 bytes, buffers
+    Each layer contributes float32 coords (x, y interleaved, relative to the
+    header origin), uint32 ring offsets and uint32 polygon offsets; the header
+    gives their byte offset into the buffer section and element count
+    """
+    packed = {name: _ragged(_layer_polygons(name, geometries, payload.records))
+              for name, geometries in payload.layers.items()}
+
+    # Float32 keeps millimetre precision only near the origin, so shift to it
+    all_coords = [coords for coords, _, _ in packed.values() if len(coords)]
+    origin = np.vstack(all_coords).min(axis=0) if all_coords else np.zeros(2)
+
+    buffers = []
+    offset = 0
+    layers = {}
+    for name, (coords, ring_offsets, polygon_offsets) in packed.items():
+        arrays = {
+            'coords': (coords - origin).astype('<f4').ravel(),
+            'rings': ring_offsets.astype('<u4'),
+            'polygons': polygon_offsets.astype('<u4')
+        }
+        layer = {'count': len(polygon_offsets) - 1}
+        for key, array in arrays.items():
+            layer[key] = [offset, int(array.size)]
+            buffers.append(array.tobytes())
+            offset += array.nbytes
+        layers[name] = layer
+
+    header = json.dumps({
+        'version': FORMAT_VERSION,
+        'origin': [float(origin[0]), float(origin[1])],
+        'layers': layers,
+        'records': payload.records,
+        'fields': payload.fields
+    }, separators=(',', ':')).encode('utf-8')
+    header += b' ' * (-len(header) % 4)
+
+    return b''.join([MAGIC, struct.pack('<I', len(header)), header] + buffers)
+
+
+def unpack_geometry(data: bytes) -> Tuple[Dict, Dict[str, List[List[np.ndarray]]]]:
+    """Header and, per layer, each polygon's rings as (n, 2) float64 arrays in plan coordinates"""
+    if data[:4] != MAGIC:
+        raise ValueError("Not a packed geometry payload")
+    (header_length,) = struct.unpack_from('<I', data, 4)
+    header = json.loads(data[8:8 + header_length])
+    base = 8 + header_length
+    origin = np.array(header['origin'])
+
+    def view(span, dtype):
+        start, count = span
+        return np.frombuffer(data, dtype=dtype, count=count, offset=base + start)
+
+    layers = {}
+    for name, layer in header['layers'].items():
+        coords = view(layer['coords'], '<f4').reshape(-1, 2).astype(float) + origin
+        rings = view(layer['rings'], '<u4')
+        polygons = view(layer['polygons'], '<u4')
+        layers[name] = [
+            [coords[rings[r]:rings[r + 1]] for r in range(polygons[p], polygons[p + 1])]
+            for p in range(layer['count'])
+        ]
+    return header, layers
@@ -5,6 +5,8 @@ import random
 from shapely.geometry import Polygon, box
 from shapely.ops import unary_union
 
+from core.placement_constraints import PlacementConstraints
+
 logger = logging.getLogger(__name__)
 
 import time
@@ -42,6 +44,8 @@ def generate_ilots(zones, bounds, config, forbidden_union, max_generations=30, p
                 'category': category
             })
     logger.info(f"[IlotOptimizer] Ilot specs generated: {len(ilot_specs)}")
+    # Prepare the forbidden union once; every candidate is tested against it
+    constraints = PlacementConstraints(forbidden_zones=forbidden_union)
 
     def random_chromosome():
         # Each gene is (x, y, rotation)
@@ -79,7 +83,7 @@ def generate_ilots(zones, bounds, config, forbidden_union, max_generations=30, p
         for i, ilot in enumerate(ilots):
             poly = ilot['polygon']
             # Check forbidden areas
-            if forbidden_union and poly.intersects(forbidden_union):
+            if constraints.hits_forbidden(poly):
                 continue
             # Check overlap with other ilots
             overlap = False
@@ -0,0 +1,140 @@
+"""
+In-Process Job Queue
+Runs long floor-plan jobs on a bounded thread pool and tracks their progress
+Versioned job state lets status polling and event streams wait for changes
+"""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+FINISHED = (DONE, FAILED)
+
+
+@dataclass
+class Job:
+    """State of one queued job"""
+    id: str
+    status: str = QUEUED
+    progress: Dict = field(default_factory=dict)
+    result: Any = None
+    error: str = ""
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    version: int = 0  # Bumped on every change
+
+    def to_dict(self, include_result: bool = True) -> Dict:
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'progress': dict(self.progress),
+            'error': self.error,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'version': self.version
+        }
+        if include_result and self.status == DONE:
+            data['result'] = self.result
+        return data
+
+
+class QueueFull(Exception):
+    """Raised when the queue already holds max_pending unfinished jobs"""
+
+
+class JobQueue:
+    """
+    Bounded in-process job queue, no outside broker
+    Jobs receive a progress callback; finished jobs are kept for
+    retention_seconds so clients can collect their result
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 16,
+                 retention_seconds: float = 3600):
+        """
+        Args:
+            max_workers: Jobs running at the same time
+            max_pending: Unfinished (queued or running) jobs accepted before submit refuses
+            retention_seconds: How long finished jobs stay queryable
+        """
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs: Dict[str, Job] = {}
+        self._changed = threading.Condition()
+
+    def submit(self, fn: Callable[[Callable[[Dict], None]], Any]) -> Job:
+        """
+        Queue fn(progress) and return its job right away
+        fn calls progress(dict) to publish progress; its return value becomes the result
+        """
+        with self._changed:
+            self._purge()
+            unfinished = sum(1 for job in self._jobs.values() if job.status not in FINISHED)
+            if unfinished >= self.max_pending:
+                raise QueueFull(f"{unfinished} jobs already pending")
+            job = Job(id=uuid.uuid4().hex)
+            self._jobs[job.id] = job
+
+        self._executor.submit(self._run, job, fn)
+        logger.info(f"Queued job {job.id}")
+        return job
+
+    def snapshot(self, job_id: str, include_result: bool = True) -> Optional[Dict]:
+        """Current job state as a dict, None for unknown jobs"""
+        with self._changed:
+            job = self._jobs.get(job_id)
+            return job.to_dict(include_result) if job else None
+
+    def wait(self, job_id: str, version: int, timeout: float,
+             include_result: bool = False) -> Optional[Dict]:
+        """Block until the job changes past version or timeout expires, then snapshot it"""
+        deadline = time.time() + timeout
+        with self._changed:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return None
+                remaining = deadline - time.time()
+                if job.version > version or remaining <= 0:
+                    return job.to_dict(include_result)
+                self._changed.wait(remaining)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: Job, fn: Callable):
+        self._update(job, status=RUNNING)
+        try:
+            result = fn(lambda progress: self._update(job, progress=progress))
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}", exc_info=True)
+            self._update(job, status=FAILED, error=str(e))
+        else:
+            self._update(job, status=DONE, result=result)
+            logger.info(f"Job {job.id} finished")
+
+    def _update(self, job: Job, **changes):
+        with self._changed:
+            for name, value in changes.items():
+                setattr(job, name, value)
+            job.version += 1
+            job.updated_at = time.time()
+            self._changed.notify_all()
+
+    def _purge(self):
+        """Drop finished jobs past their retention"""
+        cutoff = time.time() - self.retention_seconds
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.status in FINISHED and job.updated_at < cutoff]:
+            del self._jobs[job_id]
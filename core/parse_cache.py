@@ -0,0 +1,199 @@
+"""
+Content-Addressed Parse Cache
+Stores parsed CAD zones as WKB on disk, keyed by file content and parser settings
+Display LOD tiers live beside their parse; LRU eviction under a total size cap
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import numpy as np
+import shapely
+from typing import List, Tuple, Optional, Dict
+from shapely.geometry import Polygon
+
+logger = logging.getLogger(__name__)
+
+LAYERS = ('walls', 'restricted_areas', 'entrances', 'open_spaces')
+
+
+class ParseCache:
+    """
+    On-disk cache of ProductionCADParser.parse_dxf results
+    One .npz file per entry; file mtime doubles as the LRU access time
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Args:
+            cache_dir: Cache directory (default: $PARSE_CACHE_DIR or a temp subdirectory)
+            max_bytes: Total size cap; least recently used entries are evicted past it
+        """
+        self.cache_dir = cache_dir or os.getenv(
+            'PARSE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'ilot_parse_cache')
+        )
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # (path, size, mtime) -> content digest, so unchanged files are hashed once
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+
+    def file_digest(self, file_path: str) -> str:
+        """SHA-256 of the file content"""
+        stat = os.stat(file_path)
+        memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+        digest = self._digests.get(memo_key)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    sha.update(block)
+            digest = sha.hexdigest()
+            self._digests[memo_key] = digest
+        return digest
+
+    def make_key(self, file_path: str, **params) -> str:
+        """Cache key from the file content hash plus parser settings"""
+        settings = ';'.join(f"{name}={params[name]!r}" for name in sorted(params))
+        return hashlib.sha256(f"{self.file_digest(file_path)}|{settings}".encode()).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def _lod_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.lod.npz")
+
+    def get(self, key: str) -> Optional[Tuple[List[Polygon], ...]]:
+        """Return (walls, restricted_areas, entrances, open_spaces) or None on a miss"""
+        path = self._entry_path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                layers = decode_layers(data)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable parse cache entry {key}: {e}")
+            self._remove(path)
+            return None
+
+        # Touch for LRU ordering
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return layers
+
+    def put(self, key: str, walls: List[Polygon], restricted_areas: List[Polygon],
+            entrances: List[Polygon], open_spaces: List[Polygon]):
+        """Store a parse result and evict old entries past the size cap"""
+        arrays = encode_layers((walls, restricted_areas, entrances, open_spaces))
+        if self._write(self._entry_path(key), arrays):
+            self._evict()
+
+    def get_lods(self, key: str) -> Optional[List[Tuple[float, Tuple[List[Polygon], ...]]]]:
+        """Return the (tolerance, layers) LOD tiers stored for a parse, or None on a miss"""
+        path = self._lod_path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                tiers = [
+                    (float(tolerance), decode_layers(data, prefix=f"tier{n}_"))
+                    for n, tolerance in enumerate(data['tolerances'])
+                ]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable LOD cache entry {key}: {e}")
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return tiers
+
+    def put_lods(self, key: str, tiers: List[Tuple[float, Tuple[List[Polygon], ...]]]):
+        """Store LOD tiers for a parse and evict old entries past the size cap"""
+        arrays = {'tolerances': np.array([tolerance for tolerance, _ in tiers], dtype=float)}
+        for n, (_, layers) in enumerate(tiers):
+            arrays.update(encode_layers(layers, prefix=f"tier{n}_"))
+        if self._write(self._lod_path(key), arrays):
+            self._evict()
+
+    def _write(self, path: str, arrays: Dict[str, np.ndarray]) -> bool:
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, path)  # Atomic, safe across worker processes
+        except Exception as e:
+            logger.warning(f"Failed to write parse cache entry {os.path.basename(path)}: {e}")
+            return False
+        return True
+
+    def clear(self):
+        """Remove every cache entry"""
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.npz'):
+                self._remove(os.path.join(self.cache_dir, name))
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits max_bytes"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.npz'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _encode(geoms: List[Polygon]) -> Tuple[np.ndarray, np.ndarray]:
+        """Pack geometries into one WKB byte buffer plus end offsets"""
+        blobs = shapely.to_wkb(np.asarray(geoms, dtype=object)) if geoms else []
+        offsets = np.cumsum([len(b) for b in blobs], dtype=np.int64)
+        data = np.frombuffer(b''.join(blobs), dtype=np.uint8)
+        return data, offsets
+
+    @staticmethod
+    def _decode(data: np.ndarray, offsets: np.ndarray) -> List[Polygon]:
+        if len(offsets) == 0:
+            return []
+        raw = data.tobytes()
+        starts = np.concatenate(([0], offsets[:-1]))
+        blobs = [raw[s:e] for s, e in zip(starts.tolist(), offsets.tolist())]
+        return list(shapely.from_wkb(blobs))
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def encode_layers(layers, prefix: str = '') -> Dict[str, np.ndarray]:
+    """Pack (walls, restricted_areas, entrances, open_spaces) into np.savez-ready arrays"""
+    arrays = {}
+    for layer, geoms in zip(LAYERS, layers):
+        arrays[f"{prefix}{layer}_wkb"], arrays[f"{prefix}{layer}_offsets"] = ParseCache._encode(geoms)
+    return arrays
+
+
+def decode_layers(data, prefix: str = '') -> Tuple[List[Polygon], ...]:
+    """Inverse of encode_layers, from a loaded npz or dict of arrays"""
+    return tuple(
+        ParseCache._decode(data[f"{prefix}{layer}_wkb"], data[f"{prefix}{layer}_offsets"])
+        for layer in LAYERS
+    )
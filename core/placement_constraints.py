@@ -0,0 +1,74 @@
+"""
+Placement Constraints
+Shared constraint-checking layer for the îlot engines
+Holds prepared geometries for forbidden zones and open spaces
+"""
+
+import logging
+import numpy as np
+import shapely
+from typing import List, Optional
+from shapely.geometry import Polygon
+from shapely.prepared import prep
+
+from core.spatial_index import OpenSpaceIndex
+
+logger = logging.getLogger(__name__)
+
+
+class PlacementConstraints:
+    """
+    Prepared predicates for îlot placement
+    Build once per placement run, then query for every candidate
+    """
+
+    def __init__(self, open_spaces: Optional[List[Polygon]] = None,
+                 forbidden_zones: Optional[Polygon] = None):
+        """
+        Args:
+            open_spaces: Spaces îlots must lie within (None = unconstrained)
+            forbidden_zones: Union of areas îlots must not touch (None = none)
+        """
+        self.open_space_index = OpenSpaceIndex(open_spaces) if open_spaces else None
+
+        if forbidden_zones is not None and forbidden_zones.is_empty:
+            forbidden_zones = None
+        self.forbidden_zones = forbidden_zones
+        self._forbidden_prepared = prep(forbidden_zones) if forbidden_zones is not None else None
+
+    @property
+    def bounds(self):
+        """Bounds of all open spaces"""
+        return self.open_space_index.bounds
+
+    def in_open_space(self, geometry: Polygon) -> bool:
+        """True if a single open space fully contains the geometry"""
+        if self.open_space_index is None:
+            return True
+        return self.open_space_index.contains(geometry)
+
+    def in_space(self, space_idx: int, geometry: Polygon) -> bool:
+        """True if the open space at space_idx fully contains the geometry"""
+        return self.open_space_index.space_contains(space_idx, geometry)
+
+    def hits_forbidden(self, geometry: Polygon) -> bool:
+        """True if the geometry intersects any forbidden zone"""
+        if self._forbidden_prepared is None:
+            return False
+        return self._forbidden_prepared.intersects(geometry)
+
+    def in_open_space_many(self, geometries: np.ndarray) -> np.ndarray:
+        """Vectorized in_open_space over an array of geometries"""
+        if self.open_space_index is None:
+            return np.ones(len(geometries), dtype=bool)
+        return self.open_space_index.contains_many(geometries)
+
+    def hits_forbidden_many(self, geometries: np.ndarray) -> np.ndarray:
+        """Vectorized hits_forbidden over an array of geometries"""
+        if self.forbidden_zones is None:
+            return np.zeros(len(geometries), dtype=bool)
+        return shapely.intersects(self.forbidden_zones, geometries)
+
+    def is_allowed(self, geometry: Polygon) -> bool:
+        """Inside an open space and clear of every forbidden zone"""
+        return self.in_open_space(geometry) and not self.hits_forbidden(geometry)
@@ -0,0 +1,137 @@
+"""
+Plot Rendering Backend
+Switches finished Plotly floor-plan figures from SVG to WebGL by plan size
+Outlines and points become Scattergl traces, filled regions one raster image
+"""
+
+import logging
+import math
+import re
+from typing import List, Optional, Tuple
+
+import numpy as np
+import plotly.graph_objects as go
+from PIL import Image, ImageColor, ImageDraw
+
+logger = logging.getLogger(__name__)
+
+# Total scatter vertices above which a figure is switched to WebGL
+WEBGL_VERTEX_THRESHOLD = 20000
+
+# Longest side, in pixels, of the rasterized fill layer
+FILL_RASTER_RESOLUTION = 2048
+
+_RGBA = re.compile(r'rgba?\(\s*([\d.]+)\s*,\s*([\d.]+)\s*,\s*([\d.]+)\s*(?:,\s*([\d.]+)\s*)?\)')
+
+
+def scatter_vertex_count(fig: go.Figure) -> int:
+    """Points across all 2D scatter traces of a figure"""
+    return sum(len(trace.x) for trace in fig.data
+               if trace.type in ('scatter', 'scattergl') and trace.x is not None)
+
+
+def select_backend(fig: go.Figure, vertex_threshold: int = WEBGL_VERTEX_THRESHOLD,
+                   resolution: int = FILL_RASTER_RESOLUTION) -> str:
+    """
+    Keep small figures as SVG; above vertex_threshold rebuild every scatter
+    trace as Scattergl and paint their fills into a single layout image
+    below the traces (fills stop reacting to hover, outlines still do)
+    Returns the backend used, 'svg' or 'webgl'
+    """
+    vertices = scatter_vertex_count(fig)
+    if vertices <= vertex_threshold:
+        return 'svg'
+
+    fills = []
+    traces = []
+    for trace in fig.data:
+        if trace.type != 'scatter':
+            traces.append(trace)
+            continue
+
+        data = trace.to_plotly_json()
+        data.pop('type', None)
+        if data.pop('fill', None) == 'toself':
+            fills.append((data['x'], data['y'], data.pop('fillcolor', None) or _default_fill(data)))
+        else:
+            data.pop('fillcolor', None)
+        traces.append(go.Scattergl(data, skip_invalid=True))
+
+    fig.data = []
+    fig.add_traces(traces)
+
+    if fills:
+        try:
+            _add_fill_image(fig, fills, resolution)
+        except Exception as e:
+            logger.warning(f"Fill rasterization failed, fills omitted: {e}")
+
+    logger.info(f"Rendering {vertices} vertices with WebGL ({len(fills)} filled traces rasterized)")
+    return 'webgl'
+
+
+def _default_fill(data) -> str:
+    """Plotly's default toself fill: the line color at half opacity"""
+    color = (data.get('line') or {}).get('color') or (data.get('marker') or {}).get('color')
+    rgba = _parse_color(color if isinstance(color, str) else '#808080')
+    return f"rgba({rgba[0]}, {rgba[1]}, {rgba[2]}, 0.5)"
+
+
+def _parse_color(color: str) -> Tuple[int, int, int, int]:
+    """RGBA bytes from CSS colors as Plotly accepts them (hex, names, rgb(), rgba() with 0-1 alpha)"""
+    match = _RGBA.fullmatch(color.strip())
+    if match:
+        r, g, b, a = match.groups()
+        alpha = 1.0 if a is None else float(a)
+        return int(float(r)), int(float(g)), int(float(b)), int(round(alpha * 255))
+    rgb = ImageColor.getrgb(color)
+    return rgb if len(rgb) == 4 else rgb + (255,)
+
+
+def _rings(x, y) -> List[np.ndarray]:
+    """Split gap-separated (None/NaN) coordinates into (n, 2) rings"""
+    points = np.column_stack((np.asarray(x, dtype=float), np.asarray(y, dtype=float)))
+    gaps = np.isnan(points).any(axis=1)
+    bounds = np.flatnonzero(np.diff(np.concatenate(([True], gaps, [True])).astype(int)))
+    return [points[start:end] for start, end in zip(bounds[::2], bounds[1::2]) if end - start >= 3]
+
+
+def _add_fill_image(fig: go.Figure, fills: List, resolution: int):
+    """Rasterize fills in trace order into one RGBA image placed in data coordinates"""
+    fills = [(_rings(x, y), color) for x, y, color in fills]
+    all_points = [ring for rings, _ in fills for ring in rings]
+    if not all_points:
+        return
+    stacked = np.vstack(all_points)
+    min_x, min_y = stacked.min(axis=0)
+    max_x, max_y = stacked.max(axis=0)
+    span = max(max_x - min_x, max_y - min_y) or 1.0
+    scale = resolution / span
+    width = max(1, math.ceil((max_x - min_x) * scale))
+    height = max(1, math.ceil((max_y - min_y) * scale))
+
+    image = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    layer: Optional[Image.Image] = None
+    layer_color = None
+    for rings, color in fills:
+        # Consecutive fills of one color share a layer, so per-shape traces stay cheap
+        if color != layer_color:
+            if layer is not None:
+                image = Image.alpha_composite(image, layer)
+            layer = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(layer)
+            layer_color = color
+            rgba = _parse_color(color)
+        for ring in rings:
+            pixels = np.column_stack(((ring[:, 0] - min_x) * scale, (max_y - ring[:, 1]) * scale))
+            draw.polygon([tuple(p) for p in pixels], fill=rgba)
+    image = Image.alpha_composite(image, layer)
+
+    fig.add_layout_image(
+        source=image,
+        xref='x', yref='y',
+        x=min_x, y=max_y,
+        sizex=max_x - min_x or span, sizey=max_y - min_y or span,
+        sizing='stretch',
+        layer='below'
+    )
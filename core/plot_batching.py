@@ -0,0 +1,61 @@
+"""
+Batched Plot Geometry
+Flattens whole geometry layers into single-trace Plotly coordinate arrays
+Rings are joined by gaps so trace count follows layers, not polygons
+"""
+
+import logging
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import shapely
+
+logger = logging.getLogger(__name__)
+
+
+def batched_outline(geometries: Sequence, values: Optional[Sequence] = None) -> Dict[str, np.ndarray]:
+    """
+    x/y arrays of every outline in a layer, one gap (NaN, sent to Plotly as
+    null) after each ring; polygons contribute their exterior ring, lines
+    their own coordinates and multi-part geometries every part
+
+    values: optional per-geometry hover data (scalars or rows); returned as
+    per-point customdata aligned with x/y, NaN at the gaps
+    Returns keyword arguments for go.Scatter
+    """
+    geoms = np.empty(len(geometries), dtype=object)
+    geoms[:] = list(geometries)
+    present = np.array([g is not None for g in geoms], dtype=bool)
+
+    parts, part_source = shapely.get_parts(geoms[present], return_index=True)
+    part_source = np.flatnonzero(present)[part_source]
+
+    rings = shapely.get_exterior_ring(parts)
+    is_line = rings == None  # noqa: E711 - elementwise test for non-polygon parts
+    rings[is_line] = parts[is_line]
+
+    coords, ring_index = shapely.get_coordinates(rings, return_index=True)
+
+    # Point k lands after the ring_index[k] gaps that precede its ring
+    size = len(coords) + len(rings)
+    positions = np.arange(len(coords)) + ring_index
+    x = np.full(size, np.nan)
+    y = np.full(size, np.nan)
+    x[positions] = coords[:, 0]
+    y[positions] = coords[:, 1]
+
+    trace = {'x': x, 'y': y}
+    if values is not None:
+        values = np.asarray(values, dtype=float)
+        customdata = np.full((size,) + values.shape[1:], np.nan)
+        customdata[positions] = values[part_source[ring_index]]
+        trace['customdata'] = customdata
+    return trace
+
+
+def group_indices(keys: Sequence) -> Dict[object, List[int]]:
+    """Indices of equal keys, in first-seen order, for one trace per group"""
+    groups: Dict[object, List[int]] = {}
+    for index, key in enumerate(keys):
+        groups.setdefault(key, []).append(index)
+    return groups
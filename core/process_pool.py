@@ -0,0 +1,26 @@
+"""
+Process Pool Start-Up
+Process pools for CPU-bound geometry work, started without forking the caller
+The viewer and Streamlit run them from threads, where fork copies held locks
+"""
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.context import BaseContext
+
+logger = logging.getLogger(__name__)
+
+
+def pool_context() -> BaseContext:
+    """forkserver where the platform has it, else spawn; never fork"""
+    start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(start_method)
+
+
+def process_pool(max_workers: int, **kwargs) -> ProcessPoolExecutor:
+    """
+    ProcessPoolExecutor on pool_context(); initializer arguments and tasks
+    must be picklable, since workers start from a fresh interpreter
+    """
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=pool_context(), **kwargs)
@@ -6,13 +6,26 @@ NO SIMULATIONS - Only real CAD data processing
 
 import ezdxf
 import logging
+import os
 import numpy as np
+import shapely
+from collections import deque
+from ezdxf.addons import iterdxf
+from ezdxf.filemanagement import dxf_file_info
+from ezdxf.lldxf.validator import is_binary_dxf_file
 from shapely.geometry import Polygon, LineString, Point, MultiPolygon
 from shapely.ops import unary_union
-from typing import List, Tuple, Optional, Dict, Any
+from shapely.strtree import STRtree
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+from typing import List, Tuple, Optional, Dict, Any, Iterator
 from dataclasses import dataclass
 from enum import Enum
 
+from core.parse_cache import ParseCache
+from core.process_pool import process_pool
+
 logger = logging.getLogger(__name__)
 
 
@@ -56,47 +69,104 @@ class ProductionCADParser:
         256: ZoneType.WALL,        # BYLAYER (default to wall)
     }
     
-    def __init__(self, wall_thickness: float = 0.25):
+    # Entity types with a geometry extractor
+    SUPPORTED_ENTITY_TYPES = (
+        'LWPOLYLINE', 'POLYLINE', 'LINE', 'ARC', 'CIRCLE',
+        'SPLINE', 'ELLIPSE', 'HATCH', 'SOLID', '3DFACE',
+    )
+    
+    def __init__(self, wall_thickness: float = 0.25, cache: Optional[ParseCache] = None,
+                 streaming: Optional[bool] = None, workers: int = 1):
         self.wall_buffer = wall_thickness  # User-configurable wall thickness (default 25cm)
         self.min_area_threshold = 0.1  # Minimum 0.1m² area
         self.entrance_buffer = 0.2  # 20cm clearance around entrances
+        self.cache = cache  # Optional content-addressed parse cache
+        
+        # Streaming mode reads modelspace entities from disk in chunks instead of
+        # loading the whole document. None = automatic, based on file size.
+        self.streaming = streaming
+        self.streaming_threshold_bytes = 50 * 1024 * 1024  # 50 MB
+        self.chunk_size = 2000  # Entities converted per chunk
+        
+        # Processes for entity-to-geometry conversion (1 = serial). Parallel
+        # extraction always streams, since document-bound entities cannot be sent
+        # to workers cheaply.
+        self.workers = max(1, int(workers))
+        
+        # Tiled open-space computation for obstacle-heavy plans. Obstacles are
+        # unioned and subtracted per tile, then pieces touching tile seams are
+        # merged. A non-zero tile_tolerance snaps seam pieces to a grid of that
+        # size (meters) before merging; 0 merges them exactly.
+        self.tile_size: Optional[float] = None  # None = automatic
+        self.obstacles_per_tile = 2000  # Target density for automatic tile size
+        self.tile_tolerance = 0.0
+        
+        # LINE walls are snapped, merged into polylines and buffered once per
+        # polyline instead of once per segment
+        self.merge_lines = True
+        self.line_snap_tolerance = 0.001  # Endpoint snapping / collinearity tolerance (meters)
         
     def parse_dxf(self, file_path: str) -> Tuple[List[Polygon], List[Polygon], List[Polygon], List[Polygon]]:
         """
         Parse DXF file and extract zones by type
+        Served from the parse cache when the same content was parsed with the same settings
         Returns: (walls, restricted_areas, entrances, open_spaces)
         """
-        try:
-            doc = ezdxf.readfile(file_path)
-        except Exception as e:
-            logger.error(f"Failed to read DXF file: {e}")
-            raise ValueError(f"Invalid DXF file: {e}")
-        
-        msp = doc.modelspace()
+        cache_key = None
+        if self.cache is not None:
+            try:
+                cache_key = self.cache_key(file_path)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"Parse cache hit for {file_path}")
+                    return cached
+            except OSError as e:
+                logger.warning(f"Parse cache unavailable for {file_path}: {e}")
         
-        # Extract all entities
-        raw_zones = []
-        for entity in msp:
-            zones = self._extract_entity_zones(entity)
-            raw_zones.extend(zones)
+        result = self._parse_dxf_uncached(file_path)
         
-        logger.info(f"Extracted {len(raw_zones)} raw zones from {file_path}")
+        if cache_key is not None:
+            self.cache.put(cache_key, *result)
         
-        # Classify and organize zones
+        return result
+    
+    def cache_key(self, file_path: str) -> str:
+        """Parse cache key for the file content under the current parser settings"""
+        return self.cache.make_key(
+            file_path,
+            wall_thickness=self.wall_buffer,
+            entrance_buffer=self.entrance_buffer,
+            min_area_threshold=self.min_area_threshold,
+            tile_size=self.tile_size,
+            tile_tolerance=self.tile_tolerance,
+            merge_lines=self.merge_lines,
+            line_snap_tolerance=self.line_snap_tolerance
+        )
+    
+    def _parse_dxf_uncached(self, file_path: str) -> Tuple[List[Polygon], List[Polygon], List[Polygon], List[Polygon]]:
+        """Read the DXF and extract zones, bypassing the cache"""
         walls = []
         restricted_areas = []
         entrances = []
         potential_spaces = []
-        
-        for zone in raw_zones:
-            if zone.zone_type == ZoneType.WALL:
-                walls.append(zone.polygon)
-            elif zone.zone_type == ZoneType.RESTRICTED:
-                restricted_areas.append(zone.polygon)
-            elif zone.zone_type == ZoneType.ENTRANCE:
-                entrances.append(zone.polygon)
-            else:
-                potential_spaces.append(zone.polygon)
+        num_zones = 0
+        
+        # Entities are converted chunk by chunk; only the resulting polygons are kept
+        for batch in self._iter_zone_batches(file_path):
+            for zone_type, polygon in batch:
+                num_zones += 1
+                
+                # Classify and organize zones
+                if zone_type == ZoneType.WALL:
+                    walls.append(polygon)
+                elif zone_type == ZoneType.RESTRICTED:
+                    restricted_areas.append(polygon)
+                elif zone_type == ZoneType.ENTRANCE:
+                    entrances.append(polygon)
+                else:
+                    potential_spaces.append(polygon)
+        
+        logger.info(f"Extracted {num_zones} raw zones from {file_path}")
         
         # Calculate open spaces (areas NOT occupied by walls/restricted/entrances)
         open_spaces = self._calculate_open_spaces(walls, restricted_areas, entrances, potential_spaces)
@@ -106,14 +176,230 @@ class ProductionCADParser:
         
         return walls, restricted_areas, entrances, open_spaces
     
+    def _use_streaming(self, file_path: str) -> bool:
+        """Decide between streaming and in-memory reading"""
+        if self.streaming is False:
+            return False
+        if self.streaming is None:
+            try:
+                if os.path.getsize(file_path) < self.streaming_threshold_bytes:
+                    return False
+            except OSError:
+                return False
+        
+        if not self._streamable(file_path):
+            logger.info(f"{file_path} is binary or older than R2000, reading it in memory")
+            return False
+        return True
+    
+    @staticmethod
+    def _streamable(file_path: str) -> bool:
+        """iterdxf only reads ASCII DXF from R2000 (AC1015) on"""
+        try:
+            if is_binary_dxf_file(file_path):
+                return False
+            return dxf_file_info(file_path).version >= 'AC1015'
+        except Exception as e:
+            logger.debug(f"Could not read DXF header of {file_path}: {e}")
+            return False
+    
+    def _iter_zone_batches(self, file_path: str) -> Iterator[List[Tuple[ZoneType, Polygon]]]:
+        """
+        Yield classified (zone_type, polygon) batches in entity order
+        Mergeable LINE walls are held back and yielded as a final merged batch
+        """
+        line_segments = {} if self.merge_lines else None
+        
+        if self.workers > 1 and self._streamable(file_path):
+            yield from self._iter_zone_batches_parallel(file_path, line_segments)
+        else:
+            for chunk in self._iter_entity_chunks(file_path):
+                yield self._convert_chunk(chunk, line_segments)
+        
+        if line_segments:
+            yield self._merge_line_walls(line_segments)
+    
+    def _convert_chunk(self, entities: List,
+                       line_segments: Optional[Dict[Tuple, List]]) -> List[Tuple[ZoneType, Polygon]]:
+        """Convert a chunk of entities, collecting mergeable LINE segments on the side"""
+        batch = []
+        for entity in entities:
+            if line_segments is not None and self._collect_line_segment(entity, line_segments):
+                continue
+            for zone in self._extract_entity_zones(entity):
+                batch.append((zone.zone_type, zone.polygon))
+        return batch
+    
+    def _iter_zone_batches_parallel(self, file_path: str,
+                                    line_segments: Optional[Dict[Tuple, List]]) -> Iterator[List[Tuple[ZoneType, Polygon]]]:
+        """
+        Convert contiguous entity ranges in a process pool
+        Workers classify and return WKB; results are yielded in the original order
+        and at most two chunks per worker are in flight at any time
+        """
+        chunks = self._chunked(self._iter_streamed_entities(file_path))
+        settings = {
+            'wall_buffer': self.wall_buffer,
+            'min_area_threshold': self.min_area_threshold,
+            'entrance_buffer': self.entrance_buffer,
+            'merge_lines': line_segments is not None,
+        }
+        
+        def collect(result):
+            batch, segments = result
+            for key, segs in segments.items():
+                line_segments.setdefault(key, []).extend(segs)
+            return self._decode_zone_batch(batch)
+        
+        with process_pool(self.workers, initializer=_init_extraction_worker,
+                          initargs=(settings,)) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_extract_chunk_zones, chunk))
+                if len(pending) >= self.workers * 2:
+                    yield collect(pending.popleft().result())
+            while pending:
+                yield collect(pending.popleft().result())
+    
+    @staticmethod
+    def _decode_zone_batch(batch: List[Tuple[str, bytes]]) -> List[Tuple[ZoneType, Polygon]]:
+        """Turn a worker's (zone type value, WKB) batch back into polygons"""
+        if not batch:
+            return []
+        polygons = shapely.from_wkb([wkb for _, wkb in batch])
+        return [(ZoneType(value), poly) for (value, _), poly in zip(batch, polygons)]
+    
+    def _collect_line_segment(self, entity, line_segments: Dict[Tuple, List]) -> bool:
+        """
+        Hold back a LINE for merging, grouped by layer and colour
+        Lines whose classification depends on their area keep the per-entity path,
+        since merging would change that area
+        """
+        if entity.dxftype() != 'LINE':
+            return False
+        
+        try:
+            layer, color, true_color = self._entity_style(entity)
+            zone_types = {self._classify_zone(color, true_color, layer, area) for area in (1.0, 50.0, 150.0)}
+            if len(zone_types) > 1:
+                return False
+            
+            start = entity.dxf.start
+            end = entity.dxf.end
+            line_segments.setdefault((layer, color, true_color), []).append(
+                (start[0], start[1], end[0], end[1])
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to collect LINE for merging: {e}")
+            return False
+    
+    def _merge_line_walls(self, line_segments: Dict[Tuple, List]) -> List[Tuple[ZoneType, Polygon]]:
+        """
+        Snap, merge and buffer collected LINE segments
+        Touching segments are chained into polylines, collinear vertices dropped,
+        and each polyline is buffered once
+        """
+        batch = []
+        num_segments = 0
+        
+        for (layer, color, true_color), segments in line_segments.items():
+            num_segments += len(segments)
+            
+            points = self._snap_points(np.asarray(segments, dtype=float).reshape(-1, 2))
+            lines = shapely.linestrings(points.reshape(-1, 2, 2))
+            lines = lines[shapely.length(lines) > 0]
+            if len(lines) == 0:
+                continue
+            
+            # Node and dissolve overlaps, then chain segments meeting at degree-2 nodes
+            merged = shapely.line_merge(shapely.union_all(lines))
+            polylines = shapely.simplify(shapely.get_parts(merged), self.line_snap_tolerance)
+            
+            for poly in shapely.buffer(polylines, self.wall_buffer):
+                if poly.is_valid and poly.area >= self.min_area_threshold:
+                    zone_type = self._classify_zone(color, true_color, layer, poly.area)
+                    batch.append((zone_type, poly))
+        
+        logger.info(f"Merged {num_segments} LINE segments into {len(batch)} wall polygons")
+        return batch
+    
+    def _snap_points(self, points: np.ndarray) -> np.ndarray:
+        """Move points closer than line_snap_tolerance onto a shared location"""
+        if len(points) < 2 or self.line_snap_tolerance <= 0:
+            return points
+        
+        pairs = cKDTree(points).query_pairs(self.line_snap_tolerance, output_type='ndarray')
+        if len(pairs) == 0:
+            return points
+        
+        adjacency = coo_matrix(
+            (np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])),
+            shape=(len(points), len(points))
+        )
+        _, labels = connected_components(adjacency, directed=False)
+        
+        # Each cluster collapses onto its first point
+        first = np.full(labels.max() + 1, -1)
+        for idx, label in enumerate(labels):
+            if first[label] < 0:
+                first[label] = idx
+        return points[first[labels]]
+    
+    def _iter_entity_chunks(self, file_path: str) -> Iterator[List]:
+        """Yield modelspace entities in chunks of at most chunk_size"""
+        if self._use_streaming(file_path):
+            entities = self._iter_streamed_entities(file_path)
+        else:
+            entities = self._read_entities(file_path)
+        
+        yield from self._chunked(entities)
+    
+    def _read_entities(self, file_path: str) -> Iterator:
+        """Load the whole document with ezdxf.readfile and iterate its modelspace"""
+        try:
+            doc = ezdxf.readfile(file_path)
+        except Exception as e:
+            logger.error(f"Failed to read DXF file: {e}")
+            raise ValueError(f"Invalid DXF file: {e}")
+        return iter(doc.modelspace())
+    
+    def _chunked(self, entities: Iterator) -> Iterator[List]:
+        """Group an entity iterator into lists of at most chunk_size"""
+        chunk = []
+        for entity in entities:
+            chunk.append(entity)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    
+    def _iter_streamed_entities(self, file_path: str) -> Iterator:
+        """Iterate modelspace entities straight from disk with ezdxf's iterdxf add-on"""
+        try:
+            doc = iterdxf.opendxf(file_path)
+        except Exception as e:
+            # Anything ezdxf.readfile can parse should still load, just in memory
+            logger.warning(f"Cannot stream DXF file, reading it in memory: {e}")
+            yield from self._read_entities(file_path)
+            return
+        
+        logger.info(f"Streaming entities from {file_path}")
+        try:
+            yield from doc.modelspace(types=self.SUPPORTED_ENTITY_TYPES)
+        except Exception as e:
+            logger.error(f"Failed to stream DXF file: {e}")
+            raise ValueError(f"Invalid DXF file: {e}")
+        finally:
+            doc.close()
+    
     def _extract_entity_zones(self, entity) -> List[CADZone]:
         """Extract zones from any CAD entity type"""
         entity_type = entity.dxftype()
         
         # Get entity properties
-        layer = getattr(entity.dxf, 'layer', '0')
-        color = getattr(entity.dxf, 'color', 7)
-        true_color = getattr(entity.dxf, 'true_color', None) if hasattr(entity.dxf, 'true_color') else None
+        layer, color, true_color = self._entity_style(entity)
         
         # Extract geometry based on entity type
         polygons = []
@@ -151,6 +437,13 @@ class ProductionCADParser:
         
         return zones
     
+    def _entity_style(self, entity) -> Tuple[str, int, Optional[int]]:
+        """Layer, ACI colour and true colour of an entity"""
+        layer = getattr(entity.dxf, 'layer', '0')
+        color = getattr(entity.dxf, 'color', 7)
+        true_color = getattr(entity.dxf, 'true_color', None) if hasattr(entity.dxf, 'true_color') else None
+        return layer, color, true_color
+    
     def _extract_lwpolyline(self, entity) -> List[Polygon]:
         """Extract polygon from LWPOLYLINE"""
         try:
@@ -393,8 +686,14 @@ class ProductionCADParser:
         # Union all obstacles
         if obstacles:
             try:
-                obstacle_union = unary_union(obstacles)
-                remaining_space = floor_area.difference(obstacle_union)
+                tile_size = self._open_space_tile_size(obstacles, (min_x, min_y, max_x, max_y))
+                if tile_size:
+                    remaining_space = self._tiled_difference(
+                        (min_x, min_y, max_x, max_y), obstacles, tile_size
+                    )
+                else:
+                    obstacle_union = unary_union(obstacles)
+                    remaining_space = floor_area.difference(obstacle_union)
             except Exception as e:
                 logger.error(f"Failed to calculate open spaces: {e}")
                 return []
@@ -413,3 +712,115 @@ class ProductionCADParser:
         
         logger.info(f"Calculated {len(open_spaces)} open spaces for îlot placement")
         return open_spaces
+    
+    def _open_space_tile_size(self, obstacles: List[Polygon],
+                              bounds: Tuple[float, float, float, float]) -> Optional[float]:
+        """Tile edge length for the open-space computation, or None for a single union"""
+        if self.tile_size:
+            return self.tile_size
+        
+        tiles_per_axis = int(np.ceil(np.sqrt(len(obstacles) / self.obstacles_per_tile)))
+        if tiles_per_axis <= 1:
+            return None
+        
+        min_x, min_y, max_x, max_y = bounds
+        return max(max_x - min_x, max_y - min_y) / tiles_per_axis
+    
+    def _tiled_difference(self, bounds: Tuple[float, float, float, float],
+                          obstacles: List[Polygon], tile_size: float):
+        """
+        Floor area minus obstacles, computed tile by tile
+        Each tile only unions the obstacles that touch it; tiles run in parallel
+        when workers > 1. Only pieces touching a seam are re-unioned.
+        """
+        min_x, min_y, max_x, max_y = bounds
+        xs = list(np.arange(min_x, max_x, tile_size)) + [max_x]
+        ys = list(np.arange(min_y, max_y, tile_size)) + [max_y]
+        
+        obstacle_array = np.asarray(obstacles, dtype=object)
+        tree = STRtree(obstacle_array)
+        
+        tiles = []
+        for x0, x1 in zip(xs[:-1], xs[1:]):
+            for y0, y1 in zip(ys[:-1], ys[1:]):
+                if x1 - x0 > 0 and y1 - y0 > 0:
+                    tile = Polygon([(x0, y0), (x1, y0), (x1, y1), (x0, y1)])
+                    tiles.append((tile, tree.query(tile)))
+        
+        logger.info(f"Computing open spaces over {len(tiles)} tiles "
+                   f"({len(obstacles)} obstacles, tile size {tile_size:.1f}m)")
+        
+        if self.workers > 1 and len(tiles) > 1:
+            jobs = [
+                (shapely.to_wkb(tile), shapely.to_wkb(obstacle_array[idx]))
+                for tile, idx in tiles
+            ]
+            with process_pool(self.workers) as executor:
+                pieces = list(shapely.from_wkb(list(executor.map(_subtract_tile_obstacles, jobs))))
+        else:
+            pieces = [
+                _tile_difference(tile, obstacle_array[idx])
+                for tile, idx in tiles
+            ]
+        
+        # Stitch: pieces away from the seams are final, the rest are merged
+        seam_xs = np.array(xs[1:-1])
+        seam_ys = np.array(ys[1:-1])
+        margin = self.tile_tolerance
+        interior, seam = [], []
+        for piece in pieces:
+            for poly in getattr(piece, 'geoms', [piece]):
+                if poly.is_empty or poly.geom_type != 'Polygon':
+                    continue
+                px0, py0, px1, py1 = poly.bounds
+                touches_seam = (
+                    np.any((seam_xs >= px0 - margin) & (seam_xs <= px1 + margin)) or
+                    np.any((seam_ys >= py0 - margin) & (seam_ys <= py1 + margin))
+                )
+                (seam if touches_seam else interior).append(poly)
+        
+        if seam:
+            merged = shapely.union_all(seam, grid_size=self.tile_tolerance or None)
+            interior.extend(getattr(merged, 'geoms', [merged]))
+        
+        return MultiPolygon([poly for poly in interior if poly.geom_type == 'Polygon'])
+
+
+# Per-process parser used by parallel extraction workers
+_worker_parser: Optional[ProductionCADParser] = None
+
+
+def _init_extraction_worker(settings: Dict[str, float]):
+    """Create the worker's parser with the parent's settings"""
+    global _worker_parser
+    _worker_parser = ProductionCADParser(wall_thickness=settings['wall_buffer'])
+    _worker_parser.min_area_threshold = settings['min_area_threshold']
+    _worker_parser.entrance_buffer = settings['entrance_buffer']
+    _worker_parser.merge_lines = settings['merge_lines']
+
+
+def _extract_chunk_zones(entities: List) -> Tuple[List[Tuple[str, bytes]], Dict[Tuple, List]]:
+    """
+    Convert and classify a chunk of entities
+    Returns (zone type value, WKB) pairs plus the LINE segments held back for merging
+    """
+    line_segments = {} if _worker_parser.merge_lines else None
+    batch = [
+        (zone_type.value, shapely.to_wkb(polygon))
+        for zone_type, polygon in _worker_parser._convert_chunk(entities, line_segments)
+    ]
+    return batch, line_segments or {}
+
+
+def _tile_difference(tile: Polygon, tile_obstacles) -> Polygon:
+    """Tile area minus the union of the obstacles touching it"""
+    if len(tile_obstacles) == 0:
+        return tile
+    return tile.difference(unary_union(tile_obstacles))
+
+
+def _subtract_tile_obstacles(job: Tuple[bytes, Any]) -> bytes:
+    """Worker entry point for one open-space tile, WKB in and out"""
+    tile_wkb, obstacles_wkb = job
+    tile = shapely.from_wkb(tile_wkb)
+    return shapely.to_wkb(_tile_difference(tile, shapely.from_wkb(obstacles_wkb)))
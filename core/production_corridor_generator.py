@@ -6,12 +6,15 @@ NO SIMULATIONS - Real geometric algorithms only
 
 import logging
 import numpy as np
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Iterable
 from dataclasses import dataclass
 from shapely.geometry import Polygon, box, LineString, Point
 from shapely.ops import unary_union
+from shapely.prepared import prep
 from scipy.cluster.hierarchy import fclusterdata
 
+from core.spatial_index import IntervalIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,6 +34,15 @@ class Corridor:
         return self.polygon.area
 
 
+@dataclass
+class CorridorDelta:
+    """Changes to the corridor network after an incremental update"""
+    added: List[Corridor]
+    updated: List[Corridor]  # Kept corridors whose row indices shifted
+    removed: List[int]  # Corridor ids
+    corridors: List[Corridor]  # Full network after the update
+
+
 class ProductionCorridorGenerator:
     """
     Production-grade corridor generator
@@ -49,6 +61,21 @@ class ProductionCorridorGenerator:
         self.corridor_width = corridor_width
         self.min_corridor_length = min_corridor_length
         self.row_tolerance = 3.0  # Distance tolerance for grouping îlots into rows
+        # 'ward' (scipy clustering, O(n²) memory) or opt-in 'sweep' (O(n log n));
+        # sweep chains îlots whose Y-intervals overlap, so its rows differ from Ward's
+        self.row_method = 'ward'
+        
+        # State from the last run, for incremental updates
+        self._ilots: Dict[int, object] = {}
+        self._open_spaces: List[Polygon] = []
+        self._row_clusters: List[List] = []
+        self._pair_results: Dict[Tuple[Tuple[int, ...], Tuple[int, ...]], Optional[Corridor]] = {}
+        self._corridors: List[Corridor] = []
+        self._next_corridor_id = 0
+        
+        # Y-interval index over row clusters, X-interval index per row; set while connecting rows
+        self._row_index: Optional[IntervalIndex] = None
+        self._row_x_indexes: List[IntervalIndex] = []
         
     def generate_corridors(self, ilots: List, open_spaces: List[Polygon]) -> List[Corridor]:
         """
@@ -63,12 +90,22 @@ class ProductionCorridorGenerator:
         """
         logger.info(f"Generating corridors for {len(ilots)} îlots")
         
+        self._ilots = {ilot.id: ilot for ilot in ilots}
+        self._open_spaces = list(open_spaces)
+        self._row_clusters = []
+        self._pair_results = {}
+        self._corridors = []
+        self._next_corridor_id = 0
+        
+        # Step 1: Group îlots into rows; kept even for small layouts, so later
+        # updates start from clusters covering every îlot
+        self._row_clusters = self._cluster_rows(ilots)
+        
         if len(ilots) < 4:
             logger.warning("Not enough îlots to create meaningful corridors")
             return []
         
-        # Step 1: Group îlots into rows
-        rows = self._group_ilots_into_rows(ilots)
+        rows = self._valid_rows(self._row_clusters)
         logger.info(f"Identified {len(rows)} rows of îlots")
         
         if len(rows) < 2:
@@ -76,29 +113,270 @@ class ProductionCorridorGenerator:
             return []
         
         # Step 2: Generate corridors between adjacent rows
+        corridors = self._connect_rows(rows)
+        
+        logger.info(f"Generated {len(corridors)} corridors")
+        return corridors
+    
+    def update_corridors(self, moved: Iterable = (), added: Iterable = (),
+                         removed: Iterable[int] = ()) -> CorridorDelta:
+        """
+        Incrementally update the network from the last generate_corridors call
+        With row_method='sweep' only rows near the edited îlots are re-clustered
+        (Ward re-clusters all îlots); only corridors whose row pair or
+        surroundings changed are recomputed
+        
+        Args:
+            moved: PlacedIlot objects at their new position (matched by id)
+            added: New PlacedIlot objects
+            removed: Ids of deleted îlots
+            
+        Returns:
+            CorridorDelta describing the changes
+            
+        Raises:
+            ValueError: If an added îlot reuses an existing or repeated id
+        """
+        moved = [ilot for ilot in moved if ilot.id in self._ilots]
+        added = list(added)
+        removed = [ilot_id for ilot_id in removed if ilot_id in self._ilots]
+        
+        added_ids = [ilot.id for ilot in added]
+        duplicates = sorted({ilot_id for ilot_id in added_ids
+                             if ilot_id in self._ilots or added_ids.count(ilot_id) > 1})
+        if duplicates:
+            raise ValueError(f"Added îlot ids already in use: {duplicates}")
+        logger.info(f"Updating corridors: {len(moved)} moved, {len(added)} added, {len(removed)} removed")
+        
+        # Footprints before and after the edit
+        changed_ids = {ilot.id for ilot in moved} | set(removed)
+        footprints = [self._ilots[ilot_id].polygon for ilot_id in changed_ids]
+        footprints.extend(ilot.polygon for ilot in moved + added)
+        
+        for ilot_id in removed:
+            del self._ilots[ilot_id]
+        for ilot in moved + added:
+            self._ilots[ilot.id] = ilot
+        
+        # Re-cluster the rows holding edited îlots or lying near their new position
+        new_ys = [ilot.position[1] for ilot in moved + added]
+        affected = []
+        kept = []
+        for cluster in self._row_clusters:
+            ys = [ilot.position[1] for ilot in cluster]
+            low, high = min(ys) - self.row_tolerance, max(ys) + self.row_tolerance
+            if any(ilot.id in changed_ids for ilot in cluster) or any(low <= y <= high for y in new_ys):
+                affected.append(cluster)
+            else:
+                kept.append(cluster)
+        
+        pool = {ilot.id: self._ilots[ilot.id] for cluster in affected for ilot in cluster
+                if ilot.id in self._ilots}
+        pool.update((ilot.id, ilot) for ilot in moved + added)
+        
+        # A sweep row only chains to îlots whose center lies within row_tolerance,
+        # so kept clusters that close to the pool may merge or split with it
+        # (e.g. once a row's first îlot is removed); pull them in until a wider
+        # gap separates the pool from every kept cluster
+        while kept and pool:
+            pool_ys = np.sort([ilot.position[1] for ilot in pool.values()])
+            padded = np.concatenate(([-np.inf], pool_ys, [np.inf]))
+            joining = []
+            for cluster in kept:
+                ys = np.array([ilot.position[1] for ilot in cluster])
+                slot = np.searchsorted(pool_ys, ys)
+                gaps = np.minimum(ys - padded[slot], padded[slot + 1] - ys)
+                if gaps.min() <= self.row_tolerance:
+                    joining.append(cluster)
+            if not joining:
+                break
+            joined = {id(cluster) for cluster in joining}
+            kept = [cluster for cluster in kept if id(cluster) not in joined]
+            pool.update((ilot.id, ilot) for cluster in joining for ilot in cluster)
+        
+        # Ward clustering is global, and clusters that lost track of some îlots
+        # cannot be patched; re-cluster everything
+        clustered = {ilot.id for cluster in self._row_clusters for ilot in cluster}
+        if (self.row_method != 'sweep'
+                or not clustered.issuperset(set(self._ilots) - {ilot.id for ilot in added})):
+            kept = []
+            pool = dict(self._ilots)
+        
+        clusters = kept + (self._cluster_rows(list(pool.values())) if pool else [])
+        clusters.sort(key=lambda row: np.mean([ilot.position[1] for ilot in row]))
+        self._row_clusters = clusters
+        
+        rows = self._valid_rows(clusters) if len(self._ilots) >= 4 else []
+        
+        # Recompute corridors near the edit, reuse the rest
+        previous = {corridor.id: corridor for corridor in self._corridors}
+        previous_rows = {id(corridor): corridor.connects_rows for corridor in self._corridors}
+        changed_region = prep(unary_union(footprints)) if footprints else None
+        corridors = self._connect_rows(rows, changed_region)
+        
+        current_ids = {corridor.id for corridor in corridors}
+        delta = CorridorDelta(
+            added=[c for c in corridors if c.id not in previous],
+            updated=[c for c in corridors if c.id in previous
+                     and previous_rows.get(id(c)) != c.connects_rows],
+            removed=[corridor_id for corridor_id in previous if corridor_id not in current_ids],
+            corridors=corridors
+        )
+        
+        logger.info(f"Corridor update: {len(delta.added)} added, {len(delta.updated)} updated, "
+                   f"{len(delta.removed)} removed")
+        return delta
+    
+    def export_state(self) -> Dict:
+        """
+        Incremental state as plain values, for storage without pickling
+        
+        Returns:
+            Dict with 'ilots', 'open_spaces', 'rows' (row cluster index by îlot id),
+            'corridors' and 'next_corridor_id'
+        """
+        return {
+            'ilots': list(self._ilots.values()),
+            'open_spaces': list(self._open_spaces),
+            'rows': {ilot.id: index for index, row in enumerate(self._row_clusters) for ilot in row},
+            'corridors': list(self._corridors),
+            'next_corridor_id': self._next_corridor_id
+        }
+    
+    def restore_state(self, ilots: List, open_spaces: List[Polygon], rows: Dict[int, int],
+                      corridors: List[Corridor], next_corridor_id: int):
+        """
+        Rebuild the incremental state saved by export_state, without recomputing
+        corridors; row pairs that had no corridor are recomputed on the next update
+        """
+        self._ilots = {ilot.id: ilot for ilot in ilots}
+        self._open_spaces = list(open_spaces)
+        
+        clusters: Dict[int, List] = {}
+        for ilot in ilots:
+            if ilot.id in rows:
+                clusters.setdefault(rows[ilot.id], []).append(ilot)
+        self._row_clusters = [clusters[index] for index in sorted(clusters)]
+        
+        self._corridors = list(corridors)
+        self._next_corridor_id = next_corridor_id
+        
+        valid_rows = self._valid_rows(self._row_clusters)
+        self._pair_results = {}
+        for corridor in self._corridors:
+            first, second = corridor.connects_rows
+            if second < len(valid_rows):
+                pair_key = (self._row_key(valid_rows[first]), self._row_key(valid_rows[second]))
+                self._pair_results[pair_key] = corridor
+    
+    def _connect_rows(self, rows: List[List], changed_region=None) -> List[Corridor]:
+        """
+        Create corridors between adjacent rows and record them for later updates
+        With a changed region, row pairs that are unchanged and clear of it keep
+        their previous corridor
+        """
+        all_ilots = list(self._ilots.values())
+        pair_results = {}
         corridors = []
+        self._build_row_index()
+        
         for i in range(len(rows) - 1):
             row1 = rows[i]
             row2 = rows[i + 1]
+            pair_key = (self._row_key(row1), self._row_key(row2))
+            previous = self._pair_results.get(pair_key)
             
-            corridor = self._create_corridor_between_rows(
-                row1, row2, i, i + 1, ilots, open_spaces
-            )
+            if (changed_region is not None and pair_key in self._pair_results
+                    and not changed_region.intersects(self._pair_region(row1, row2))):
+                corridor = previous
+            else:
+                corridor = self._create_corridor_between_rows(
+                    row1, row2, i, i + 1, all_ilots, self._open_spaces
+                )
+                
+                # A recomputed but identical corridor keeps its identity
+                if (corridor and previous and previous.length == corridor.length
+                        and previous.polygon.equals(corridor.polygon)):
+                    corridor = previous
+                elif corridor:
+                    corridor.id = self._next_corridor_id
+                    self._next_corridor_id += 1
             
+            pair_results[pair_key] = corridor
             if corridor:
+                corridor.connects_rows = (i, i + 1)
                 corridors.append(corridor)
         
-        logger.info(f"Generated {len(corridors)} corridors")
+        self._row_index = None
+        self._row_x_indexes = []
+        self._pair_results = pair_results
+        self._corridors = corridors
         return corridors
     
+    def _build_row_index(self):
+        """Index row clusters by Y-extent and each row's îlots by X-extent"""
+        row_bounds = [self._get_row_bounds(row) for row in self._row_clusters]
+        self._row_index = IntervalIndex([(b['min_y'], b['max_y']) for b in row_bounds])
+        self._row_x_indexes = [
+            IntervalIndex([(ilot.bounds[0], ilot.bounds[2]) for ilot in row])
+            for row in self._row_clusters
+        ]
+    
+    def _ilots_near(self, corridor_poly: Polygon, ilots: List) -> List:
+        """Îlots whose bounds overlap the corridor's, via the row interval index"""
+        if self._row_index is None:
+            return ilots
+        
+        min_x, min_y, max_x, max_y = corridor_poly.bounds
+        nearby = []
+        for row_idx in self._row_index.overlapping(min_y, max_y):
+            row = self._row_clusters[row_idx]
+            for ilot_idx in self._row_x_indexes[row_idx].overlapping(min_x, max_x):
+                ilot = row[ilot_idx]
+                if ilot.bounds[1] <= max_y and ilot.bounds[3] >= min_y:
+                    nearby.append(ilot)
+        return nearby
+    
+    @staticmethod
+    def _row_key(row: List) -> Tuple[int, ...]:
+        return tuple(sorted(ilot.id for ilot in row))
+    
+    def _pair_region(self, row1: List, row2: List) -> Polygon:
+        """Area that decides the corridor between two rows"""
+        bounds1 = self._get_row_bounds(row1)
+        bounds2 = self._get_row_bounds(row2)
+        pad = self.corridor_width / 2
+        return box(
+            min(bounds1['min_x'], bounds2['min_x']) - pad,
+            min(bounds1['min_y'], bounds2['min_y']) - pad,
+            max(bounds1['max_x'], bounds2['max_x']) + pad,
+            max(bounds1['max_y'], bounds2['max_y']) + pad,
+        )
+    
     def _group_ilots_into_rows(self, ilots: List) -> List[List]:
         """
         Group îlots into horizontal rows based on Y-coordinate
-        Uses hierarchical clustering for robust row detection
+        Uses a sweep over Y-intervals, or hierarchical clustering with row_method='ward'
         """
         if not ilots:
             return []
         
+        return self._valid_rows(self._cluster_rows(ilots))
+    
+    def _valid_rows(self, clusters: List[List]) -> List[List]:
+        """Filter out rows with less than 2 îlots"""
+        valid_rows = [row_ilots for row_ilots in clusters if len(row_ilots) >= 2]
+        logger.info(f"Clustered îlots into {len(valid_rows)} valid rows")
+        return valid_rows
+    
+    def _cluster_rows(self, ilots: List) -> List[List]:
+        """All row clusters, single îlots included, sorted bottom to top"""
+        if len(ilots) < 2:
+            return [list(ilots)] if ilots else []
+        
+        if self.row_method == 'sweep':
+            return self._sweep_rows(ilots)
+        
         # Extract Y-coordinates of îlot centers
         positions = np.array([ilot.position for ilot in ilots])
         y_coords = positions[:, 1].reshape(-1, 1)
@@ -122,20 +400,49 @@ class ProductionCorridorGenerator:
                 rows.append((avg_y, row_ilots))
             
             rows.sort(key=lambda x: x[0])
-            
-            # Filter out rows with less than 2 îlots
-            valid_rows = [row_ilots for _, row_ilots in rows if len(row_ilots) >= 2]
-            
-            logger.info(f"Clustered îlots into {len(valid_rows)} valid rows")
-            return valid_rows
+            return [row_ilots for _, row_ilots in rows]
             
         except Exception as e:
             logger.error(f"Failed to cluster îlots into rows: {e}")
             # Fallback to simple Y-coordinate sorting
-            return self._simple_row_grouping(ilots)
+            return self._bin_rows(ilots)
+    
+    def _sweep_rows(self, ilots: List) -> List[List]:
+        """
+        Sweep-line row grouping over îlot Y-intervals
+        Îlots are sorted by center once; a row closes when the next îlot's
+        Y-interval no longer overlaps the row's, or its center lies more than
+        row_tolerance above the row's first center
+        """
+        rows = []
+        current_row = []
+        row_start = row_top = 0.0
+        
+        for ilot in sorted(ilots, key=lambda i: i.position[1]):
+            min_y, max_y = ilot.bounds[1], ilot.bounds[3]
+            
+            if current_row and (min_y > row_top or ilot.position[1] - row_start > self.row_tolerance):
+                rows.append(current_row)
+                current_row = []
+            
+            if not current_row:
+                row_start = ilot.position[1]
+                row_top = max_y
+            
+            current_row.append(ilot)
+            row_top = max(row_top, max_y)
+        
+        if current_row:
+            rows.append(current_row)
+        
+        return rows
     
     def _simple_row_grouping(self, ilots: List) -> List[List]:
         """Fallback method for row grouping using simple Y-coordinate binning"""
+        return [row for row in self._bin_rows(ilots) if len(row) >= 2]
+    
+    def _bin_rows(self, ilots: List) -> List[List]:
+        """Simple Y-coordinate binning, single îlots included"""
         # Sort by Y-coordinate
         sorted_ilots = sorted(ilots, key=lambda i: i.position[1])
         
@@ -147,14 +454,12 @@ class ProductionCorridorGenerator:
             if abs(ilot.position[1] - current_y) <= self.row_tolerance:
                 current_row.append(ilot)
             else:
-                if len(current_row) >= 2:
-                    rows.append(current_row)
+                rows.append(current_row)
                 current_row = [ilot]
                 current_y = ilot.position[1]
         
         # Add last row
-        if len(current_row) >= 2:
-            rows.append(current_row)
+        rows.append(current_row)
         
         return rows
     
@@ -242,7 +547,7 @@ class ProductionCorridorGenerator:
     
     def _corridor_intersects_ilots(self, corridor_poly: Polygon, ilots: List) -> bool:
         """Check if corridor intersects any îlot"""
-        for ilot in ilots:
+        for ilot in self._ilots_near(corridor_poly, ilots):
             if corridor_poly.intersects(ilot.polygon):
                 # Allow touching at edges, but not overlapping
                 intersection = corridor_poly.intersection(ilot.polygon)
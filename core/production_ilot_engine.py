@@ -7,12 +7,19 @@ NO SIMULATIONS - Real optimization algorithms only
 import logging
 import numpy as np
 import random
-from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass
+import shapely
+from typing import List, Dict, Tuple, Optional, Callable
+from dataclasses import dataclass, asdict
 from shapely.geometry import Polygon, box, Point
 from shapely.ops import unary_union
 from scipy.spatial import distance_matrix
 import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from core.spatial_index import IlotGrid
+from core.placement_constraints import PlacementConstraints
+from core.process_pool import process_pool
 
 logger = logging.getLogger(__name__)
 
@@ -56,7 +63,9 @@ class ProductionIlotEngine:
     """
     
     def __init__(self, config: IlotSizeConfig, total_ilots: int = 100,
-                 min_spacing: float = 0.3, corridor_width: float = 1.5):
+                 min_spacing: float = 0.3, corridor_width: float = 1.5,
+                 workers: int = 1, seed: Optional[int] = None,
+                 progress_callback: Optional[Callable[[Dict], None]] = None):
         """
         Initialize engine
         
@@ -65,12 +74,22 @@ class ProductionIlotEngine:
             total_ilots: Target number of îlots to place
             min_spacing: Minimum spacing between îlots (meters)
             corridor_width: Width of corridors (meters)
+            workers: Processes used for fitness evaluation (1 = serial)
+            seed: Seed for reproducible runs (None = nondeterministic)
+            progress_callback: Called after every GA generation with a progress dict
         """
         config.validate()
         self.config = config
         self.total_ilots = total_ilots
         self.min_spacing = min_spacing
         self.corridor_width = corridor_width
+        self.workers = max(1, int(workers))
+        self.seed = seed
+        self.progress_callback = progress_callback
+        
+        # Per-run random state, reset by place_ilots so equal seeds give equal layouts
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
         
         # Genetic algorithm parameters
         self.population_size = 50
@@ -79,6 +98,7 @@ class ProductionIlotEngine:
         self.crossover_rate = 0.7
         self.elite_size = 10
         self.timeout_seconds = 60
+        self.vectorized_fitness = True  # Score whole populations with shapely array ops
         
     def place_ilots(self, open_spaces: List[Polygon], walls: List[Polygon],
                    restricted_areas: List[Polygon], entrances: List[Polygon]) -> Dict:
@@ -95,6 +115,9 @@ class ProductionIlotEngine:
         start_time = time.time()
         logger.info(f"Starting îlot placement with {self.total_ilots} target îlots")
         
+        self.rng = random.Random(self.seed)
+        self.np_rng = np.random.default_rng(self.seed)
+        
         # Validate input
         if not open_spaces:
             logger.error("No open spaces available for îlot placement")
@@ -107,13 +130,16 @@ class ProductionIlotEngine:
         # Create forbidden zone union (restricted + entrance buffers)
         forbidden_zones = self._create_forbidden_zones(restricted_areas, entrances)
         
+        # Prepared, indexed constraints shared by every chromosome
+        constraints = PlacementConstraints(open_spaces, forbidden_zones)
+        
         # Generate îlot specifications based on distribution
         ilot_specs = self._generate_ilot_specs()
         logger.info(f"Generated {len(ilot_specs)} îlot specifications")
         
         # Run genetic algorithm
         best_solution = self._run_genetic_algorithm(
-            ilot_specs, open_spaces, forbidden_zones, walls, start_time
+            ilot_specs, constraints, walls, start_time
         )
         
         elapsed = time.time() - start_time
@@ -163,10 +189,10 @@ class ProductionIlotEngine:
             
             for _ in range(count):
                 # Random area within range
-                area = np.random.uniform(min_area, max_area)
+                area = self.np_rng.uniform(min_area, max_area)
                 
                 # Calculate dimensions (rectangular with slight variation)
-                aspect_ratio = np.random.uniform(1.2, 1.8)  # Prefer elongated shapes
+                aspect_ratio = self.np_rng.uniform(1.2, 1.8)  # Prefer elongated shapes
                 width = np.sqrt(area * aspect_ratio)
                 height = area / width
                 
@@ -179,17 +205,12 @@ class ProductionIlotEngine:
         
         return specs
     
-    def _run_genetic_algorithm(self, ilot_specs: List[Dict], open_spaces: List[Polygon],
-                               forbidden_zones: Optional[Polygon], walls: List[Polygon],
-                               start_time: float) -> Dict:
+    def _run_genetic_algorithm(self, ilot_specs: List[Dict], constraints: PlacementConstraints,
+                               walls: List[Polygon], start_time: float) -> Dict:
         """Run genetic algorithm to find optimal placement"""
         
         # Get bounds for placement
-        all_bounds = [space.bounds for space in open_spaces]
-        min_x = min(b[0] for b in all_bounds)
-        min_y = min(b[1] for b in all_bounds)
-        max_x = max(b[2] for b in all_bounds)
-        max_y = max(b[3] for b in all_bounds)
+        min_x, min_y, max_x, max_y = constraints.bounds
         
         # Initialize population
         population = [
@@ -201,65 +222,85 @@ class ProductionIlotEngine:
         best_solution = None
         generations_without_improvement = 0
         
-        for generation in range(self.max_generations):
-            # Check timeout
-            if time.time() - start_time > self.timeout_seconds:
-                logger.warning(f"Genetic algorithm timeout at generation {generation}")
-                break
-            
-            # Evaluate fitness for all chromosomes
-            evaluated = []
-            for chromosome in population:
-                fitness, ilots = self._evaluate_fitness(
-                    chromosome, ilot_specs, open_spaces, forbidden_zones, walls
-                )
-                evaluated.append((fitness, chromosome, ilots))
-            
-            # Sort by fitness
-            evaluated.sort(key=lambda x: x[0], reverse=True)
-            
-            # Check for improvement
-            if evaluated[0][0] > best_fitness:
-                best_fitness = evaluated[0][0]
-                best_solution = {
-                    'fitness': best_fitness,
-                    'ilots': evaluated[0][2],
-                    'chromosome': evaluated[0][1]
-                }
-                generations_without_improvement = 0
-                logger.info(f"Gen {generation}: New best fitness {best_fitness:.2f} - {len(evaluated[0][2])} îlots")
-            else:
-                generations_without_improvement += 1
-            
-            # Early stopping if no improvement
-            if generations_without_improvement >= 20:
-                logger.info(f"Early stopping at generation {generation} - no improvement for 20 generations")
-                break
-            
-            # Selection: keep elite + select parents
-            elite = [chrom for _, chrom, _ in evaluated[:self.elite_size]]
-            
-            # Create next generation
-            next_gen = elite.copy()
-            
-            while len(next_gen) < self.population_size:
-                # Tournament selection
-                parent1 = self._tournament_selection(evaluated)
-                parent2 = self._tournament_selection(evaluated)
+        spec_arrays = self._spec_arrays(ilot_specs) if self.vectorized_fitness else None
+        
+        # Opt-in process pool; geometry is shipped to each worker once, as WKB
+        executor = self._create_fitness_pool(ilot_specs, constraints, walls) if self.workers > 1 else None
+        
+        try:
+            for generation in range(self.max_generations):
+                # Check timeout
+                if time.time() - start_time > self.timeout_seconds:
+                    logger.warning(f"Genetic algorithm timeout at generation {generation}")
+                    break
                 
-                # Crossover
-                if random.random() < self.crossover_rate:
-                    child = self._crossover(parent1, parent2)
+                # Evaluate fitness for all chromosomes
+                try:
+                    evaluated = self._evaluate_population(
+                        population, ilot_specs, spec_arrays, constraints, walls, executor
+                    )
+                except BrokenProcessPool as e:
+                    # Worker start-up or pickling failures only surface here
+                    logger.warning(f"Fitness worker pool failed, continuing serially: {e}")
+                    executor.shutdown(cancel_futures=True)
+                    executor = None
+                    evaluated = self._evaluate_population(
+                        population, ilot_specs, spec_arrays, constraints, walls
+                    )
+                
+                # Sort by fitness
+                evaluated.sort(key=lambda x: x[0], reverse=True)
+                
+                # Check for improvement
+                if evaluated[0][0] > best_fitness:
+                    best_fitness = evaluated[0][0]
+                    best_ilots = evaluated[0][2]
+                    if self.vectorized_fitness:
+                        best_ilots = self._build_placed_ilots(evaluated[0][1], ilot_specs, best_ilots)
+                    best_solution = {
+                        'fitness': best_fitness,
+                        'ilots': best_ilots,
+                        'chromosome': evaluated[0][1]
+                    }
+                    generations_without_improvement = 0
+                    logger.info(f"Gen {generation}: New best fitness {best_fitness:.2f} - {len(best_ilots)} îlots")
                 else:
-                    child = parent1.copy()
+                    generations_without_improvement += 1
                 
-                # Mutation
-                if random.random() < self.mutation_rate:
-                    child = self._mutate(child, ilot_specs, min_x, min_y, max_x, max_y)
+                self._report_progress(generation, best_fitness, best_solution)
                 
-                next_gen.append(child)
-            
-            population = next_gen
+                # Early stopping if no improvement
+                if generations_without_improvement >= 20:
+                    logger.info(f"Early stopping at generation {generation} - no improvement for 20 generations")
+                    break
+                
+                # Selection: keep elite + select parents
+                elite = [chrom for _, chrom, _ in evaluated[:self.elite_size]]
+                
+                # Create next generation
+                next_gen = elite.copy()
+                
+                while len(next_gen) < self.population_size:
+                    # Tournament selection
+                    parent1 = self._tournament_selection(evaluated)
+                    parent2 = self._tournament_selection(evaluated)
+                    
+                    # Crossover
+                    if self.rng.random() < self.crossover_rate:
+                        child = self._crossover(parent1, parent2)
+                    else:
+                        child = parent1.copy()
+                    
+                    # Mutation
+                    if self.rng.random() < self.mutation_rate:
+                        child = self._mutate(child, ilot_specs, min_x, min_y, max_x, max_y)
+                    
+                    next_gen.append(child)
+                
+                population = next_gen
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
         
         if best_solution is None:
             logger.warning("No valid solution found")
@@ -267,24 +308,41 @@ class ProductionIlotEngine:
         
         return best_solution
     
+    def _report_progress(self, generation: int, best_fitness: float, best_solution: Optional[Dict]):
+        """Publish per-generation GA progress to progress_callback"""
+        if self.progress_callback is None:
+            return
+        try:
+            self.progress_callback({
+                'stage': 'placement',
+                'generation': generation + 1,
+                'max_generations': self.max_generations,
+                'best_fitness': best_fitness,
+                'ilot_count': len(best_solution['ilots']) if best_solution else 0
+            })
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {e}")
+    
     def _create_random_chromosome(self, ilot_specs: List[Dict], 
                                  min_x: float, min_y: float, 
                                  max_x: float, max_y: float) -> List[Tuple]:
         """Create random chromosome (placement genes)"""
         chromosome = []
         for spec in ilot_specs:
-            x = random.uniform(min_x, max_x - spec['width'])
-            y = random.uniform(min_y, max_y - spec['height'])
-            rotation = random.choice([0, 90])  # 0 or 90 degrees
+            x = self.rng.uniform(min_x, max_x - spec['width'])
+            y = self.rng.uniform(min_y, max_y - spec['height'])
+            rotation = self.rng.choice([0, 90])  # 0 or 90 degrees
             chromosome.append((x, y, rotation))
         return chromosome
     
     def _evaluate_fitness(self, chromosome: List[Tuple], ilot_specs: List[Dict],
-                         open_spaces: List[Polygon], forbidden_zones: Optional[Polygon],
+                         constraints: PlacementConstraints,
                          walls: List[Polygon]) -> Tuple[float, List[PlacedIlot]]:
         """Evaluate fitness of a chromosome"""
         
         valid_ilots = []
+        # Dynamic index over îlots accepted so far in this chromosome
+        ilot_grid = IlotGrid.for_specs(ilot_specs, self.min_spacing)
         
         for idx, (x, y, rotation) in enumerate(chromosome):
             spec = ilot_specs[idx]
@@ -299,7 +357,7 @@ class ProductionIlotEngine:
             ilot_poly = box(x, y, x + width, y + height)
             
             # Validate placement
-            if not self._is_valid_placement(ilot_poly, open_spaces, forbidden_zones, valid_ilots):
+            if not self._is_valid_placement(ilot_poly, constraints, ilot_grid):
                 continue
             
             # Create placed îlot
@@ -314,6 +372,7 @@ class ProductionIlotEngine:
                 rotation=rotation
             )
             valid_ilots.append(placed)
+            ilot_grid.add(ilot_poly)
         
         # Calculate fitness score
         if not valid_ilots:
@@ -355,41 +414,210 @@ class ProductionIlotEngine:
         
         return fitness, valid_ilots
     
-    def _is_valid_placement(self, ilot_poly: Polygon, open_spaces: List[Polygon],
-                           forbidden_zones: Optional[Polygon], 
-                           existing_ilots: List[PlacedIlot]) -> bool:
-        """Check if îlot placement is valid"""
+    def _create_fitness_pool(self, ilot_specs: List[Dict], constraints: PlacementConstraints,
+                             walls: List[Polygon]) -> Optional[ProcessPoolExecutor]:
+        """
+        Create a process pool whose workers hold the placement constraints
+        Workers get plain settings, never the engine itself (its progress callback
+        may hold locks), and start from a fresh interpreter rather than a fork of
+        a possibly multi-threaded server
+        """
+        forbidden_zones = constraints.forbidden_zones
+        settings = {
+            'config': asdict(self.config),
+            'total_ilots': self.total_ilots,
+            'min_spacing': self.min_spacing,
+            'corridor_width': self.corridor_width,
+            'vectorized_fitness': self.vectorized_fitness,
+        }
+        try:
+            return process_pool(
+                self.workers,
+                initializer=_init_fitness_worker,
+                initargs=(
+                    settings,
+                    ilot_specs,
+                    shapely.to_wkb(np.asarray(constraints.open_space_index.spaces, dtype=object)),
+                    shapely.to_wkb(forbidden_zones) if forbidden_zones is not None else None,
+                    shapely.to_wkb(np.asarray(walls, dtype=object)),
+                )
+            )
+        except Exception as e:
+            logger.warning(f"Parallel fitness evaluation unavailable, running serially: {e}")
+            return None
+    
+    def _evaluate_population(self, population: List[List[Tuple]], ilot_specs: List[Dict],
+                             spec_arrays: Optional[Dict[str, np.ndarray]],
+                             constraints: PlacementConstraints, walls: List[Polygon],
+                             executor: Optional[ProcessPoolExecutor] = None) -> List[Tuple]:
+        """
+        Evaluate every chromosome of a generation
         
-        # Must be within open spaces
-        in_open_space = False
-        for space in open_spaces:
-            if space.contains(ilot_poly):
-                in_open_space = True
-                break
+        Returns:
+            (fitness, chromosome, îlots) tuples in population order. With
+            vectorized_fitness the third element is the accepted-gene mask and
+            îlots are only built for the best chromosome.
+        """
+        if executor is not None:
+            chunk_size = -(-len(population) // self.workers)
+            chunks = [population[i:i + chunk_size] for i in range(0, len(population), chunk_size)]
+            results = []
+            for chunk_results in executor.map(_evaluate_fitness_chunk, chunks):
+                results.extend(chunk_results)
+        elif self.vectorized_fitness:
+            fitnesses, accepted = self._evaluate_population_batch(population, spec_arrays, constraints)
+            results = list(zip(fitnesses, accepted))
+        else:
+            results = [
+                self._evaluate_fitness(chromosome, ilot_specs, constraints, walls)
+                for chromosome in population
+            ]
+        
+        return [
+            (fitness, chromosome, ilots)
+            for chromosome, (fitness, ilots) in zip(population, results)
+        ]
+    
+    def _spec_arrays(self, ilot_specs: List[Dict]) -> Dict[str, np.ndarray]:
+        """Column arrays of the îlot specs for batch evaluation"""
+        categories = sorted({spec['category'] for spec in ilot_specs})
+        return {
+            'width': np.array([spec['width'] for spec in ilot_specs], dtype=float),
+            'height': np.array([spec['height'] for spec in ilot_specs], dtype=float),
+            'area': np.array([spec['area'] for spec in ilot_specs], dtype=float),
+            'category': np.array([categories.index(spec['category']) for spec in ilot_specs], dtype=int),
+            'num_categories': len(categories),
+        }
+    
+    def _evaluate_population_batch(self, population: List[List[Tuple]], spec_arrays: Dict[str, np.ndarray],
+                                   constraints: PlacementConstraints) -> Tuple[List[float], np.ndarray]:
+        """
+        Evaluate a whole population at once
+        Gives the same fitness as _evaluate_fitness for every chromosome
         
-        if not in_open_space:
+        Returns:
+            (fitness per chromosome, boolean mask of accepted genes [population × îlots])
+        """
+        genes = np.asarray(population, dtype=float).reshape(len(population), -1, 3)
+        pop_size, num_genes = genes.shape[0], genes.shape[1]
+        if num_genes == 0:
+            return [0] * pop_size, np.zeros((pop_size, 0), dtype=bool)
+        
+        # Apply rotation
+        rotated = genes[:, :, 2] == 90
+        width = np.where(rotated, spec_arrays['height'], spec_arrays['width'])
+        height = np.where(rotated, spec_arrays['width'], spec_arrays['height'])
+        x0 = genes[:, :, 0]
+        y0 = genes[:, :, 1]
+        x1 = x0 + width
+        y1 = y0 + height
+        
+        # Static constraints for every gene of every chromosome in one pass
+        boxes = shapely.box(x0.ravel(), y0.ravel(), x1.ravel(), y1.ravel())
+        static_ok = constraints.in_open_space_many(boxes) & ~constraints.hits_forbidden_many(boxes)
+        static_ok = static_ok.reshape(pop_size, num_genes)
+        
+        # Spacing is order dependent: gene i is kept only if clear of genes kept before it.
+        # Axis-aligned boxes, so distance comes straight from the bounds.
+        min_spacing_sq = self.min_spacing ** 2
+        accepted = np.zeros((pop_size, num_genes), dtype=bool)
+        accepted[:, 0] = static_ok[:, 0]
+        for i in range(1, num_genes):
+            candidate = static_ok[:, i]
+            if not candidate.any():
+                continue
+            dx = np.maximum(0.0, np.maximum(x0[:, :i] - x1[:, i:i + 1], x0[:, i:i + 1] - x1[:, :i]))
+            dy = np.maximum(0.0, np.maximum(y0[:, :i] - y1[:, i:i + 1], y0[:, i:i + 1] - y1[:, :i]))
+            too_close = (dx * dx + dy * dy < min_spacing_sq) & accepted[:, :i]
+            accepted[:, i] = candidate & ~too_close.any(axis=1)
+        
+        # Fitness components, same formula as _evaluate_fitness
+        center_x = x0 + width / 2
+        center_y = y0 + height / 2
+        category_hits = np.zeros((pop_size, spec_arrays['num_categories']), dtype=bool)
+        rows, cols = np.nonzero(accepted)
+        category_hits[rows, spec_arrays['category'][cols]] = True
+        
+        fitnesses = []
+        for k in range(pop_size):
+            mask = accepted[k]
+            num_ilots = int(mask.sum())
+            if num_ilots == 0:
+                fitnesses.append(0)
+                continue
+            
+            total_area = sum(spec_arrays['area'][mask].tolist())
+            distribution_score = int(category_hits[k].sum()) / 4  # We have 4 categories
+            
+            spacing_score = 1.0
+            if num_ilots > 1:
+                positions = np.column_stack((center_x[k][mask], center_y[k][mask]))
+                distances = distance_matrix(positions, positions)
+                np.fill_diagonal(distances, np.inf)
+                avg_spacing = distances.min(axis=1).mean()
+                spacing_score = 1.0 if 0.5 <= avg_spacing <= 2.0 else 0.5
+            
+            fitnesses.append(
+                num_ilots * 10 +
+                total_area * 0.1 +
+                distribution_score * 5 +
+                spacing_score * 2
+            )
+        
+        return fitnesses, accepted
+    
+    def _build_placed_ilots(self, chromosome: List[Tuple], ilot_specs: List[Dict],
+                            accepted: np.ndarray) -> List[PlacedIlot]:
+        """Materialize PlacedIlot objects for the accepted genes of a chromosome"""
+        placed_ilots = []
+        for idx in np.flatnonzero(accepted):
+            x, y, rotation = chromosome[idx]
+            spec = ilot_specs[idx]
+            
+            if rotation == 90:
+                width, height = spec['height'], spec['width']
+            else:
+                width, height = spec['width'], spec['height']
+            
+            placed_ilots.append(PlacedIlot(
+                id=len(placed_ilots),
+                polygon=box(x, y, x + width, y + height),
+                area=spec['area'],
+                category=spec['category'],
+                position=(x + width/2, y + height/2),
+                width=width,
+                height=height,
+                rotation=rotation
+            ))
+        return placed_ilots
+    
+    def _is_valid_placement(self, ilot_poly: Polygon, constraints: PlacementConstraints,
+                           ilot_grid: IlotGrid) -> bool:
+        """Check if îlot placement is valid"""
+        
+        # Must be within open spaces (STRtree lookup on prepared spaces)
+        if not constraints.in_open_space(ilot_poly):
             return False
         
         # Must NOT intersect forbidden zones (restricted areas + entrances)
-        if forbidden_zones and ilot_poly.intersects(forbidden_zones):
+        if constraints.hits_forbidden(ilot_poly):
             return False
         
-        # Must NOT overlap with existing îlots (with spacing)
-        for existing in existing_ilots:
-            if ilot_poly.distance(existing.polygon) < self.min_spacing:
-                return False
+        # Must NOT overlap with existing îlots (with spacing) - only nearby grid cells
+        if ilot_grid.has_neighbor_within(ilot_poly, self.min_spacing):
+            return False
         
         return True
     
     def _tournament_selection(self, evaluated: List[Tuple], tournament_size: int = 3) -> List[Tuple]:
         """Tournament selection for genetic algorithm"""
-        tournament = random.sample(evaluated, min(tournament_size, len(evaluated)))
+        tournament = self.rng.sample(evaluated, min(tournament_size, len(evaluated)))
         winner = max(tournament, key=lambda x: x[0])
         return winner[1]  # Return chromosome
     
     def _crossover(self, parent1: List[Tuple], parent2: List[Tuple]) -> List[Tuple]:
         """Single-point crossover"""
-        point = random.randint(1, len(parent1) - 1)
+        point = self.rng.randint(1, len(parent1) - 1)
         child = parent1[:point] + parent2[point:]
         return child
     
@@ -399,16 +627,58 @@ class ProductionIlotEngine:
         mutated = list(chromosome)
         
         # Mutate 10-20% of genes
-        num_mutations = max(1, int(len(mutated) * random.uniform(0.1, 0.2)))
+        num_mutations = max(1, int(len(mutated) * self.rng.uniform(0.1, 0.2)))
         
         for _ in range(num_mutations):
-            idx = random.randint(0, len(mutated) - 1)
+            idx = self.rng.randint(0, len(mutated) - 1)
             spec = ilot_specs[idx]
             
-            x = random.uniform(min_x, max_x - spec['width'])
-            y = random.uniform(min_y, max_y - spec['height'])
-            rotation = random.choice([0, 90])
+            x = self.rng.uniform(min_x, max_x - spec['width'])
+            y = self.rng.uniform(min_y, max_y - spec['height'])
+            rotation = self.rng.choice([0, 90])
             
             mutated[idx] = (x, y, rotation)
         
         return mutated
+
+
+# Per-process state for parallel fitness evaluation, set once by the pool initializer
+_worker_state: Dict = {}
+
+
+def _init_fitness_worker(settings: Dict, ilot_specs: List[Dict],
+                         open_spaces_wkb, forbidden_wkb, walls_wkb):
+    """Rebuild the engine settings and placement constraints inside a worker process"""
+    open_spaces = list(shapely.from_wkb(open_spaces_wkb))
+    forbidden_zones = shapely.from_wkb(forbidden_wkb) if forbidden_wkb is not None else None
+    
+    engine = ProductionIlotEngine(
+        config=IlotSizeConfig(**settings['config']),
+        total_ilots=settings['total_ilots'],
+        min_spacing=settings['min_spacing'],
+        corridor_width=settings['corridor_width']
+    )
+    engine.vectorized_fitness = settings['vectorized_fitness']
+    
+    _worker_state['engine'] = engine
+    _worker_state['ilot_specs'] = ilot_specs
+    _worker_state['spec_arrays'] = engine._spec_arrays(ilot_specs) if engine.vectorized_fitness else None
+    _worker_state['constraints'] = PlacementConstraints(open_spaces, forbidden_zones)
+    _worker_state['walls'] = list(shapely.from_wkb(walls_wkb))
+
+
+def _evaluate_fitness_chunk(chromosomes: List[List[Tuple]]) -> List[Tuple]:
+    """Evaluate a slice of the population in a worker process"""
+    engine = _worker_state['engine']
+    constraints = _worker_state['constraints']
+    
+    if engine.vectorized_fitness:
+        fitnesses, accepted = engine._evaluate_population_batch(
+            chromosomes, _worker_state['spec_arrays'], constraints
+        )
+        return list(zip(fitnesses, accepted))
+    
+    return [
+        engine._evaluate_fitness(chromosome, _worker_state['ilot_specs'], constraints, _worker_state['walls'])
+        for chromosome in chromosomes
+    ]
@@ -5,11 +5,12 @@ NO SIMULATIONS - Production-grade algorithms only
 """
 
 import logging
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Optional, Callable
 from dataclasses import dataclass
 from shapely.geometry import Polygon
 
 from core.production_cad_parser import ProductionCADParser, ZoneType
+from core.parse_cache import ParseCache
 from core.production_ilot_engine import ProductionIlotEngine, IlotSizeConfig, PlacedIlot
 from core.production_corridor_generator import ProductionCorridorGenerator, Corridor
 
@@ -48,15 +49,26 @@ class ProductionOrchestrator:
     Handles: DXF parsing → Îlot placement → Corridor generation
     """
     
-    def __init__(self):
-        self.cad_parser = ProductionCADParser()
+    def __init__(self, parse_cache: Optional[ParseCache] = None, parse_workers: int = 1,
+                 wall_thickness: float = 0.25):
+        # Shared on-disk cache, so plans already parsed by the viewer are not re-read;
+        # wall_thickness is part of the cache key and must match the viewer's parse
+        self.cad_parser = ProductionCADParser(wall_thickness=wall_thickness,
+                                              cache=parse_cache or ParseCache(),
+                                              workers=parse_workers)
+        
+        # Generator from the last run, kept for incremental corridor updates
+        self.corridor_generator: Optional[ProductionCorridorGenerator] = None
         
     def process_floor_plan(self, 
                           dxf_file_path: str,
                           size_config: IlotSizeConfig,
                           total_ilots: int = 100,
                           corridor_width: float = 1.5,
-                          min_spacing: float = 0.3) -> ProcessingResult:
+                          min_spacing: float = 0.3,
+                          workers: int = 1,
+                          seed: Optional[int] = None,
+                          progress_callback: Optional[Callable[[Dict], None]] = None) -> ProcessingResult:
         """
         Complete processing pipeline
         
@@ -66,6 +78,10 @@ class ProductionOrchestrator:
             total_ilots: Target number of îlots
             corridor_width: Width of corridors in meters
             min_spacing: Minimum spacing between îlots
+            workers: Processes for parallel GA fitness evaluation (1 = serial)
+            seed: Random seed; the same seed and file give an identical layout
+                  unless the GA hits its timeout
+            progress_callback: Receives {'stage': ...} dicts per step and per GA generation
             
         Returns:
             ProcessingResult with all data and metrics
@@ -80,6 +96,8 @@ class ProductionOrchestrator:
             
             # Step 1: Parse CAD file
             logger.info("Step 1/3: Parsing CAD file...")
+            if progress_callback:
+                progress_callback({'stage': 'parsing'})
             walls, restricted_areas, entrances, open_spaces = self.cad_parser.parse_dxf(dxf_file_path)
             
             if not open_spaces:
@@ -109,7 +127,10 @@ class ProductionOrchestrator:
                 config=size_config,
                 total_ilots=total_ilots,
                 min_spacing=min_spacing,
-                corridor_width=corridor_width
+                corridor_width=corridor_width,
+                workers=workers,
+                seed=seed,
+                progress_callback=progress_callback
             )
             
             placement_result = ilot_engine.place_ilots(
@@ -128,12 +149,15 @@ class ProductionOrchestrator:
             
             # Step 3: Generate corridors
             logger.info("Step 3/3: Generating corridor network...")
+            if progress_callback:
+                progress_callback({'stage': 'corridors', 'ilot_count': len(ilots)})
             corridor_generator = ProductionCorridorGenerator(
                 corridor_width=corridor_width,
                 min_corridor_length=2.0
             )
             
             corridors = corridor_generator.generate_corridors(ilots, open_spaces)
+            self.corridor_generator = corridor_generator
             
             # Set corridor IDs
             for i, corridor in enumerate(corridors):
@@ -0,0 +1,318 @@
+"""
+Viewer Session Store
+Per-user viewer state keyed by an opaque token, kept in a local SQLite file
+Shared by every server worker; TTL, LRU and total-size eviction
+"""
+
+import getpass
+import io
+import logging
+import os
+import secrets
+import sqlite3
+import stat
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from shapely.geometry import Polygon
+
+from core.parse_cache import ParseCache, encode_layers, decode_layers
+from core.production_corridor_generator import Corridor, ProductionCorridorGenerator
+from core.production_ilot_engine import PlacedIlot
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Session:
+    """State of one viewer session"""
+    token: str
+    dxf_path: Optional[str] = None  # Uploaded temp file, deleted with the session
+    plan: Optional[Tuple[List[Polygon], ...]] = None  # walls, restricted_areas, entrances, open_spaces
+    parse_key: Optional[str] = None  # Parse cache key of the plan, for its LOD tiers
+    wall_thickness: Optional[float] = None  # Parser setting of the plan, reused by processing jobs
+    ilots: Dict[int, PlacedIlot] = field(default_factory=dict)  # By id
+    corridor_generator: Optional[ProductionCorridorGenerator] = None  # With incremental state
+
+
+class SessionStore:
+    """
+    SQLite-backed session store
+    Plans and îlot layouts are stored as WKB plus plain attribute arrays, never
+    pickled; nothing stays live in memory between requests
+    """
+
+    def __init__(self, db_path: Optional[str] = None, ttl_seconds: float = 3600,
+                 max_sessions: int = 200, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            db_path: SQLite file (default: $SESSION_DB, else a file in a private per-user temp directory)
+            ttl_seconds: Idle time after which a session expires
+            max_sessions: Session count cap; least recently used sessions go first
+            max_bytes: Total stored size cap, enforced the same way
+        """
+        self.db_path = db_path or os.getenv('SESSION_DB') or os.path.join(
+            private_temp_dir(), 'ilot_sessions.sqlite3'
+        )
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+
+        with self._connection() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS sessions ('
+                'token TEXT PRIMARY KEY, accessed REAL NOT NULL, size INTEGER NOT NULL, '
+                'dxf_path TEXT, plan BLOB, layout BLOB, parse_key TEXT, wall_thickness REAL)'
+            )
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(sessions)')}
+            if 'parse_key' not in columns:  # Database from before LOD tiers
+                conn.execute('ALTER TABLE sessions ADD COLUMN parse_key TEXT')
+            if 'wall_thickness' not in columns:  # Database from before shared parse settings
+                conn.execute('ALTER TABLE sessions ADD COLUMN wall_thickness REAL')
+            conn.execute('CREATE INDEX IF NOT EXISTS sessions_accessed ON sessions (accessed)')
+
+    @contextmanager
+    def _connection(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:  # Commits on success, rolls back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self) -> Session:
+        """Start and store an empty session under a new token"""
+        session = Session(token=secrets.token_urlsafe(32))
+        self.save(session)
+        return session
+
+    def load(self, token: Optional[str]) -> Optional[Session]:
+        """Session for a token, None if unknown or expired"""
+        if not token:
+            return None
+
+        now = time.time()
+        with self._connection() as conn:
+            row = conn.execute(
+                'SELECT accessed, dxf_path, plan, layout, parse_key, wall_thickness FROM sessions WHERE token = ?',
+                (token,)
+            ).fetchone()
+            if row is None:
+                return None
+            accessed, dxf_path, plan_blob, layout_blob, parse_key, wall_thickness = row
+            if accessed < now - self.ttl_seconds:
+                expired = True
+            else:
+                expired = False
+                conn.execute('UPDATE sessions SET accessed = ? WHERE token = ?', (now, token))
+
+        if expired:
+            self.delete(token)
+            return None
+
+        try:
+            session = Session(token=token, dxf_path=dxf_path, parse_key=parse_key,
+                              wall_thickness=wall_thickness)
+            if plan_blob is not None:
+                with np.load(io.BytesIO(plan_blob), allow_pickle=False) as data:
+                    session.plan = decode_layers(data)
+            if layout_blob is not None:
+                with np.load(io.BytesIO(layout_blob), allow_pickle=False) as data:
+                    session.ilots, session.corridor_generator = decode_layout(data)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable session: {e}")
+            self.delete(token)
+            return None
+        return session
+
+    def save(self, session: Session):
+        """Store a session, then evict expired and least recently used sessions past the caps"""
+        plan_blob = None
+        if session.plan is not None:
+            buffer = io.BytesIO()
+            np.savez(buffer, **encode_layers(session.plan))
+            plan_blob = buffer.getvalue()
+
+        layout_blob = None
+        if session.ilots or session.corridor_generator is not None:
+            buffer = io.BytesIO()
+            np.savez(buffer, **encode_layout(session.ilots, session.corridor_generator))
+            layout_blob = buffer.getvalue()
+
+        size = len(plan_blob or b'') + len(layout_blob or b'')
+        with self._connection() as conn:
+            previous = conn.execute(
+                'SELECT dxf_path FROM sessions WHERE token = ?', (session.token,)
+            ).fetchone()
+            conn.execute(
+                'INSERT OR REPLACE INTO sessions '
+                '(token, accessed, size, dxf_path, plan, layout, parse_key, wall_thickness) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (session.token, time.time(), size, session.dxf_path, plan_blob, layout_blob,
+                 session.parse_key, session.wall_thickness)
+            )
+
+        # A replaced upload leaves its old temp file behind
+        if previous and previous[0] and previous[0] != session.dxf_path:
+            self._remove_file(previous[0])
+
+        self.evict()
+
+    def delete(self, token: str):
+        """Drop a session and its temp file"""
+        with self._connection() as conn:
+            row = conn.execute('SELECT dxf_path FROM sessions WHERE token = ?', (token,)).fetchone()
+            conn.execute('DELETE FROM sessions WHERE token = ?', (token,))
+        if row and row[0]:
+            self._remove_file(row[0])
+
+    def evict(self):
+        """Drop expired sessions, then least recently used ones until both caps hold"""
+        cutoff = time.time() - self.ttl_seconds
+        with self._connection() as conn:
+            doomed = conn.execute(
+                'SELECT token, dxf_path FROM sessions WHERE accessed < ?', (cutoff,)
+            ).fetchall()
+
+            rows = conn.execute(
+                'SELECT token, dxf_path, size FROM sessions WHERE accessed >= ? ORDER BY accessed DESC',
+                (cutoff,)
+            ).fetchall()
+            total = 0
+            for count, (token, dxf_path, size) in enumerate(rows, start=1):
+                total += size
+                # The most recently used session always stays
+                if count > 1 and (count > self.max_sessions or total > self.max_bytes):
+                    doomed.append((token, dxf_path))
+
+            conn.executemany('DELETE FROM sessions WHERE token = ?', [(token,) for token, _ in doomed])
+
+        for _, dxf_path in doomed:
+            if dxf_path:
+                self._remove_file(dxf_path)
+        if doomed:
+            logger.info(f"Evicted {len(doomed)} viewer sessions")
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def private_temp_dir() -> str:
+    """
+    Per-user temp directory only its owner can enter; a fresh mkdtemp one if
+    the usual path exists but belongs to someone else or is open to others
+    """
+    path = os.path.join(tempfile.gettempdir(), f"ilot_sessions-{getpass.getuser()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    except OSError as e:
+        logger.warning(f"Cannot create session directory {path}: {e}")
+        return tempfile.mkdtemp(prefix='ilot_sessions-')
+
+    info = os.lstat(path)
+    owned = not hasattr(os, 'getuid') or info.st_uid == os.getuid()
+    if not stat.S_ISDIR(info.st_mode) or not owned or info.st_mode & 0o077:
+        logger.warning(f"Session directory {path} is not private, using a new one for this process")
+        return tempfile.mkdtemp(prefix='ilot_sessions-')
+    return path
+
+
+def encode_layout(ilots: Dict[int, PlacedIlot],
+                  generator: Optional[ProductionCorridorGenerator]) -> Dict[str, np.ndarray]:
+    """
+    Îlot layout and corridor generator state as flat arrays for np.savez
+    Polygons go in as WKB, attributes as numeric or string columns
+    """
+    ilot_list = list(ilots.values())
+    state = generator.export_state() if generator is not None else None
+    rows = state['rows'] if state is not None else {}
+
+    arrays = {}
+    arrays['ilot_wkb'], arrays['ilot_offsets'] = ParseCache._encode([ilot.polygon for ilot in ilot_list])
+    arrays['ilot_id'] = np.array([ilot.id for ilot in ilot_list], dtype=np.int64)
+    arrays['ilot_category'] = np.array([ilot.category for ilot in ilot_list], dtype=np.str_)
+    arrays['ilot_values'] = np.array(
+        [(ilot.area, *ilot.position, ilot.width, ilot.height, ilot.rotation) for ilot in ilot_list],
+        dtype=float
+    ).reshape(-1, 6)
+    arrays['ilot_row'] = np.array([rows.get(ilot.id, -1) for ilot in ilot_list], dtype=np.int64)
+
+    if state is None:
+        return arrays
+
+    corridors = state['corridors']
+    arrays['generator_settings'] = np.array(
+        [generator.corridor_width, generator.min_corridor_length, generator.row_tolerance], dtype=float
+    )
+    arrays['generator_row_method'] = np.array(generator.row_method, dtype=np.str_)
+    arrays['generator_next_corridor_id'] = np.array(state['next_corridor_id'], dtype=np.int64)
+    arrays['open_space_wkb'], arrays['open_space_offsets'] = ParseCache._encode(state['open_spaces'])
+    arrays['corridor_wkb'], arrays['corridor_offsets'] = ParseCache._encode(
+        [corridor.polygon for corridor in corridors]
+    )
+    arrays['corridor_id'] = np.array([corridor.id for corridor in corridors], dtype=np.int64)
+    arrays['corridor_rows'] = np.array([corridor.connects_rows for corridor in corridors],
+                                       dtype=np.int64).reshape(-1, 2)
+    arrays['corridor_values'] = np.array(
+        [(corridor.width, corridor.length, *corridor.start_point, *corridor.end_point)
+         for corridor in corridors],
+        dtype=float
+    ).reshape(-1, 6)
+    return arrays
+
+
+def decode_layout(data) -> Tuple[Dict[int, PlacedIlot], Optional[ProductionCorridorGenerator]]:
+    """Inverse of encode_layout; the generator is rebuilt, not recomputed"""
+    polygons = ParseCache._decode(data['ilot_wkb'], data['ilot_offsets'])
+    ilots = {}
+    rows = {}
+    for polygon, ilot_id, category, values, row in zip(
+            polygons, data['ilot_id'].tolist(), data['ilot_category'].tolist(),
+            data['ilot_values'].tolist(), data['ilot_row'].tolist()):
+        area, x, y, width, height, rotation = values
+        ilots[ilot_id] = PlacedIlot(
+            id=ilot_id, polygon=polygon, area=area, category=category, position=(x, y),
+            width=width, height=height, rotation=int(rotation)
+        )
+        if row >= 0:
+            rows[ilot_id] = row
+
+    if 'generator_settings' not in data:
+        return ilots, None
+
+    corridor_width, min_corridor_length, row_tolerance = data['generator_settings'].tolist()
+    generator = ProductionCorridorGenerator(corridor_width=corridor_width,
+                                            min_corridor_length=min_corridor_length)
+    generator.row_tolerance = row_tolerance
+    generator.row_method = str(data['generator_row_method'])
+
+    corridors = []
+    for polygon, corridor_id, connects_rows, values in zip(
+            ParseCache._decode(data['corridor_wkb'], data['corridor_offsets']),
+            data['corridor_id'].tolist(), data['corridor_rows'].tolist(),
+            data['corridor_values'].tolist()):
+        width, length, start_x, start_y, end_x, end_y = values
+        corridors.append(Corridor(
+            id=corridor_id, polygon=polygon, width=width, length=length,
+            connects_rows=tuple(connects_rows), start_point=(start_x, start_y), end_point=(end_x, end_y)
+        ))
+
+    generator.restore_state(
+        ilots=list(ilots.values()),
+        open_spaces=ParseCache._decode(data['open_space_wkb'], data['open_space_offsets']),
+        rows=rows,
+        corridors=corridors,
+        next_corridor_id=int(data['generator_next_corridor_id'])
+    )
+    return ilots, generator
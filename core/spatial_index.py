@@ -0,0 +1,195 @@
+"""
+Spatial Indexing for Îlot Placement
+STRtree over static open spaces, uniform hash grid over placed îlots,
+KD-tree over îlot centroids for neighbour queries, interval index for row sweeps
+Keeps placement validation near-linear in the number of îlots
+"""
+
+import logging
+import math
+import numpy as np
+import shapely
+from typing import List, Dict, Tuple
+from shapely.geometry import Polygon
+from shapely.prepared import prep
+from shapely.strtree import STRtree
+from scipy.spatial import cKDTree
+
+logger = logging.getLogger(__name__)
+
+
+class OpenSpaceIndex:
+    """
+    Static STRtree index over open spaces
+    Built once per placement run and shared by every chromosome
+    Each space is prepared so repeated containment tests skip geometry setup
+    """
+
+    def __init__(self, open_spaces: List[Polygon]):
+        self.spaces = list(open_spaces)
+        self.prepared = [prep(space) for space in self.spaces]
+        self.tree = STRtree(self.spaces)
+
+        all_bounds = [space.bounds for space in self.spaces]
+        self.bounds = (
+            min(b[0] for b in all_bounds),
+            min(b[1] for b in all_bounds),
+            max(b[2] for b in all_bounds),
+            max(b[3] for b in all_bounds),
+        )
+
+    def contains(self, geometry: Polygon) -> bool:
+        """True if a single open space fully contains the geometry"""
+        # Bounding-box candidates from the tree, exact test on prepared spaces
+        for idx in self.tree.query(geometry):
+            if self.prepared[idx].contains(geometry):
+                return True
+        return False
+
+    def contains_many(self, geometries: np.ndarray) -> np.ndarray:
+        """Vectorized contains over an array of geometries"""
+        result = np.zeros(len(geometries), dtype=bool)
+        if len(geometries) == 0:
+            return result
+        geom_idx, space_idx = self.tree.query(geometries)
+        # Spaces were prepared in place by prep(), so this runs prepared predicates
+        hits = shapely.contains(self.tree.geometries[space_idx], geometries[geom_idx])
+        result[geom_idx[hits]] = True
+        return result
+
+    def space_contains(self, space_idx: int, geometry: Polygon) -> bool:
+        """True if the given open space fully contains the geometry"""
+        return self.prepared[space_idx].contains(geometry)
+
+
+class IlotGrid:
+    """
+    Uniform hash grid over placed îlots
+    Updated incrementally as îlots are accepted during a fitness evaluation
+    """
+
+    def __init__(self, cell_size: float):
+        self.cell_size = max(cell_size, 1e-6)
+        self.cells: Dict[Tuple[int, int], List[Polygon]] = {}
+
+    @classmethod
+    def for_specs(cls, ilot_specs: List[Dict], min_spacing: float) -> 'IlotGrid':
+        """Size cells so an îlot plus its spacing spans at most a few cells"""
+        if not ilot_specs:
+            return cls(1.0)
+        largest = max(max(spec['width'], spec['height']) for spec in ilot_specs)
+        return cls(largest + min_spacing)
+
+    def _cell_range(self, bounds: Tuple[float, float, float, float], pad: float = 0.0):
+        min_x, min_y, max_x, max_y = bounds
+        return (
+            int(math.floor((min_x - pad) / self.cell_size)),
+            int(math.floor((min_y - pad) / self.cell_size)),
+            int(math.floor((max_x + pad) / self.cell_size)),
+            int(math.floor((max_y + pad) / self.cell_size)),
+        )
+
+    def add(self, polygon: Polygon):
+        """Register a placed îlot in every cell its bounds touch"""
+        i0, j0, i1, j1 = self._cell_range(polygon.bounds)
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                self.cells.setdefault((i, j), []).append(polygon)
+
+    def candidates(self, polygon: Polygon, radius: float) -> List[Polygon]:
+        """Placed îlots whose cells lie within radius of the polygon's bounds"""
+        i0, j0, i1, j1 = self._cell_range(polygon.bounds, radius)
+        seen = set()
+        found = []
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                for other in self.cells.get((i, j), ()):
+                    if id(other) not in seen:
+                        seen.add(id(other))
+                        found.append(other)
+        return found
+
+    def has_neighbor_within(self, polygon: Polygon, distance: float) -> bool:
+        """True if any placed îlot is closer than distance to the polygon"""
+        for other in self.candidates(polygon, distance):
+            if polygon.distance(other) < distance:
+                return True
+        return False
+
+    def clear(self):
+        self.cells.clear()
+
+
+class CentroidIndex:
+    """
+    KD-tree neighbour queries over îlot centroids
+    Shared by corridor connection building and layout analytics
+    """
+
+    def __init__(self, points):
+        self.points = np.asarray(points, dtype=float).reshape(-1, 2)
+        self.tree = cKDTree(self.points)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def k_nearest(self, k: int, tie_break=None) -> List[List[int]]:
+        """
+        Indices of the k nearest other points of every point, nearest first
+        Equal distances are ordered by tie_break values (default: point index)
+        """
+        n = len(self.points)
+        k = min(k, n - 1)
+        if k <= 0:
+            return [[] for _ in range(n)]
+        keys = np.arange(n) if tie_break is None else np.asarray(tie_break)
+
+        # Distance to the k-th neighbour (column 0 is the point itself), then every
+        # point within it so ties at the cut-off are ranked consistently
+        kth_distances = self.tree.query(self.points, k=k + 1)[0][:, k]
+        candidates = self.tree.query_ball_point(self.points, kth_distances * (1 + 1e-9))
+
+        neighbors = []
+        for i, found in enumerate(candidates):
+            found = np.array([j for j in found if j != i], dtype=np.int64)
+            distances = np.hypot(*(self.points[found] - self.points[i]).T)
+            order = np.lexsort((keys[found], distances))
+            neighbors.append(found[order[:k]].tolist())
+        return neighbors
+
+    def neighbor_counts(self, radius: float) -> np.ndarray:
+        """Number of other points within radius (inclusive) of every point"""
+        if len(self.points) == 0:
+            return np.zeros(0, dtype=np.int64)
+        return self.tree.query_ball_point(self.points, radius, return_length=True) - 1
+
+    def within(self, point: Tuple[float, float], radius: float) -> List[int]:
+        """Indices of points within radius (inclusive) of a point"""
+        if len(self.points) == 0:
+            return []
+        return sorted(self.tree.query_ball_point(point, radius))
+
+
+class IntervalIndex:
+    """
+    Static index over closed [low, high] intervals
+    Sorted by low end; the longest interval bounds how far back a query looks,
+    so an overlap query costs two binary searches plus the hits
+    """
+
+    def __init__(self, intervals):
+        intervals = np.asarray(intervals, dtype=float).reshape(-1, 2)
+        self.order = np.argsort(intervals[:, 0], kind='stable')
+        self.lows = intervals[self.order, 0]
+        self.highs = intervals[self.order, 1]
+        self.max_length = float((self.highs - self.lows).max()) if len(intervals) else 0.0
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def overlapping(self, low: float, high: float) -> np.ndarray:
+        """Indices (in input order) of intervals that overlap [low, high]"""
+        start = np.searchsorted(self.lows, low - self.max_length, side='left')
+        end = np.searchsorted(self.lows, high, side='right')
+        hits = self.highs[start:end] >= low
+        return np.sort(self.order[start:end][hits])
@@ -0,0 +1,301 @@
+"""
+Raster Tile Renderer
+Rasterizes a processing result into a z/x/y PNG tile pyramid with numpy and Pillow
+Tiles and their source geometry are cached on disk, keyed by a hash of the result
+"""
+
+import hashlib
+import io
+import logging
+import math
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import shapely
+from PIL import Image, ImageDraw
+from shapely.geometry import MultiPolygon, Polygon, box
+from shapely.strtree import STRtree
+
+from core.parse_cache import ParseCache
+
+logger = logging.getLogger(__name__)
+
+# Keys are sha256 hex digests; anything else never reaches the filesystem
+_KEY = re.compile(r'[0-9a-f]{64}')
+
+# Drawn bottom to top: (layer, fill RGBA, outline RGBA)
+TILE_LAYERS = (
+    ('corridors', (155, 89, 182, 150), (128, 0, 128, 255)),
+    ('ilots', (46, 204, 113, 205), (0, 100, 0, 255)),
+    ('walls', (50, 50, 50, 205), (0, 0, 0, 255)),
+    ('restricted_areas', (70, 130, 255, 180), (0, 0, 255, 255)),
+    ('entrances', (255, 68, 68, 180), (255, 0, 0, 255)),
+)
+
+
+@dataclass
+class TileSource:
+    """Geometry of one result with per-layer spatial indexes"""
+    layers: Dict[str, List[Polygon]]
+    trees: Dict[str, STRtree]
+    origin: Tuple[float, float]  # Top-left corner of the pyramid in plan coordinates
+    extent: float  # Side of the square covered by zoom level 0
+    max_zoom: int
+
+
+class TileRenderer:
+    """
+    Tile pyramid over a square around the plan; zoom z has 2^z x 2^z tiles,
+    y counted from the top. Only tiles that are requested get rendered
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, tile_size: int = 256,
+                 max_bytes: int = 512 * 1024 * 1024):
+        """
+        Args:
+            cache_dir: Tile cache directory (default: $TILE_CACHE_DIR or a temp subdirectory)
+            tile_size: Tile side in pixels
+            max_bytes: Total size cap; least recently used tiles are evicted past it
+        """
+        self.cache_dir = cache_dir or os.getenv(
+            'TILE_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'ilot_tile_cache')
+        )
+        self.tile_size = tile_size
+        self.max_bytes = max_bytes
+        self.min_pixel_size = 0.005  # Deepest zoom shows 5 mm per pixel
+        self.supersample = 2  # Render at 2x and downsample for anti-aliased edges
+        self.max_sources = 4  # Results kept indexed in memory
+        self.evict_every = 200  # Tile writes between cache size checks
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._sources: 'OrderedDict[str, TileSource]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def register(self, result) -> str:
+        """Store a ProcessingResult's geometry for tiling and return its key"""
+        layers = {
+            'walls': list(result.walls),
+            'restricted_areas': list(result.restricted_areas),
+            'entrances': list(result.entrances),
+            'ilots': [ilot.polygon for ilot in result.ilots],
+            'corridors': [corridor.polygon for corridor in result.corridors],
+        }
+
+        sha = hashlib.sha256()
+        arrays = {}
+        for name, _, _ in TILE_LAYERS:
+            data, offsets = ParseCache._encode(layers[name])
+            sha.update(name.encode())
+            sha.update(data.tobytes())
+            sha.update(offsets.tobytes())
+            arrays[f"{name}_wkb"], arrays[f"{name}_offsets"] = data, offsets
+        key = sha.hexdigest()
+
+        path = self._source_path(key)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    np.savez(f, **arrays)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                logger.warning(f"Failed to store tile source {key}: {e}")
+
+        self._remember(key, self._build_source(layers))
+        return key
+
+    @staticmethod
+    def valid_key(key: str) -> bool:
+        return isinstance(key, str) and _KEY.fullmatch(key) is not None
+    
+    def info(self, key: str) -> Optional[Dict]:
+        """Pyramid metadata for a key, None if unknown"""
+        source = self._source(key)
+        if source is None:
+            return None
+        return {
+            'key': key,
+            'tile_size': self.tile_size,
+            'min_zoom': 0,
+            'max_zoom': source.max_zoom,
+            'origin': list(source.origin),
+            'extent': source.extent
+        }
+
+    def tile(self, key: str, z: int, x: int, y: int) -> Optional[bytes]:
+        """PNG bytes of tile z/x/y, None for unknown keys or tiles outside the pyramid"""
+        if not self.valid_key(key):
+            return None
+        path = os.path.join(self.cache_dir, key, str(z), str(x), f"{y}.png")
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            pass
+
+        source = self._source(key)
+        if source is None or not 0 <= z <= source.max_zoom or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+            return None
+
+        data = self._render(source, z, x, y)
+        try:
+            os.utime(self._source_path(key))  # Keeps a source in use from being evicted
+        except OSError:
+            pass
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)  # Atomic, safe across worker processes
+        except OSError as e:
+            logger.warning(f"Failed to cache tile {key}/{z}/{x}/{y}: {e}")
+
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % self.evict_every == 0
+        if evict:
+            self._evict()
+        return data
+
+    def _render(self, source: TileSource, z: int, x: int, y: int) -> bytes:
+        span = source.extent / 2 ** z
+        min_x = source.origin[0] + x * span
+        max_y = source.origin[1] - y * span
+        bounds = box(min_x, max_y - span, min_x + span, max_y)
+
+        size = self.tile_size * self.supersample
+        scale = size / span
+        image = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+
+        for name, fill, outline in TILE_LAYERS:
+            hits = source.trees[name].query(bounds, predicate='intersects')
+            if len(hits) == 0:
+                continue
+
+            # One image per layer so holes can be cut without erasing layers below
+            layer = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(layer)
+            for index in np.sort(hits):
+                geometry = source.layers[name][index]
+                parts = geometry.geoms if isinstance(geometry, MultiPolygon) else [geometry]
+                for part in parts:
+                    if not isinstance(part, Polygon) or part.is_empty:
+                        continue
+                    draw.polygon(self._pixels(part.exterior, min_x, max_y, scale),
+                                 fill=fill, outline=outline)
+                    for hole in part.interiors:
+                        draw.polygon(self._pixels(hole, min_x, max_y, scale),
+                                     fill=(0, 0, 0, 0), outline=outline)
+            image = Image.alpha_composite(image, layer)
+
+        if self.supersample > 1:
+            image = image.resize((self.tile_size, self.tile_size), Image.LANCZOS)
+
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG', optimize=True)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _pixels(ring, min_x: float, max_y: float, scale: float) -> List[Tuple[float, float]]:
+        coords = shapely.get_coordinates(ring)
+        pixels = np.column_stack(((coords[:, 0] - min_x) * scale, (max_y - coords[:, 1]) * scale))
+        return [tuple(p) for p in pixels]
+
+    def _build_source(self, layers: Dict[str, List[Polygon]]) -> TileSource:
+        layers = {name: [g if g is not None else Polygon() for g in geoms]
+                  for name, geoms in layers.items()}
+        geoms = [g for geoms in layers.values() for g in geoms if not g.is_empty]
+        if geoms:
+            min_x, min_y, max_x, max_y = shapely.total_bounds(np.asarray(geoms, dtype=object))
+        else:
+            min_x = min_y = max_x = max_y = 0.0
+
+        extent = max(max_x - min_x, max_y - min_y, self.min_pixel_size * self.tile_size)
+        max_zoom = max(0, math.ceil(math.log2(extent / (self.tile_size * self.min_pixel_size))))
+        return TileSource(
+            layers=layers,
+            trees={name: STRtree(geoms) for name, geoms in layers.items()},
+            origin=(float(min_x), float(min_y + extent)),
+            extent=float(extent),
+            max_zoom=max_zoom
+        )
+
+    def _source(self, key: str) -> Optional[TileSource]:
+        """Indexed geometry for a key, reloaded from disk when not in memory"""
+        if not self.valid_key(key):
+            return None
+        with self._lock:
+            source = self._sources.get(key)
+            if source is not None:
+                self._sources.move_to_end(key)
+                return source
+
+        try:
+            with np.load(self._source_path(key), allow_pickle=False) as data:
+                layers = {name: ParseCache._decode(data[f"{name}_wkb"], data[f"{name}_offsets"])
+                          for name, _, _ in TILE_LAYERS}
+        except (FileNotFoundError, ValueError):
+            return None
+        except Exception as e:
+            logger.warning(f"Unreadable tile source {key}: {e}")
+            return None
+
+        source = self._build_source(layers)
+        self._remember(key, source)
+        return source
+
+    def _remember(self, key: str, source: TileSource):
+        with self._lock:
+            self._sources[key] = source
+            self._sources.move_to_end(key)
+            while len(self._sources) > self.max_sources:
+                self._sources.popitem(last=False)
+
+    def _source_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key, 'source.npz')
+
+    def _evict(self):
+        """
+        Drop least recently used tiles and sources until the cache fits
+        max_bytes, then remove directories left empty
+        """
+        entries = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if not name.endswith(('.png', '.npz')):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+        
+        for root, _, _ in os.walk(self.cache_dir, topdown=False):
+            if root != self.cache_dir:
+                try:
+                    os.rmdir(root)  # Fails, as intended, unless empty
+                except OSError:
+                    pass
@@ -15,6 +15,8 @@ from scipy.optimize import differential_evolution
 import math
 import logging
 
+from core.placement_constraints import PlacementConstraints
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -207,10 +209,13 @@ class AdvancedIlotPlacementEngine:
         # Sort specs by area (largest first for better packing)
         sorted_specs = sorted(specs, key=lambda x: x.area, reverse=True)
         
+        # Prepared zone predicates, reused for every grid candidate
+        constraints = PlacementConstraints(available_zones, forbidden_zones)
+        
         # Use grid-based placement with optimization
         for spec in sorted_specs:
             best_placement = self._find_optimal_placement(
-                spec, available_zones, forbidden_zones, placed_ilots
+                spec, available_zones, constraints, placed_ilots
             )
             
             if best_placement:
@@ -221,14 +226,14 @@ class AdvancedIlotPlacementEngine:
     
     def _find_optimal_placement(self, spec: IlotSpecification, 
                                available_zones: List[Polygon],
-                               forbidden_zones: Polygon,
+                               constraints: PlacementConstraints,
                                existing_ilots: List[PlacedIlot]) -> Optional[PlacedIlot]:
         """Find optimal placement for a single îlot"""
         best_score = -1
         best_placement = None
         
         # Try placement in each available zone
-        for zone in available_zones:
+        for zone_idx, zone in enumerate(available_zones):
             bounds = zone.bounds
             
             # Grid search within zone
@@ -247,7 +252,7 @@ class AdvancedIlotPlacementEngine:
                         candidate_polygon = box(x, y, x + w, y + h)
                         
                         # Check placement validity
-                        if self._is_valid_placement(candidate_polygon, zone, forbidden_zones, existing_ilots):
+                        if self._is_valid_placement(candidate_polygon, zone_idx, constraints, existing_ilots):
                             # Calculate placement score
                             score = self._calculate_placement_score(candidate_polygon, zone, existing_ilots)
                             
@@ -269,16 +274,16 @@ class AdvancedIlotPlacementEngine:
         
         return best_placement
     
-    def _is_valid_placement(self, candidate: Polygon, zone: Polygon, 
-                           forbidden_zones: Polygon, existing_ilots: List[PlacedIlot]) -> bool:
+    def _is_valid_placement(self, candidate: Polygon, zone_idx: int, 
+                           constraints: PlacementConstraints, existing_ilots: List[PlacedIlot]) -> bool:
         """Check if îlot placement is valid"""
         
         # Must be fully within available zone
-        if not zone.contains(candidate):
+        if not constraints.in_space(zone_idx, candidate):
             return False
         
         # Must not intersect forbidden zones
-        if forbidden_zones.is_valid and candidate.intersects(forbidden_zones):
+        if constraints.hits_forbidden(candidate):
             return False
         
         # Must maintain minimum spacing from existing îlots
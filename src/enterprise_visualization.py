@@ -14,6 +14,8 @@ import matplotlib.patches as patches
 from matplotlib.colors import LinearSegmentedColormap
 import cv2
 
+from core.plot_backend import select_backend, WEBGL_VERTEX_THRESHOLD
+
 class EnterpriseVisualizationEngine:
     """Enterprise-grade visualization engine for architectural layouts"""
     
@@ -56,6 +58,8 @@ class EnterpriseVisualizationEngine:
             'title_font_size': 16,
             'grid_alpha': 0.3
         }
+        
+        self.webgl_vertex_threshold = WEBGL_VERTEX_THRESHOLD  # Larger plans render 2D views with WebGL
     
     def create_comprehensive_layout_visualization(self, 
                                                 layout_data: Dict[str, Any],
@@ -101,6 +105,7 @@ class EnterpriseVisualizationEngine:
         # Configure layout
         self._configure_2d_layout(fig, layout_data, dxf_data)
         
+        select_backend(fig, self.webgl_vertex_threshold)
         return fig
     
     def _create_3d_comprehensive_view(self, layout_data: Dict[str, Any], dxf_data: Dict[str, Any]) -> go.Figure:
@@ -681,6 +686,7 @@ class EnterpriseVisualizationEngine:
             height=700
         )
         
+        select_backend(fig, self.webgl_vertex_threshold)
         return fig
     
     def create_security_analysis(self, layout_data: Dict[str, Any], dxf_data: Dict[str, Any]) -> go.Figure:
@@ -732,6 +738,7 @@ class EnterpriseVisualizationEngine:
             height=700
         )
         
+        select_backend(fig, self.webgl_vertex_threshold)
         return fig
     
     def export_visualization_data(self, layout_data: Dict[str, Any], dxf_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -4,6 +4,7 @@ Advanced corridor generation with pathfinding and optimization
 """
 
 import numpy as np
+import shapely
 from typing import List, Dict, Tuple, Optional, Set
 from dataclasses import dataclass
 from shapely.geometry import Polygon, Point, LineString, box
@@ -11,11 +12,27 @@ from shapely.ops import unary_union, linemerge
 import networkx as nx
 from scipy.spatial import Voronoi, voronoi_plot_2d
 from scipy.spatial.distance import cdist
+from scipy import ndimage
+from collections import OrderedDict
+import hashlib
+import heapq
 import math
 import logging
 
+from core.spatial_index import CentroidIndex
+
 logger = logging.getLogger(__name__)
 
+# 8-connected grid moves as (d_col, d_row, cost)
+GRID_MOVES = [
+    (-1, 0, 1.0), (1, 0, 1.0), (0, -1, 1.0), (0, 1, 1.0),
+    (-1, -1, math.sqrt(2)), (-1, 1, math.sqrt(2)), (1, -1, math.sqrt(2)), (1, 1, math.sqrt(2)),
+]
+
+# Static pathfinding layers (walls, restricted areas, available space), keyed by plan geometry
+STATIC_GRID_CACHE_SIZE = 8
+_static_grid_cache: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+
 @dataclass
 class CorridorConfig:
     """Configuration for corridor generation"""
@@ -96,8 +113,19 @@ class IntelligentCorridorSystem:
         
         # Pathfinding grid
         self.grid_resolution = 0.1
-        self.pathfinding_grid = None
+        self.pathfinding_grid = None  # Static layer, shared through the plan cache
+        self.ilot_layer = None  # Îlot index + 1 per cell, 0 where free
         self.grid_bounds = None
+        self.ilots_block_paths = True  # Route around îlots other than a path's endpoints
+        
+        # Hierarchical search: blocks of coarse_factor² cells, refined at full
+        # resolution in a band of refine_margin blocks around the coarse path
+        self.coarse_factor = 8
+        self.refine_margin = 1
+        self.hierarchical_min_cells = 250000
+        self._blocked = None
+        self._coarse_blocked = None
+        self._ilot_windows = []
 
     def generate_corridor_network(self, ilots: List[Dict], walls: List[Dict], 
                                  restricted_areas: List[Dict], entrances: List[Dict], 
@@ -232,24 +260,23 @@ class IntelligentCorridorSystem:
         return processed_space
 
     def _create_pathfinding_grid(self):
-        """Create grid for pathfinding algorithms"""
+        """
+        Create grid for pathfinding algorithms
+        The static layer is cached per plan, so a run with the same walls and
+        spaces only rasterizes the îlot layer
+        """
         logger.info("Creating pathfinding grid")
         
         # Determine grid bounds
-        all_geometries = []
-        for ilot in self.ilots:
-            all_geometries.append(ilot['polygon'])
-        all_geometries.extend(self.walls)
-        all_geometries.extend(self.restricted_areas)
-        all_geometries.extend(self.available_space)
+        static_geometries = self.walls + self.restricted_areas + self.available_space
+        all_geometries = [ilot['polygon'] for ilot in self.ilots] + static_geometries
         
         if not all_geometries:
             logger.warning("No geometries found for grid creation")
             return
         
         # Calculate bounds
-        union_geom = unary_union(all_geometries)
-        bounds = union_geom.bounds
+        bounds = shapely.total_bounds(np.asarray(all_geometries, dtype=object)).tolist()
         
         # Expand bounds slightly
         margin = 2.0
@@ -265,42 +292,119 @@ class IntelligentCorridorSystem:
         cols = int(width / self.grid_resolution)
         rows = int(height / self.grid_resolution)
         
-        self.pathfinding_grid = np.zeros((rows, cols), dtype=np.int8)
+        # Static layer: walls, restricted areas and available space
+        cache_key = self._static_grid_key(rows, cols)
+        static_grid = _static_grid_cache.get(cache_key)
+        if static_grid is None:
+            static_grid = np.zeros((rows, cols), dtype=np.int8)
+            static_grid[self._rasterize_obstacles(rows, cols)] = 1
+            _static_grid_cache[cache_key] = static_grid
+            while len(_static_grid_cache) > STATIC_GRID_CACHE_SIZE:
+                _static_grid_cache.popitem(last=False)
+        else:
+            logger.info("Reusing cached static pathfinding grid")
+            _static_grid_cache.move_to_end(cache_key)
+        self.pathfinding_grid = static_grid
+        
+        # Dynamic layer: îlots
+        self.ilot_layer = self._rasterize_ilots(rows, cols)
+        self._blocked = static_grid == 1
+        if self.ilots_block_paths:
+            self._blocked |= self.ilot_layer > 0
+        self._coarse_blocked = self._coarsen(self._blocked)
+    
+    def _static_grid_key(self, rows: int, cols: int) -> str:
+        """Cache key for the static layer: plan geometry plus grid settings"""
+        digest = hashlib.sha1()
+        for layer in (self.walls, self.restricted_areas, self.available_space):
+            for wkb in shapely.to_wkb(np.asarray(layer, dtype=object)):
+                digest.update(wkb)
+            digest.update(b'|')
+        digest.update(repr((self.grid_bounds, rows, cols, self.grid_resolution, self.config.width)).encode())
+        return digest.hexdigest()
+    
+    def _rasterize_ilots(self, rows: int, cols: int) -> np.ndarray:
+        """Label grid with îlot index + 1 under each îlot footprint"""
+        xs = self.grid_bounds[0] + np.arange(cols) * self.grid_resolution
+        ys = self.grid_bounds[1] + np.arange(rows) * self.grid_resolution
+        labels = np.zeros((rows, cols), dtype=np.int32)
+        
+        self._ilot_windows = []
+        for label, ilot in enumerate(self.ilots, start=1):
+            window = self._grid_window(ilot['polygon'].bounds, xs, ys)
+            self._ilot_windows.append(window)
+            if window is None:
+                continue
+            row0, row1, col0, col1 = window
+            grid_x, grid_y = np.meshgrid(xs[col0:col1], ys[row0:row1])
+            inside = shapely.contains_xy(ilot['polygon'], grid_x, grid_y)
+            labels[row0:row1, col0:col1][inside] = label
         
-        # Mark obstacles in grid
-        for row in range(rows):
-            for col in range(cols):
-                x = self.grid_bounds[0] + col * self.grid_resolution
-                y = self.grid_bounds[1] + row * self.grid_resolution
-                point = Point(x, y)
-                
-                # Check if point is in obstacle
-                is_obstacle = False
-                
-                # Check walls
-                for wall in self.walls:
-                    if wall.contains(point) or wall.distance(point) < self.config.width / 2:
-                        is_obstacle = True
-                        break
-                
-                # Check restricted areas
-                if not is_obstacle:
-                    for restricted in self.restricted_areas:
-                        if restricted.contains(point):
-                            is_obstacle = True
-                            break
-                
-                # Check if outside available space
-                if not is_obstacle and self.available_space:
-                    in_available = False
-                    for space in self.available_space:
-                        if space.contains(point):
-                            in_available = True
-                            break
-                    if not in_available:
-                        is_obstacle = True
-                
-                self.pathfinding_grid[row, col] = 1 if is_obstacle else 0
+        return labels
+    
+    def _coarsen(self, blocked: np.ndarray) -> np.ndarray:
+        """
+        Coarse level of the obstacle mask
+        A block is blocked only if every cell in it is, so the coarse level never
+        disconnects cells that are connected at full resolution
+        """
+        factor = self.coarse_factor
+        rows, cols = blocked.shape
+        padded = np.ones((-(-rows // factor) * factor, -(-cols // factor) * factor), dtype=bool)
+        padded[:rows, :cols] = blocked
+        return padded.reshape(padded.shape[0] // factor, factor, padded.shape[1] // factor, factor).all(axis=(1, 3))
+    
+    def _rasterize_obstacles(self, rows: int, cols: int) -> np.ndarray:
+        """
+        Burn walls, restricted areas and available space into a boolean obstacle mask
+        Each layer is unioned once and tested against the grid points in bulk with
+        contains_xy, limited to the layer's bounding-box window of the grid
+        """
+        xs = self.grid_bounds[0] + np.arange(cols) * self.grid_resolution
+        ys = self.grid_bounds[1] + np.arange(rows) * self.grid_resolution
+        obstacle = np.zeros((rows, cols), dtype=bool)
+        
+        # Walls plus half a corridor width of clearance
+        if self.walls:
+            clearance = shapely.union_all(shapely.buffer(np.asarray(self.walls, dtype=object), self.config.width / 2))
+            obstacle |= self._burn_polygon(clearance, xs, ys)
+        
+        if self.restricted_areas:
+            obstacle |= self._burn_polygon(unary_union(self.restricted_areas), xs, ys)
+        
+        # Everything outside available space
+        if self.available_space:
+            obstacle |= ~self._burn_polygon(unary_union(self.available_space), xs, ys)
+        
+        return obstacle
+    
+    def _burn_polygon(self, geometry, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Boolean mask of grid points (ys × xs) that lie inside the geometry"""
+        mask = np.zeros((len(ys), len(xs)), dtype=bool)
+        if geometry.is_empty:
+            return mask
+        
+        # Only points inside the geometry's bounds can hit it
+        window = self._grid_window(geometry.bounds, xs, ys)
+        if window is None:
+            return mask
+        row0, row1, col0, col1 = window
+        
+        shapely.prepare(geometry)
+        grid_x, grid_y = np.meshgrid(xs[col0:col1], ys[row0:row1])
+        mask[row0:row1, col0:col1] = shapely.contains_xy(geometry, grid_x, grid_y)
+        return mask
+    
+    @staticmethod
+    def _grid_window(bounds: Tuple[float, float, float, float], xs: np.ndarray,
+                     ys: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+        """(row0, row1, col0, col1) slice of grid points within bounds, None if empty"""
+        min_x, min_y, max_x, max_y = bounds
+        col0, col1 = np.searchsorted(xs, min_x), np.searchsorted(xs, max_x, side='right')
+        row0, row1 = np.searchsorted(ys, min_y), np.searchsorted(ys, max_y, side='right')
+        if col0 >= col1 or row0 >= row1:
+            return None
+        return int(row0), int(row1), int(col0), int(col1)
 
     def _generate_initial_network(self) -> List[CorridorSegment]:
         """Generate initial corridor network using graph algorithms"""
@@ -327,15 +431,13 @@ class IntelligentCorridorSystem:
         else:
             connections = self._generate_proximity_connections()
         
+        # Find optimal paths, one multi-target search per source îlot
+        paths = self._find_connection_paths(connections)
+        
         # Create corridor segments
         segments = []
         for i, connection in enumerate(connections):
-            start_id, end_id = connection
-            start_ilot = next(ilot for ilot in self.ilots if ilot['id'] == start_id)
-            end_ilot = next(ilot for ilot in self.ilots if ilot['id'] == end_id)
-            
-            # Find optimal path between îlots
-            path = self._find_optimal_path(start_ilot, end_ilot)
+            path = paths.get(connection)
             
             if path and len(path) >= 2:
                 # Create corridor segment
@@ -396,29 +498,83 @@ class IntelligentCorridorSystem:
         """Generate connections based on proximity and accessibility"""
         connections = []
         
+        seen = set()
+        
         # Sort îlots by area (connect larger îlots first)
         sorted_ilots = sorted(self.ilots, key=lambda x: x['area'], reverse=True)
+        ids = [ilot['id'] for ilot in sorted_ilots]
         
-        for i, ilot in enumerate(sorted_ilots):
-            # Find nearest neighbors
-            distances = []
-            for j, other_ilot in enumerate(sorted_ilots):
-                if i != j:
-                    dist = ilot['centroid'].distance(other_ilot['centroid'])
-                    distances.append((dist, other_ilot['id']))
-            
-            # Connect to 2-3 nearest neighbors
-            distances.sort()
-            max_connections = min(3, len(distances))
-            
-            for k in range(max_connections):
-                _, neighbor_id = distances[k]
+        # Connect to 2-3 nearest neighbors, ties broken by îlot id
+        index = CentroidIndex([(ilot['centroid'].x, ilot['centroid'].y) for ilot in sorted_ilots])
+        nearest = index.k_nearest(3, tie_break=ids)
+        
+        for ilot, neighbors in zip(sorted_ilots, nearest):
+            for j in neighbors:
+                neighbor_id = ids[j]
                 connection = (min(ilot['id'], neighbor_id), max(ilot['id'], neighbor_id))
-                if connection not in connections:
+                if connection not in seen:
+                    seen.add(connection)
                     connections.append(connection)
         
         return connections
 
+    def _find_connection_paths(self, connections: List[Tuple[int, int]]) -> Dict[Tuple[int, int], List[Tuple[float, float]]]:
+        """
+        Find paths for all connections
+        Edges are grouped by the endpoint with more connections, so a single
+        search from that îlot serves all of its edges
+        """
+        ilots_by_id = {ilot['id']: ilot for ilot in self.ilots}
+        
+        degree = {}
+        for start_id, end_id in connections:
+            degree[start_id] = degree.get(start_id, 0) + 1
+            degree[end_id] = degree.get(end_id, 0) + 1
+        
+        # source id -> [(connection, target id)]
+        searches = {}
+        for connection in connections:
+            start_id, end_id = connection
+            if degree[end_id] > degree[start_id]:
+                searches.setdefault(end_id, []).append((connection, start_id))
+            else:
+                searches.setdefault(start_id, []).append((connection, end_id))
+        
+        paths = {}
+        for source_id, edges in searches.items():
+            source_ilot = ilots_by_id[source_id]
+            target_ilots = [ilots_by_id[target_id] for _, target_id in edges]
+            
+            for (connection, target_id), path in zip(edges, self._find_optimal_paths(source_ilot, target_ilots)):
+                # Paths always run from the connection's first îlot to its second
+                paths[connection] = path if connection[0] == source_id else path[::-1]
+        
+        return paths
+    
+    def _find_optimal_paths(self, start_ilot: Dict, end_ilots: List[Dict]) -> List[List[Tuple[float, float]]]:
+        """Find optimal paths from one îlot to several îlots with a single search"""
+        if len(end_ilots) == 1:
+            return [self._find_optimal_path(start_ilot, end_ilots[0])]
+        
+        start_pos = (start_ilot['centroid'].x, start_ilot['centroid'].y)
+        end_positions = [(ilot['centroid'].x, ilot['centroid'].y) for ilot in end_ilots]
+        
+        if self.pathfinding_grid is None:
+            return [[start_pos, end_pos] for end_pos in end_positions]
+        
+        start_grid = self._world_to_grid(start_pos)
+        end_grids = [self._world_to_grid(pos) for pos in end_positions]
+        
+        found = {}
+        if start_grid is not None:
+            found = self._grid_search(start_grid, [g for g in end_grids if g is not None])
+        
+        # Unreachable targets fall back to a straight line
+        return [
+            found.get(end_grid) or [start_pos, end_pos]
+            for end_grid, end_pos in zip(end_grids, end_positions)
+        ]
+    
     def _find_optimal_path(self, start_ilot: Dict, end_ilot: Dict) -> List[Tuple[float, float]]:
         """Find optimal path between two îlots using A* algorithm"""
         if not self.pathfinding_grid is None:
@@ -441,49 +597,208 @@ class IntelligentCorridorSystem:
         if start_grid is None or end_grid is None:
             return [start_pos, end_pos]
         
-        # A* algorithm
-        open_set = [(0, start_grid, [])]
-        closed_set = set()
+        path = self._grid_search(start_grid, [end_grid]).get(end_grid)
+        
+        # No path found, return straight line
+        return path or [start_pos, end_pos]
+    
+    def _grid_search(self, start_grid: Tuple[int, int],
+                     target_grids: List[Tuple[int, int]]) -> Dict[Tuple[int, int], List[Tuple[float, float]]]:
+        """
+        Search the pathfinding grid from one cell to one or more target cells
+        Large grids are searched hierarchically: coarse first, then refined at full
+        resolution around the coarse path
+        
+        Returns:
+            {target grid cell: world path from start to target} for reachable targets
+        """
+        blocked, coarse_blocked = self._search_masks([start_grid] + list(target_grids))
+        rows, cols = blocked.shape
+        
+        if self.coarse_factor > 1 and rows * cols >= self.hierarchical_min_cells:
+            cell_paths = self._hierarchical_search(blocked, coarse_blocked, start_grid, target_grids)
+        else:
+            cell_paths = self._search_cells(blocked, start_grid, target_grids)
+        
+        # Convert paths back to world coordinates
+        return {
+            target: [self._grid_to_world(cell) for cell in cells]
+            for target, cells in cell_paths.items()
+        }
+    
+    def _search_masks(self, endpoints: List[Tuple[int, int]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Fine and coarse obstacle masks with the endpoints' own îlots opened up"""
+        labels = {int(self.ilot_layer[row, col]) for col, row in endpoints} - {0}
+        if not labels or not self.ilots_block_paths:
+            return self._blocked, self._coarse_blocked
+        
+        blocked = self._blocked.copy()
+        coarse_blocked = self._coarse_blocked.copy()
+        factor = self.coarse_factor
+        for label in labels:
+            row0, row1, col0, col1 = self._ilot_windows[label - 1]
+            footprint = self.ilot_layer[row0:row1, col0:col1] == label
+            static = self.pathfinding_grid[row0:row1, col0:col1] == 1
+            blocked[row0:row1, col0:col1][footprint & ~static] = False
+            coarse_blocked[row0 // factor:(row1 - 1) // factor + 1, col0 // factor:(col1 - 1) // factor + 1] = False
+        
+        return blocked, coarse_blocked
+    
+    def _hierarchical_search(self, blocked: np.ndarray, coarse_blocked: np.ndarray,
+                             start_grid: Tuple[int, int],
+                             target_grids: List[Tuple[int, int]]) -> Dict[Tuple[int, int], List[Tuple[int, int]]]:
+        """HPA*-style search: coarse paths, refined at full resolution"""
+        factor = self.coarse_factor
+        coarse_start = (start_grid[0] // factor, start_grid[1] // factor)
+        coarse_targets = {target: (target[0] // factor, target[1] // factor) for target in target_grids}
+        coarse_paths = self._search_cells(coarse_blocked, coarse_start, list(set(coarse_targets.values())))
+        
+        # Targets the coarse level cannot reach are unreachable at full resolution too
+        paths = {}
+        unresolved = []
+        for target, coarse_target in coarse_targets.items():
+            if coarse_target not in coarse_paths:
+                continue
+            path = self._refine_path(blocked, coarse_paths[coarse_target], start_grid, target)
+            if path is None:
+                unresolved.append(target)
+            else:
+                paths[target] = path
+        
+        # The band around a coarse path can miss a passage; search the targets
+        # that are actually connected to the start in full
+        if unresolved:
+            unresolved = self._connected_targets(blocked, start_grid, unresolved)
+        if unresolved:
+            paths.update(self._search_cells(blocked, start_grid, unresolved))
+        
+        return paths
+    
+    def _refine_path(self, blocked: np.ndarray, coarse_path: List[Tuple[int, int]],
+                     start_grid: Tuple[int, int], target_grid: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """Full-resolution search confined to a band around a coarse path"""
+        factor = self.coarse_factor
+        margin = self.refine_margin
+        rows, cols = blocked.shape
+        
+        coarse_cols = np.array([col for col, _ in coarse_path])
+        coarse_rows = np.array([row for _, row in coarse_path])
+        row_lo = coarse_rows.min() - margin
+        col_lo = coarse_cols.min() - margin
+        
+        band = np.zeros((coarse_rows.max() - row_lo + margin + 1, coarse_cols.max() - col_lo + margin + 1), dtype=bool)
+        band[coarse_rows - row_lo, coarse_cols - col_lo] = True
+        if margin > 0:
+            band = ndimage.binary_dilation(band, structure=np.ones((3, 3), dtype=bool), iterations=margin)
+        band = np.repeat(np.repeat(band, factor, axis=0), factor, axis=1)
+        
+        # Clip the band to the grid
+        row_origin, col_origin = row_lo * factor, col_lo * factor
+        row0, col0 = max(row_origin, 0), max(col_origin, 0)
+        row1, col1 = min(row_origin + band.shape[0], rows), min(col_origin + band.shape[1], cols)
+        band = band[row0 - row_origin:row1 - row_origin, col0 - col_origin:col1 - col_origin]
+        
+        window = blocked[row0:row1, col0:col1] | ~band
+        local_target = (target_grid[0] - col0, target_grid[1] - row0)
+        local_paths = self._search_cells(window, (start_grid[0] - col0, start_grid[1] - row0), [local_target])
+        
+        if local_target not in local_paths:
+            return None
+        return [(col + col0, row + row0) for col, row in local_paths[local_target]]
+    
+    @staticmethod
+    def _connected_targets(blocked: np.ndarray, start_grid: Tuple[int, int],
+                           target_grids: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Targets in the same 8-connected free region as the start"""
+        components, _ = ndimage.label(~blocked, structure=np.ones((3, 3), dtype=bool))
+        rows, cols = blocked.shape
+        start_col, start_row = start_grid
+        
+        # The start cell itself may sit in an obstacle; it still steps onto free neighbours
+        reachable = set(np.unique(components[
+            max(start_row - 1, 0):start_row + 2, max(start_col - 1, 0):start_col + 2
+        ]).tolist()) - {0}
+        return [(col, row) for col, row in target_grids if components[row, col] in reachable]
+    
+    @staticmethod
+    def _search_cells(blocked: np.ndarray, start_grid: Tuple[int, int],
+                      target_grids: List[Tuple[int, int]]) -> Dict[Tuple[int, int], List[Tuple[int, int]]]:
+        """
+        Binary-heap A* over a boolean obstacle mask
+        With one target it is guided by the octile-distance heuristic; with several
+        it runs uninformed (Dijkstra) until every target is settled, so each path
+        is still shortest. Costs and parents live in flat NumPy arrays.
+        
+        Returns:
+            {target cell: cells from start to target} for reachable targets
+        """
+        rows, cols = blocked.shape
+        blocked = blocked.ravel()
+        
+        g_score = np.full(rows * cols, np.inf)
+        parent = np.full(rows * cols, -1, dtype=np.int64)
+        closed = np.zeros(rows * cols, dtype=bool)
+        
+        remaining = {row * cols + col for col, row in target_grids}
+        settled = set()
         
-        while open_set:
-            current_cost, current_pos, path = open_set.pop(0)
+        if len(target_grids) == 1:
+            goal_col, goal_row = target_grids[0]
             
-            if current_pos == end_grid:
-                # Convert path back to world coordinates
-                world_path = [self._grid_to_world(pos) for pos in path + [current_pos]]
-                return world_path
+            def heuristic(col, row):
+                dx = abs(col - goal_col)
+                dy = abs(row - goal_row)
+                return max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy)
+        else:
+            def heuristic(col, row):
+                return 0.0
+        
+        start_idx = start_grid[1] * cols + start_grid[0]
+        g_score[start_idx] = 0.0
+        open_heap = [(heuristic(*start_grid), 0.0, start_idx)]
+        
+        while open_heap and remaining:
+            _, current_g, current_idx = heapq.heappop(open_heap)
             
-            if current_pos in closed_set:
+            if closed[current_idx]:
                 continue
+            closed[current_idx] = True
+            
+            if current_idx in remaining:
+                remaining.discard(current_idx)
+                settled.add(current_idx)
             
-            closed_set.add(current_pos)
+            row, col = divmod(current_idx, cols)
             
             # Check neighbors
-            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]:
-                new_pos = (current_pos[0] + dx, current_pos[1] + dy)
+            for d_col, d_row, move_cost in GRID_MOVES:
+                new_col = col + d_col
+                new_row = row + d_row
                 
-                if (new_pos[0] < 0 or new_pos[0] >= self.pathfinding_grid.shape[1] or
-                    new_pos[1] < 0 or new_pos[1] >= self.pathfinding_grid.shape[0]):
+                if new_col < 0 or new_col >= cols or new_row < 0 or new_row >= rows:
                     continue
                 
-                if self.pathfinding_grid[new_pos[1], new_pos[0]] == 1:  # Obstacle
+                new_idx = new_row * cols + new_col
+                if blocked[new_idx] or closed[new_idx]:
                     continue
                 
-                if new_pos in closed_set:
-                    continue
-                
-                # Calculate costs
-                move_cost = math.sqrt(dx*dx + dy*dy)
-                new_cost = current_cost + move_cost
-                heuristic = math.sqrt((new_pos[0] - end_grid[0])**2 + (new_pos[1] - end_grid[1])**2)
-                total_cost = new_cost + heuristic
-                
-                # Add to open set
-                open_set.append((total_cost, new_pos, path + [current_pos]))
-                open_set.sort()
+                new_g = current_g + move_cost
+                if new_g < g_score[new_idx]:
+                    g_score[new_idx] = new_g
+                    parent[new_idx] = current_idx
+                    heapq.heappush(open_heap, (new_g + heuristic(new_col, new_row), new_g, new_idx))
+        
+        paths = {}
+        for target_idx in settled:
+            cells = [target_idx]
+            while cells[-1] != start_idx:
+                cells.append(int(parent[cells[-1]]))
+            cells.reverse()
+            
+            target_row, target_col = divmod(target_idx, cols)
+            paths[(target_col, target_row)] = [(idx % cols, idx // cols) for idx in cells]
         
-        # No path found, return straight line
-        return [start_pos, end_pos]
+        return paths
 
     def _world_to_grid(self, world_pos: Tuple[float, float]) -> Optional[Tuple[int, int]]:
         """Convert world coordinates to grid coordinates"""
@@ -13,6 +13,8 @@ from datetime import datetime
 from shapely.geometry import Polygon, Point
 from shapely.ops import unary_union
 
+from core.spatial_index import CentroidIndex
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -636,34 +638,16 @@ class SpatialAnalyzer:
             return {'average_density': 0.0, 'density_variance': 0.0, 'balance_score': 0.0}
         
         # Calculate local densities
-        densities = []
-        for i, ilot in enumerate(ilots):
-            if 'x' not in ilot or 'y' not in ilot:
-                continue
-            
-            # Count nearby îlots within radius
-            radius = 5.0  # 5 meter radius
-            nearby_count = 0
-            
-            ilot_center = (ilot['x'] + ilot.get('width', 0)/2, 
-                          ilot['y'] + ilot.get('height', 0)/2)
-            
-            for j, other_ilot in enumerate(ilots):
-                if i == j or 'x' not in other_ilot or 'y' not in other_ilot:
-                    continue
-                
-                other_center = (other_ilot['x'] + other_ilot.get('width', 0)/2,
-                               other_ilot['y'] + other_ilot.get('height', 0)/2)
-                
-                distance = math.sqrt((ilot_center[0] - other_center[0])**2 + 
-                                   (ilot_center[1] - other_center[1])**2)
-                
-                if distance <= radius:
-                    nearby_count += 1
-            
-            densities.append(nearby_count)
+        centers = [
+            (ilot['x'] + ilot.get('width', 0)/2, ilot['y'] + ilot.get('height', 0)/2)
+            for ilot in ilots if 'x' in ilot and 'y' in ilot
+        ]
+        
+        # Count nearby îlots within radius
+        radius = 5.0  # 5 meter radius
+        densities = CentroidIndex(centers).neighbor_counts(radius)
         
-        if not densities:
+        if len(densities) == 0:
             return {'average_density': 0.0, 'density_variance': 0.0, 'balance_score': 0.0}
         
         average_density = np.mean(densities)
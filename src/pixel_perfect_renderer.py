@@ -10,6 +10,11 @@ import numpy as np
 from typing import List, Dict, Tuple, Any
 from dataclasses import dataclass
 import math
+from shapely.geometry import LineString, Polygon, box
+from shapely.geometry.base import BaseGeometry
+
+from core.plot_batching import batched_outline, group_indices
+from core.plot_backend import select_backend, WEBGL_VERTEX_THRESHOLD
 
 @dataclass
 class RenderingStyle:
@@ -39,8 +44,12 @@ class PixelPerfectRenderer:
     Matches exact specifications from reference images
     """
 
-    def __init__(self, style: RenderingStyle = None):
+    def __init__(self, style: RenderingStyle = None, batched: bool = True):
         self.style = style or RenderingStyle()
+        # One trace per layer (îlots: per category) instead of one per shape,
+        # keeping figure size bounded by layer count on large plans
+        self.batched = batched
+        self.webgl_vertex_threshold = WEBGL_VERTEX_THRESHOLD  # Larger plans render with WebGL
         self.config = {
             'displayModeBar': True,
             'modeBarButtonsToAdd': ['drawline', 'drawopenpath', 'drawclosedpath', 'drawcircle', 'drawrect', 'eraseshape'],
@@ -79,6 +88,7 @@ class PixelPerfectRenderer:
         if self.style.show_grid:
             self._add_professional_grid(fig, bounds)
 
+        select_backend(fig, self.webgl_vertex_threshold)
         return fig
 
     def render_floor_plan_with_ilots(self, walls: List, restricted_areas: List, 
@@ -105,6 +115,7 @@ class PixelPerfectRenderer:
         if self.style.show_measurements:
             self._add_ilot_measurements(fig, ilots)
 
+        select_backend(fig, self.webgl_vertex_threshold)
         return fig
 
     def render_floor_plan_with_corridors(self, walls: List, restricted_areas: List, 
@@ -135,6 +146,7 @@ class PixelPerfectRenderer:
             self._add_ilot_measurements(fig, ilots)
             self._add_corridor_measurements(fig, corridors)
 
+        select_backend(fig, self.webgl_vertex_threshold)
         return fig
 
     def _setup_professional_layout(self, fig: go.Figure, bounds: Tuple[float, float, float, float], title: str):
@@ -212,8 +224,49 @@ class PixelPerfectRenderer:
             margin=dict(l=50, r=150, t=80, b=50)
         )
 
+    def _item_geometry(self, item, closed: bool = False):
+        """Shapely geometry of an input shape: .geometry/.polygon, or a dict with 'polygon' or 'points'"""
+        if isinstance(item, BaseGeometry):
+            return item
+        if hasattr(item, 'geometry'):
+            return item.geometry
+        if hasattr(item, 'polygon'):
+            return item.polygon
+        if 'polygon' in item:
+            return item['polygon']
+        points = item.get('points', [])
+        if len(points) < (3 if closed else 2):
+            return None
+        return Polygon(points) if closed else LineString(points)
+
+    def _item_field(self, item, name: str, default: Any = None) -> Any:
+        """Attribute of a dataclass input or key of a dict input"""
+        if isinstance(item, dict):
+            return item.get(name, default)
+        return getattr(item, name, default)
+
+    def _add_batched_trace(self, fig: go.Figure, geometries: List, measure, **trace):
+        """Single trace for a whole layer; measure(geometry) feeds per-point customdata"""
+        geometries = [g for g in geometries if g is not None]
+        if not geometries:
+            return
+        fig.add_trace(go.Scatter(
+            **batched_outline(geometries, [measure(g) for g in geometries]),
+            **trace
+        ))
+
     def _render_walls(self, fig: go.Figure, walls: List):
         """Render walls as thick gray lines matching reference"""
+        if self.batched:
+            self._add_batched_trace(
+                fig, [self._item_geometry(wall) for wall in walls], lambda g: g.length,
+                mode='lines',
+                line=dict(color=self.style.wall_color, width=self.style.wall_width),
+                name='Walls (MUR)',
+                hovertemplate="<b>Wall</b><br>Length: %{customdata:.1f}m<extra></extra>"
+            )
+            return
+
         for i, wall in enumerate(walls):
             if hasattr(wall, 'geometry'):
                 geometry = wall.geometry
@@ -246,6 +299,19 @@ class PixelPerfectRenderer:
 
     def _render_restricted_areas(self, fig: go.Figure, restricted_areas: List):
         """Render restricted areas as blue zones (NO ENTREE)"""
+        if self.batched:
+            self._add_batched_trace(
+                fig, [self._item_geometry(area, closed=True) for area in restricted_areas],
+                lambda g: g.area,
+                fill='toself',
+                fillcolor=f'rgba({self._hex_to_rgb(self.style.restricted_color)}, {self.style.restricted_opacity})',
+                line=dict(color=self.style.restricted_color, width=2),
+                mode='lines',
+                name='Restricted Areas (NO ENTREE)',
+                hovertemplate="<b>Restricted Area</b><br>Area: %{customdata:.1f}m²<extra></extra>"
+            )
+            return
+
         for i, area in enumerate(restricted_areas):
             if hasattr(area, 'geometry'):
                 geometry = area.geometry
@@ -279,6 +345,16 @@ class PixelPerfectRenderer:
 
     def _render_entrances(self, fig: go.Figure, entrances: List):
         """Render entrances as red zones (ENTRÉE/SORTIE)"""
+        if self.batched:
+            self._add_batched_trace(
+                fig, [self._item_geometry(entrance) for entrance in entrances], lambda g: g.length,
+                mode='lines',
+                line=dict(color=self.style.entrance_color, width=self.style.entrance_width),
+                name='Entrances (ENTRÉE/SORTIE)',
+                hovertemplate="<b>Entrance/Exit</b><br>Width: %{customdata:.1f}m<extra></extra>"
+            )
+            return
+
         for i, entrance in enumerate(entrances):
             if hasattr(entrance, 'geometry'):
                 geometry = entrance.geometry
@@ -314,6 +390,10 @@ class PixelPerfectRenderer:
 
     def _render_ilots(self, fig: go.Figure, ilots: List):
         """Render îlots with professional styling and measurements"""
+        if self.batched:
+            self._render_ilots_batched(fig, ilots)
+            return
+
         for i, ilot in enumerate(ilots):
             # Handle different îlot formats
             if hasattr(ilot, 'polygon'):
@@ -340,14 +420,7 @@ class PixelPerfectRenderer:
             category = ilot.get('category', 'Standard')
 
             # Color based on category
-            if 'micro' in category.lower() or '0-1' in category:
-                fill_color = 'rgba(254, 243, 242, 0.8)'
-            elif 'small' in category.lower() or '1-3' in category:
-                fill_color = 'rgba(254, 226, 226, 0.8)'
-            elif 'medium' in category.lower() or '3-5' in category:
-                fill_color = 'rgba(252, 231, 243, 0.8)'
-            else:
-                fill_color = 'rgba(243, 232, 255, 0.8)'
+            fill_color = self._category_fill_color(category)
 
             fig.add_trace(go.Scatter(
                 x=x_coords,
@@ -364,8 +437,62 @@ class PixelPerfectRenderer:
                 hovertemplate=f"<b>Îlot {i+1}</b><br>Area: {area:.1f}m²<br>Category: {category}<extra></extra>"
             ))
 
+    def _render_ilots_batched(self, fig: go.Figure, ilots: List):
+        """One trace per îlot category, hover data per point"""
+        geometries, areas, categories = [], [], []
+        for ilot in ilots:
+            if hasattr(ilot, 'polygon') or 'polygon' in ilot:
+                geometry = self._item_geometry(ilot)
+            else:
+                # Create polygon from position and dimensions
+                x = ilot.get('x', 0)
+                y = ilot.get('y', 0)
+                geometry = box(x, y, x + ilot.get('width', 1), y + ilot.get('height', 1))
+            geometries.append(geometry)
+            areas.append(self._item_field(ilot, 'area', geometry.area))
+            categories.append(self._item_field(ilot, 'category', 'Standard'))
+
+        for category, indices in group_indices(categories).items():
+            fig.add_trace(go.Scatter(
+                **batched_outline([geometries[i] for i in indices], [(i + 1, areas[i]) for i in indices]),
+                fill='toself',
+                fillcolor=self._category_fill_color(category),
+                line=dict(
+                    color=self.style.ilot_outline_color,
+                    width=2
+                ),
+                mode='lines',
+                name=f'Îlots {category}',
+                hovertemplate=(f"<b>Îlot %{{customdata[0]:.0f}}</b><br>Area: %{{customdata[1]:.1f}}m²"
+                               f"<br>Category: {category}<extra></extra>")
+            ))
+
+    def _category_fill_color(self, category: str) -> str:
+        """Îlot fill color by size category"""
+        if 'micro' in category.lower() or '0-1' in category:
+            return 'rgba(254, 243, 242, 0.8)'
+        elif 'small' in category.lower() or '1-3' in category:
+            return 'rgba(254, 226, 226, 0.8)'
+        elif 'medium' in category.lower() or '3-5' in category:
+            return 'rgba(252, 231, 243, 0.8)'
+        return 'rgba(243, 232, 255, 0.8)'
+
     def _render_corridors(self, fig: go.Figure, corridors: List):
         """Render corridors as pink circulation paths"""
+        if self.batched:
+            self._add_batched_trace(
+                fig, [self._item_geometry(corridor) if hasattr(corridor, 'polygon') or 'polygon' in corridor
+                      else None for corridor in corridors],
+                lambda g: g.area,
+                fill='toself',
+                fillcolor=f'rgba({self._hex_to_rgb(self.style.corridor_color)}, {self.style.corridor_opacity})',
+                line=dict(color=self.style.corridor_color, width=2),
+                mode='lines',
+                name='Circulation Corridors',
+                hovertemplate="<b>Corridor</b><br>Area: %{customdata:.1f}m²<extra></extra>"
+            )
+            return
+
         for i, corridor in enumerate(corridors):
             if hasattr(corridor, 'polygon'):
                 geometry = corridor.polygon
@@ -15,6 +15,8 @@ import matplotlib.patches as patches
 from matplotlib.colors import LinearSegmentedColormap
 import streamlit as st
 
+from core.plot_backend import select_backend, WEBGL_VERTEX_THRESHOLD
+
 class ProfessionalVisualizationEngine:
     """Professional visualization engine for architectural layouts"""
     
@@ -47,6 +49,8 @@ class ProfessionalVisualizationEngine:
             'font_family': 'Arial, sans-serif',
             'font_size': 12
         }
+        
+        self.webgl_vertex_threshold = WEBGL_VERTEX_THRESHOLD  # Larger plans render with WebGL
     
     def create_professional_floor_plan(self, 
                                      zones: Dict[str, List[Dict]], 
@@ -121,6 +125,7 @@ class ProfessionalVisualizationEngine:
         # Add annotations and labels
         self._add_professional_annotations(fig, zones, ilots, bounds)
         
+        select_backend(fig, self.webgl_vertex_threshold)
         return fig
     
     def _add_walls_professional(self, fig: go.Figure, walls: List[Dict]):
@@ -6,12 +6,14 @@ import pandas as pd
 import numpy as np
 from typing import List, Dict, Any
 
+from core.plot_backend import select_backend, WEBGL_VERTEX_THRESHOLD
+
 
 class PlanVisualizer:
     """Visualization class for architectural plans"""
 
     def __init__(self):
-        pass
+        self.webgl_vertex_threshold = WEBGL_VERTEX_THRESHOLD  # Larger plans render with WebGL
 
     def create_basic_plot(self, zones):
         """Create basic 2D plot of zones"""
@@ -81,6 +83,7 @@ class PlanVisualizer:
             yaxis=dict(scaleanchor="x", scaleratio=1)
         )
 
+        select_backend(fig, self.webgl_vertex_threshold)
         return fig
 
     def create_interactive_plot(self, zones, analysis_results, show_zones=True, 
@@ -257,6 +260,7 @@ class PlanVisualizer:
             yaxis=dict(scaleanchor="x", scaleratio=1)
         )
 
+        select_backend(fig, self.webgl_vertex_threshold)
         return fig
 
     def create_3d_plot(self, zones, analysis_results):
@@ -13,6 +13,9 @@ import logging
 
 from core.production_orchestrator import ProductionOrchestrator
 from core.production_ilot_engine import IlotSizeConfig
+from core.plot_batching import batched_outline, group_indices
+from core.figure_cache import FigureCache, result_fingerprint
+from core.job_queue import JobQueue, QueueFull, DONE, FINISHED
 
 # Configure logging
 logging.basicConfig(
@@ -77,122 +80,114 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-def create_visualization(result, view_mode='complete'):
-    """Create interactive Plotly visualization"""
+def add_polygon_layer(fig, polygons, batched, values=None, showlegend=True, **trace_style):
+    """
+    Draw a polygon layer: one trace for the whole layer when batched, else one
+    trace per polygon; values holds per-polygon customdata for the hovertemplate
+    """
+    if not polygons:
+        return
+    
+    if batched:
+        fig.add_trace(go.Scatter(**batched_outline(polygons, values), showlegend=showlegend,
+                                 **trace_style))
+        return
+    
+    for i, polygon in enumerate(polygons):
+        fig.add_trace(go.Scatter(
+            **batched_outline([polygon], None if values is None else [values[i]]),
+            showlegend=showlegend and i == 0,
+            **trace_style
+        ))
+
+
+def create_visualization(result, view_mode='complete', batched=True):
+    """
+    Create interactive Plotly visualization
+    Batched mode merges each layer into one trace (îlots: one per category), so
+    figure size follows layer count rather than polygon count
+    """
     fig = go.Figure()
     
     # Draw open spaces (light gray background)
     if view_mode in ['plan', 'complete', 'ilots', 'corridors']:
-        for i, space in enumerate(result.open_spaces):
-            coords = list(space.exterior.coords)
-            x_coords = [c[0] for c in coords]
-            y_coords = [c[1] for c in coords]
-            
-            fig.add_trace(go.Scatter(
-                x=x_coords, y=y_coords,
-                fill='toself',
-                fillcolor='rgba(240, 240, 240, 0.5)',
-                line=dict(color='lightgray', width=1),
-                name='Open Spaces' if i == 0 else None,
-                legendgroup='spaces',
-                showlegend=(i == 0),
-                hoverinfo='skip'
-            ))
+        add_polygon_layer(
+            fig, result.open_spaces, batched,
+            fill='toself',
+            fillcolor='rgba(240, 240, 240, 0.5)',
+            line=dict(color='lightgray', width=1),
+            name='Open Spaces',
+            legendgroup='spaces',
+            hoverinfo='skip'
+        )
     
     # Draw walls (black)
     if view_mode in ['plan', 'complete', 'ilots', 'corridors']:
-        for i, wall in enumerate(result.walls):
-            coords = list(wall.exterior.coords)
-            x_coords = [c[0] for c in coords]
-            y_coords = [c[1] for c in coords]
-            
-            fig.add_trace(go.Scatter(
-                x=x_coords, y=y_coords,
-                fill='toself',
-                fillcolor='rgba(50, 50, 50, 0.8)',
-                line=dict(color='black', width=2),
-                name='⬛ Walls (MUR)' if i == 0 else None,
-                legendgroup='walls',
-                showlegend=(i == 0),
-                hovertext='Wall - Îlots can touch',
-                hoverinfo='text'
-            ))
+        add_polygon_layer(
+            fig, result.walls, batched,
+            fill='toself',
+            fillcolor='rgba(50, 50, 50, 0.8)',
+            line=dict(color='black', width=2),
+            name='⬛ Walls (MUR)',
+            legendgroup='walls',
+            hovertemplate='Wall - Îlots can touch<extra></extra>'
+        )
     
     # Draw restricted areas (blue - NO ENTREE)
     if view_mode in ['plan', 'complete', 'ilots', 'corridors']:
-        for i, restricted in enumerate(result.restricted_areas):
-            coords = list(restricted.exterior.coords)
-            x_coords = [c[0] for c in coords]
-            y_coords = [c[1] for c in coords]
-            
-            fig.add_trace(go.Scatter(
-                x=x_coords, y=y_coords,
-                fill='toself',
-                fillcolor='rgba(70, 130, 255, 0.7)',
-                line=dict(color='blue', width=3),
-                name='🔵 Restricted (NO ENTREE)' if i == 0 else None,
-                legendgroup='restricted',
-                showlegend=(i == 0),
-                hovertext='Restricted Area - Stairs/Elevators',
-                hoverinfo='text'
-            ))
+        add_polygon_layer(
+            fig, result.restricted_areas, batched,
+            fill='toself',
+            fillcolor='rgba(70, 130, 255, 0.7)',
+            line=dict(color='blue', width=3),
+            name='🔵 Restricted (NO ENTREE)',
+            legendgroup='restricted',
+            hovertemplate='Restricted Area - Stairs/Elevators<extra></extra>'
+        )
     
     # Draw entrances (red - ENTREE/SORTIE)
     if view_mode in ['plan', 'complete', 'ilots', 'corridors']:
-        for i, entrance in enumerate(result.entrances):
-            coords = list(entrance.exterior.coords)
-            x_coords = [c[0] for c in coords]
-            y_coords = [c[1] for c in coords]
-            
-            fig.add_trace(go.Scatter(
-                x=x_coords, y=y_coords,
-                fill='toself',
-                fillcolor='rgba(255, 68, 68, 0.7)',
-                line=dict(color='red', width=4),
-                name='🔴 Entrances (ENTREE/SORTIE)' if i == 0 else None,
-                legendgroup='entrances',
-                showlegend=(i == 0),
-                hovertext='Entrance/Exit - No îlot contact',
-                hoverinfo='text'
-            ))
+        add_polygon_layer(
+            fig, result.entrances, batched,
+            fill='toself',
+            fillcolor='rgba(255, 68, 68, 0.7)',
+            line=dict(color='red', width=4),
+            name='🔴 Entrances (ENTREE/SORTIE)',
+            legendgroup='entrances',
+            hovertemplate='Entrance/Exit - No îlot contact<extra></extra>'
+        )
     
-    # Draw îlots (green)
+    # Draw îlots (green), one trace per category so hover can name it
     if view_mode in ['ilots', 'complete', 'corridors']:
-        for i, ilot in enumerate(result.ilots):
-            coords = list(ilot.polygon.exterior.coords)
-            x_coords = [c[0] for c in coords]
-            y_coords = [c[1] for c in coords]
-            
-            fig.add_trace(go.Scatter(
-                x=x_coords, y=y_coords,
+        categories = group_indices([ilot.category for ilot in result.ilots])
+        for n, (category, indices) in enumerate(categories.items()):
+            ilots = [result.ilots[i] for i in indices]
+            add_polygon_layer(
+                fig, [ilot.polygon for ilot in ilots], batched,
+                values=[(ilot.id, ilot.area) for ilot in ilots],
+                showlegend=(n == 0),
                 fill='toself',
                 fillcolor='rgba(46, 204, 113, 0.8)',
                 line=dict(color='darkgreen', width=2),
-                name=f'🟢 Îlots ({len(result.ilots)} total)' if i == 0 else None,
+                name=f'🟢 Îlots ({len(result.ilots)} total)',
                 legendgroup='ilots',
-                showlegend=(i == 0),
-                hovertext=f'Îlot #{ilot.id}<br>Area: {ilot.area:.2f}m²<br>Category: {ilot.category}',
-                hoverinfo='text'
-            ))
+                hovertemplate=(f'Îlot #%{{customdata[0]:.0f}}<br>Area: %{{customdata[1]:.2f}}m²'
+                               f'<br>Category: {category}<extra></extra>')
+            )
     
     # Draw corridors (purple)
     if view_mode in ['corridors', 'complete']:
-        for i, corridor in enumerate(result.corridors):
-            coords = list(corridor.polygon.exterior.coords)
-            x_coords = [c[0] for c in coords]
-            y_coords = [c[1] for c in coords]
-            
-            fig.add_trace(go.Scatter(
-                x=x_coords, y=y_coords,
-                fill='toself',
-                fillcolor='rgba(155, 89, 182, 0.6)',
-                line=dict(color='purple', width=2),
-                name=f'🟣 Corridors ({len(result.corridors)} total)' if i == 0 else None,
-                legendgroup='corridors',
-                showlegend=(i == 0),
-                hovertext=f'Corridor #{corridor.id}<br>Width: {corridor.width:.2f}m<br>Length: {corridor.length:.2f}m',
-                hoverinfo='text'
-            ))
+        add_polygon_layer(
+            fig, [corridor.polygon for corridor in result.corridors], batched,
+            values=[(corridor.id, corridor.width, corridor.length) for corridor in result.corridors],
+            fill='toself',
+            fillcolor='rgba(155, 89, 182, 0.6)',
+            line=dict(color='purple', width=2),
+            name=f'🟣 Corridors ({len(result.corridors)} total)',
+            legendgroup='corridors',
+            hovertemplate=('Corridor #%{customdata[0]:.0f}<br>Width: %{customdata[1]:.2f}m'
+                           '<br>Length: %{customdata[2]:.2f}m<extra></extra>')
+        )
     
     # Update layout
     fig.update_layout(
@@ -220,6 +215,112 @@ def create_visualization(result, view_mode='complete'):
     return fig
 
 
+@st.cache_resource
+def get_figure_cache():
+    """Figure cache shared by all sessions, kept across reruns"""
+    return FigureCache()
+
+
+def cached_visualization(result, view_mode, fingerprint):
+    """create_visualization, reused across reruns while the result is unchanged"""
+    return get_figure_cache().figure(
+        f"{fingerprint}:{view_mode}",
+        lambda: create_visualization(result, view_mode)
+    )
+
+
+@st.cache_resource
+def get_job_queue():
+    """Background processing jobs, shared by all sessions and kept across reruns"""
+    return JobQueue(max_workers=2, max_pending=8)
+
+
+def process_in_background(dxf_path, size_config, total_ilots, corridor_width, min_spacing, progress):
+    """Job body: full orchestration on a worker thread, reporting GA progress"""
+    try:
+        orchestrator = ProductionOrchestrator()
+        return orchestrator.process_floor_plan(
+            dxf_file_path=dxf_path,
+            size_config=size_config,
+            total_ilots=total_ilots,
+            corridor_width=corridor_width,
+            min_spacing=min_spacing,
+            progress_callback=progress
+        )
+    finally:
+        # Cleanup temporary file
+        try:
+            os.unlink(dxf_path)
+        except OSError:
+            pass
+
+
+def describe_progress(progress):
+    """Progress bar fraction and caption for a job progress dict"""
+    stage = progress.get('stage')
+    if stage == 'placement':
+        generation = progress.get('generation', 0)
+        max_generations = max(progress.get('max_generations', 1), 1)
+        return (0.1 + 0.8 * generation / max_generations,
+                f"Placing îlots: generation {generation}/{max_generations}, "
+                f"{progress.get('ilot_count', 0)} îlots, best fitness {progress.get('best_fitness', 0):.1f}")
+    if stage == 'corridors':
+        return 0.9, f"Generating corridors for {progress.get('ilot_count', 0)} îlots..."
+    if stage == 'parsing':
+        return 0.05, "Parsing CAD file..."
+    return 0.0, "Waiting for a free worker..."
+
+
+def follow_job(job_id, status_area):
+    """
+    Show live progress until the job finishes, then attach its result to the
+    session and rerun; a widget interaction just restarts the script and
+    picks the job up again, the job itself keeps running
+    """
+    job_queue = get_job_queue()
+    version = -1
+    while True:
+        snapshot = job_queue.wait(job_id, version, timeout=1.0, include_result=True)
+        if snapshot is None:
+            # Unknown to this server, e.g. after a restart
+            del st.session_state['job_id']
+            status_area.warning("⚠️ Processing job was lost, please process the floor plan again")
+            return
+        
+        if snapshot['status'] in FINISHED:
+            del st.session_state['job_id']
+            if snapshot['status'] == DONE:
+                st.session_state['result'] = snapshot['result']
+                st.session_state['job_outcome'] = {'result': snapshot['result']}
+            else:
+                st.session_state['job_outcome'] = {'error': snapshot['error']}
+            st.rerun()
+        
+        version = snapshot['version']
+        fraction, caption = describe_progress(snapshot['progress'])
+        status_area.progress(min(fraction, 1.0), text=caption)
+
+
+def show_job_outcome(outcome):
+    """Success or failure box for the job that just finished"""
+    result = outcome.get('result')
+    if result is not None and result.success:
+        st.markdown(f"""
+        <div class="success-box">
+            <strong>✅ Processing Complete!</strong><br>
+            Processed in {result.processing_time:.2f} seconds
+        </div>
+        """, unsafe_allow_html=True)
+    else:
+        error = result.error_message if result is not None else outcome.get('error', '')
+        st.markdown(f"""
+        <div class="warning-box">
+            <strong>⚠️ Processing Failed</strong><br>
+            {error}
+        </div>
+        """, unsafe_allow_html=True)
+
+
 def main():
     # Header
     st.markdown("""
@@ -315,58 +416,41 @@ def main():
     )
     
     if uploaded_file is not None:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.dxf') as tmp_file:
-            tmp_file.write(uploaded_file.read())
-            tmp_file_path = tmp_file.name
-        
-        try:
-            # Process button
-            if st.button("🚀 Process Floor Plan", type="primary"):
-                with st.spinner("Processing floor plan..."):
-                    # Create size configuration
-                    size_config = IlotSizeConfig(
-                        size_0_1_pct=size_0_1,
-                        size_1_3_pct=size_1_3,
-                        size_3_5_pct=size_3_5,
-                        size_5_10_pct=size_5_10
-                    )
-                    
-                    # Process
-                    orchestrator = ProductionOrchestrator()
-                    result = orchestrator.process_floor_plan(
-                        dxf_file_path=tmp_file_path,
-                        size_config=size_config,
-                        total_ilots=total_ilots,
-                        corridor_width=corridor_width,
-                        min_spacing=min_spacing
-                    )
-                    
-                    # Store result in session state
-                    st.session_state['result'] = result
-                
-                # Display results
-                if result.success:
-                    st.markdown(f"""
-                    <div class="success-box">
-                        <strong>✅ Processing Complete!</strong><br>
-                        Processed in {result.processing_time:.2f} seconds
-                    </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    st.markdown(f"""
-                    <div class="warning-box">
-                        <strong>⚠️ Processing Failed</strong><br>
-                        {result.error_message}
-                    </div>
-                    """, unsafe_allow_html=True)
-        
-        finally:
-            # Cleanup temporary file
+        # Process button; disabled while this session's job is running
+        if st.button("🚀 Process Floor Plan", type="primary",
+                     disabled='job_id' in st.session_state):
+            # Save uploaded file temporarily; the job removes it when done
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.dxf') as tmp_file:
+                tmp_file.write(uploaded_file.getvalue())
+                tmp_file_path = tmp_file.name
+            
+            # Create size configuration
+            size_config = IlotSizeConfig(
+                size_0_1_pct=size_0_1,
+                size_1_3_pct=size_1_3,
+                size_3_5_pct=size_3_5,
+                size_5_10_pct=size_5_10
+            )
+            
+            def run(progress):
+                return process_in_background(tmp_file_path, size_config, total_ilots,
+                                             corridor_width, min_spacing, progress)
+            
             try:
+                job = get_job_queue().submit(run)
+            except QueueFull:
                 os.unlink(tmp_file_path)
-            except:
-                pass
+                st.warning("⚠️ The server is busy with other floor plans, please retry shortly")
+            else:
+                st.session_state['job_id'] = job.id
+                st.session_state.pop('job_outcome', None)
+    
+    # Progress of the running job, or the outcome of the one that just finished
+    status_area = st.empty()
+    outcome = st.session_state.pop('job_outcome', None)
+    if outcome is not None:
+        with status_area.container():
+            show_job_outcome(outcome)
     
     # Display results if available
     if 'result' in st.session_state:
@@ -394,7 +478,8 @@ def main():
                 st.metric("Processing Time", f"{result.processing_time:.2f}s",
                          f"Score: {result.placement_score:.0f}")
             
-            # Visualization tabs
+            # Visualization tabs, rebuilt only when the result changes
+            fingerprint = result_fingerprint(result)
             st.header("🎨 Visualization")
             
             tab1, tab2, tab3, tab4 = st.tabs([
@@ -405,13 +490,13 @@ def main():
             ])
             
             with tab1:
-                st.plotly_chart(create_visualization(result, 'plan'), use_container_width=True)
+                st.plotly_chart(cached_visualization(result, 'plan', fingerprint), use_container_width=True)
             
             with tab2:
-                st.plotly_chart(create_visualization(result, 'ilots'), use_container_width=True)
+                st.plotly_chart(cached_visualization(result, 'ilots', fingerprint), use_container_width=True)
             
             with tab3:
-                st.plotly_chart(create_visualization(result, 'complete'), use_container_width=True)
+                st.plotly_chart(cached_visualization(result, 'complete', fingerprint), use_container_width=True)
             
             with tab4:
                 col1, col2 = st.columns(2)
@@ -491,6 +576,10 @@ def main():
         </div>
         """, unsafe_allow_html=True)
 
+    # Follow the running job last, so everything above stays visible meanwhile
+    if 'job_id' in st.session_state:
+        follow_job(st.session_state['job_id'], status_area)
+
 
 if __name__ == "__main__":
     main()
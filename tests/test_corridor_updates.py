@@ -0,0 +1,110 @@
+"""
+Incremental Corridor Update Tests
+update_corridors must give the same network as regenerating from scratch
+"""
+
+import random
+
+import pytest
+from shapely.geometry import box
+
+from core.production_corridor_generator import ProductionCorridorGenerator
+from core.production_ilot_engine import PlacedIlot
+
+OPEN_SPACES = [box(-10, -10, 40, 40)]
+
+
+def make_ilot(ilot_id, x, y, width=3.0, height=2.0):
+    polygon = box(x - width / 2, y - height / 2, x + width / 2, y + height / 2)
+    return PlacedIlot(ilot_id, polygon, width * height, 'size_5_10', (x, y), width, height, 0)
+
+
+def network(generator):
+    rows = sorted(sorted(ilot.id for ilot in row) for row in generator._row_clusters)
+    corridors = sorted(corridor.polygon.wkt for corridor in generator._corridors)
+    return rows, corridors
+
+
+def new_generator(row_method):
+    generator = ProductionCorridorGenerator()
+    generator.row_method = row_method
+    return generator
+
+
+def full_network(ilots, row_method):
+    generator = new_generator(row_method)
+    generator.generate_corridors(ilots, OPEN_SPACES)
+    return network(generator)
+
+
+@pytest.fixture(params=['sweep', 'ward'])
+def row_method(request):
+    return request.param
+
+
+def test_update_after_small_layout_matches_full_regeneration(row_method):
+    generator = new_generator(row_method)
+    generator.generate_corridors([make_ilot(0, 0, 0), make_ilot(1, 4, 0), make_ilot(2, 0, 5)], OPEN_SPACES)
+
+    delta = generator.update_corridors(added=[make_ilot(3, 4, 5), make_ilot(4, 8, 5)])
+
+    assert len(delta.corridors) == 1
+    assert network(generator) == full_network(list(generator._ilots.values()), row_method)
+
+
+def test_move_and_remove_match_full_regeneration(row_method):
+    ilots = [make_ilot(i, 4 * (i % 4), 5 * (i // 4)) for i in range(12)]
+    generator = new_generator(row_method)
+    generator.generate_corridors(ilots, OPEN_SPACES)
+
+    generator.update_corridors(moved=[make_ilot(5, 4, 10)], removed=[11])
+
+    assert network(generator) == full_network(list(generator._ilots.values()), row_method)
+
+
+def test_removal_that_merges_neighbouring_rows_matches_full_regeneration(row_method):
+    # Without îlot 0 the sweep chains the rows at y=1.5 and y=3.2 into one
+    positions = [(0, 0), (4, 1.5), (8, 1.5), (0, 3.2), (4, 3.2), (8, 3.2), (0, 9), (4, 9)]
+    generator = new_generator(row_method)
+    generator.generate_corridors([make_ilot(i, x, y) for i, (x, y) in enumerate(positions)], OPEN_SPACES)
+
+    generator.update_corridors(removed=[0])
+
+    assert network(generator)[0] == [[1, 2, 3, 4, 5], [6, 7]]
+    assert network(generator) == full_network(list(generator._ilots.values()), row_method)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_edit_sequences_match_full_regeneration(seed, row_method):
+    rng = random.Random(seed)
+
+    def random_ilot(ilot_id):
+        return make_ilot(ilot_id, rng.uniform(0, 30), rng.uniform(0, 30))
+
+    generator = new_generator(row_method)
+    generator.generate_corridors([random_ilot(i) for i in range(rng.randint(2, 25))], OPEN_SPACES)
+    next_id = 100
+
+    for _ in range(5):
+        ids = list(generator._ilots)
+        removed = rng.sample(ids, min(len(ids), rng.randint(0, 2)))
+        remaining = [ilot_id for ilot_id in ids if ilot_id not in removed]
+        moved = [random_ilot(ilot_id) for ilot_id in rng.sample(remaining, min(len(remaining), rng.randint(0, 2)))]
+        added = [random_ilot(next_id + k) for k in range(rng.randint(0, 2))]
+        next_id += len(added)
+
+        generator.update_corridors(moved=moved, added=added, removed=removed)
+
+        assert network(generator) == full_network(list(generator._ilots.values()), row_method)
+
+
+def test_added_ilot_with_existing_id_is_refused(row_method):
+    ilots = [make_ilot(i, 4 * (i % 2), 5 * (i // 2)) for i in range(4)]
+    generator = new_generator(row_method)
+    generator.generate_corridors(ilots, OPEN_SPACES)
+    before = network(generator)
+
+    with pytest.raises(ValueError):
+        generator.update_corridors(added=[make_ilot(0, 20, 20)])
+
+    assert network(generator) == before
@@ -0,0 +1,79 @@
+"""
+Parse Cache Tests
+Cache hits must return the geometry of a fresh parse, under keys that track parser settings
+"""
+
+import ezdxf
+import pytest
+
+from core.parse_cache import ParseCache
+from core.production_cad_parser import ProductionCADParser
+
+
+@pytest.fixture
+def plan_path(tmp_path):
+    """Small plan: outer walls, a partition, a blue stair core and a red entrance"""
+    doc = ezdxf.new('R2010')
+    msp = doc.modelspace()
+    msp.add_lwpolyline([(0, 0), (20, 0), (20, 15), (0, 15)], close=True, dxfattribs={'color': 7})
+    msp.add_line((10, 0), (10, 8), dxfattribs={'color': 7})
+    msp.add_lwpolyline([(2, 2), (5, 2), (5, 5), (2, 5)], close=True, dxfattribs={'color': 5})
+    msp.add_lwpolyline([(15, 0), (17, 0), (17, 1), (15, 1)], close=True, dxfattribs={'color': 1})
+    path = tmp_path / 'plan.dxf'
+    doc.saveas(path)
+    return str(path)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ParseCache(cache_dir=str(tmp_path / 'cache'))
+
+
+def as_wkb(layers):
+    return [[geometry.wkb for geometry in layer] for layer in layers]
+
+
+def test_cache_hit_returns_fresh_parse_geometry(plan_path, cache):
+    fresh = ProductionCADParser().parse_dxf(plan_path)
+    assert all(len(layer) > 0 for layer in fresh)
+
+    ProductionCADParser(cache=cache).parse_dxf(plan_path)
+    parser = ProductionCADParser(cache=cache)
+    assert cache.get(parser.cache_key(plan_path)) is not None
+
+    assert as_wkb(parser.parse_dxf(plan_path)) == as_wkb(fresh)
+
+
+def test_wall_thickness_is_part_of_the_key(plan_path, cache):
+    thin = ProductionCADParser(wall_thickness=0.20, cache=cache)
+    thick = ProductionCADParser(wall_thickness=0.25, cache=cache)
+
+    assert thin.cache_key(plan_path) != thick.cache_key(plan_path)
+    assert thin.cache_key(plan_path) == ProductionCADParser(wall_thickness=0.20, cache=cache).cache_key(plan_path)
+
+    # A hit for one thickness is never served for the other
+    thin.parse_dxf(plan_path)
+    assert cache.get(thick.cache_key(plan_path)) is None
+
+
+def test_file_content_is_part_of_the_key(plan_path, cache):
+    parser = ProductionCADParser(cache=cache)
+    before = parser.cache_key(plan_path)
+
+    with open(plan_path, 'a') as f:
+        f.write('999\nedited\n')
+
+    assert parser.cache_key(plan_path) != before
+
+
+def test_lod_tiers_round_trip(plan_path, cache):
+    parser = ProductionCADParser(cache=cache)
+    layers = parser.parse_dxf(plan_path)
+    key = parser.cache_key(plan_path)
+    tiers = [(0.05, layers), (0.2, tuple(layer[:1] for layer in layers))]
+
+    cache.put_lods(key, tiers)
+
+    restored = cache.get_lods(key)
+    assert [tolerance for tolerance, _ in restored] == [0.05, 0.2]
+    assert [as_wkb(tier) for _, tier in restored] == [as_wkb(tier) for _, tier in tiers]
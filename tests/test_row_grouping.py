@@ -0,0 +1,31 @@
+"""
+Row Grouping Tests
+Pins the default Ward grouping and the opt-in sweep grouping, which differ
+"""
+
+from core.production_corridor_generator import ProductionCorridorGenerator
+from test_corridor_updates import OPEN_SPACES, make_ilot
+
+# Centers climbing 1.5 m per îlot: Ward splits them in two pairs, while the
+# sweep chains every îlot whose Y-interval overlaps the open row
+STAIRCASE = [(0, 0), (4, 1.5), (8, 3), (12, 4.5)]
+
+
+def rows(generator):
+    ilots = [make_ilot(i, x, y) for i, (x, y) in enumerate(STAIRCASE)]
+    generator.generate_corridors(ilots, OPEN_SPACES)
+    return [[ilot.id for ilot in row] for row in generator._row_clusters]
+
+
+def test_default_groups_rows_with_ward():
+    generator = ProductionCorridorGenerator()
+
+    assert generator.row_method == 'ward'
+    assert rows(generator) == [[0, 1], [2, 3]]
+
+
+def test_sweep_chains_overlapping_rows():
+    generator = ProductionCorridorGenerator()
+    generator.row_method = 'sweep'
+
+    assert rows(generator) == [[0, 1, 2], [3]]
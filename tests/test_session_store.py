@@ -0,0 +1,91 @@
+"""
+Session Store Tests
+Sessions must round-trip plans, îlot layouts and corridor generator state without pickle
+"""
+
+import os
+import pickle
+import sqlite3
+
+import pytest
+from shapely.geometry import box
+
+from core.production_corridor_generator import ProductionCorridorGenerator
+from core.session_store import SessionStore, private_temp_dir
+from test_corridor_updates import OPEN_SPACES, make_ilot, network
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SessionStore(db_path=str(tmp_path / 'sessions.sqlite3'))
+
+
+@pytest.fixture(params=['sweep', 'ward'])
+def row_method(request):
+    return request.param
+
+
+def processed_session(store, row_method):
+    """Session holding a plan and a 3 x 4 îlot layout with its corridors"""
+    ilots = [make_ilot(i, 4 * (i % 4), 5 * (i // 4)) for i in range(12)]
+    generator = ProductionCorridorGenerator(corridor_width=1.2)
+    generator.row_method = row_method
+    generator.generate_corridors(ilots, OPEN_SPACES)
+
+    session = store.create()
+    session.plan = ([box(-10, -10, 40, -9.8)], [box(30, 30, 32, 32)], [box(0, -10, 2, -9.8)], OPEN_SPACES)
+    session.parse_key = 'a' * 64
+    session.wall_thickness = 0.2
+    session.ilots = {ilot.id: ilot for ilot in ilots}
+    session.corridor_generator = generator
+    store.save(session)
+    return session
+
+
+def test_layout_round_trip(store, row_method):
+    saved = processed_session(store, row_method)
+    assert saved.corridor_generator._corridors
+
+    loaded = store.load(saved.token)
+
+    assert loaded.parse_key == saved.parse_key
+    assert loaded.wall_thickness == saved.wall_thickness
+    assert [[g.wkb for g in layer] for layer in loaded.plan] == [[g.wkb for g in layer] for layer in saved.plan]
+    assert loaded.ilots == saved.ilots
+
+    generator = loaded.corridor_generator
+    assert generator.row_method == row_method
+    assert generator.corridor_width == 1.2
+    assert network(generator) == network(saved.corridor_generator)
+    assert generator._corridors == saved.corridor_generator._corridors
+    assert generator._next_corridor_id == saved.corridor_generator._next_corridor_id
+
+
+def test_restored_generator_accepts_updates(store, row_method):
+    saved = processed_session(store, row_method)
+    generator = store.load(saved.token).corridor_generator
+
+    delta = generator.update_corridors(moved=[make_ilot(5, 4, 12)], added=[make_ilot(20, 16, 5)], removed=[0])
+
+    fresh = ProductionCorridorGenerator(corridor_width=1.2)
+    fresh.row_method = row_method
+    fresh.generate_corridors(list(generator._ilots.values()), OPEN_SPACES)
+    assert delta.corridors == generator._corridors
+    assert network(generator) == network(fresh)
+
+
+def test_pickled_layout_is_discarded_not_loaded(store, row_method):
+    session = processed_session(store, row_method)
+    with sqlite3.connect(store.db_path) as conn:
+        conn.execute('UPDATE sessions SET layout = ? WHERE token = ?',
+                     (pickle.dumps({'ilots': {}, 'corridor_generator': None}), session.token))
+
+    assert store.load(session.token) is None
+
+
+@pytest.mark.skipif(not hasattr(os, 'getuid'), reason='POSIX permissions')
+def test_default_directory_is_private():
+    path = private_temp_dir()
+
+    assert os.stat(path).st_mode & 0o777 == 0o700
+    assert os.stat(path).st_uid == os.getuid()